@@ -17,6 +17,7 @@ from abc import ABCMeta, abstractmethod
 from os import path
 
 from .exception import NotFound, PermissoinDenied, Unauthorized, UnknownError
+from .session import get_session
 
 logger = logging.getLogger(__name__)
 
@@ -36,11 +37,18 @@ class BaseClient(metaclass=ABCMeta):
         url: str = 'http://127.0.0.1:18080/api/',
         timeout: int = 30,
         username=None, secret=None,
-        keyword='jwt', **extra_args
+        keyword='jwt', pool_size: int = 10,
+        max_retries: int = 3, backoff_factor: float = 0.3,
+        **extra_args
     ):
         from lico.auth.requests import ServiceAuth
         self.url = path.join(url, self.app)
         self.timeout = timeout
+        self.session = get_session(
+            pool_size=pool_size,
+            max_retries=max_retries,
+            backoff_factor=backoff_factor
+        )
         self.username = username
         self.auth = ServiceAuth(
             secret=secret, username=username,
@@ -65,13 +73,12 @@ class BaseClient(metaclass=ABCMeta):
         raise UnknownError(response.text) from exc
 
     def execute_request(self, *args, **kwargs):
-        import requests
         from requests.exceptions import HTTPError
 
         kwargs.setdefault('auth', self.auth)
         kwargs.setdefault('timeout', self.timeout)
 
-        response = requests.request(
+        response = self.session.request(
             *args,
             **kwargs
         )
@@ -0,0 +1,66 @@
+# Copyright 2015-present Lenovo
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import threading
+from http.cookiejar import DefaultCookiePolicy
+
+_sessions = {}
+_sessions_pid = None
+_sessions_lock = threading.Lock()
+
+
+def _create_session(pool_size, max_retries, backoff_factor):
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    session = requests.Session()
+    # Services are stateless, never carry cookies between callers
+    session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+    adapter = HTTPAdapter(
+        pool_connections=pool_size,
+        pool_maxsize=pool_size,
+        max_retries=Retry(
+            total=max_retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=(502, 503, 504),
+            raise_on_status=False
+        )
+    )
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def get_session(pool_size=10, max_retries=3, backoff_factor=0.3):
+    """
+    Return the keep-alive session shared by the clients of this process.
+
+    Sessions are created again in a forked child, such as a celery
+    worker, so pooled connections are never shared between processes.
+    Only idempotent requests are retried on 502/503/504, failed
+    connections are retried for every method.
+    """
+    global _sessions_pid
+
+    key = (pool_size, max_retries, backoff_factor)
+    with _sessions_lock:
+        if _sessions_pid != os.getpid():
+            _sessions.clear()
+            _sessions_pid = os.getpid()
+        session = _sessions.get(key)
+        if session is None:
+            session = _sessions[key] = _create_session(*key)
+        return session
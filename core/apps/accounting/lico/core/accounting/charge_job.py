@@ -28,6 +28,7 @@ from lico.core.job.helpers.scheduler_helper import (
     get_admin_scheduler, parse_job_identity,
 )
 
+from .helpers.billing_summary_helper import add_job_billing
 from .models import (
     BillGroup, BillGroupQueuePolicy, Deposit, Gresource, JobBillingStatement,
     UserBillGroupMapping,
@@ -167,6 +168,7 @@ def charge_job(job):
                 billing_runtime=actual_runtime,
                 record_id=record_id
             )
+            add_job_billing(jobbillstatement)
 
             bill_group = BillGroup.objects.select_for_update().get(
                 id=bill_group.id
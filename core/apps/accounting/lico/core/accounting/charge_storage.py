@@ -30,6 +30,7 @@ from lico.core.accounting.exceptions import (
 )
 from lico.core.accounting.utils import get_user_discount
 
+from .helpers.billing_summary_helper import add_storage_billing
 from .models import (
     BillGroup, BillGroupStoragePolicy, Deposit, StorageBillingRecord,
     StorageBillingStatement, UserBillGroupMapping,
@@ -118,6 +119,7 @@ class StorageBilling(object):
                         logger.exception(
                             'Create StorageBillingStatement failed')
                         raise CreateStorageBillingStatementException from e
+                    add_storage_billing(storage_statement)
                     # To make sadsads more accurate, query again
                     bill_group = BillGroup.objects.select_for_update().get(
                         id=bill_group.id
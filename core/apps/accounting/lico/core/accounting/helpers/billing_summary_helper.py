@@ -0,0 +1,165 @@
+# Copyright 2015-present Lenovo
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+from datetime import datetime, time
+
+from ..models import (
+    DailyBillingSummary, JobBillingStatement, StorageBillingStatement,
+)
+from ..utils import get_local_timezone
+
+logger = logging.getLogger(__name__)
+
+
+def get_summary_date(value):
+    return value.astimezone(tz=get_local_timezone()).date()
+
+
+def _touch(summary, statement):
+    if summary.last_billing_time is None or \
+            summary.last_billing_time <= statement.create_time:
+        summary.last_billing_time = statement.create_time
+        summary.bill_group_name = statement.bill_group_name
+
+
+def _add_job(summary, statement, new_in_day, new_in_month):
+    runtime = statement.billing_runtime
+    summary.job_count += new_in_day
+    summary.month_job_count += new_in_month
+    summary.runtime += runtime
+    summary.cpu_count += statement.cpu_count * runtime / 3600.0
+    summary.cpu_cost += statement.cpu_cost
+    summary.memory_count += statement.memory_count * runtime / 3600.0
+    summary.memory_cost += statement.memory_cost
+
+    # gres are summed up by code, e.g. gpu/2g.10gb is counted as gpu
+    gres_count = dict(summary.gres_count)
+    for gres_type, count in statement.gres_count.items():
+        code = gres_type.split('/')[0]
+        gres_count[code] = gres_count.get(code, 0.0) + \
+            count * runtime / 3600.0
+    gres_cost = dict(summary.gres_cost)
+    for gres_type, cost in statement.gres_cost.items():
+        code = gres_type.split('/')[0]
+        gres_cost[code] = gres_cost.get(code, 0.0) + cost
+    summary.gres_count, summary.gres_cost = gres_count, gres_cost
+
+    summary.job_billing_cost += statement.billing_cost
+    _touch(summary, statement)
+
+
+def _add_storage(summary, statement):
+    summary.storage_count += statement.storage_count
+    summary.storage_cost += statement.storage_cost
+    summary.storage_billing_cost += statement.billing_cost
+    _touch(summary, statement)
+
+
+def _get_summary(billing_date, username, statement):
+    summary, _ = DailyBillingSummary.objects.get_or_create(
+        billing_date=billing_date,
+        username=username,
+        bill_group_id=statement.bill_group_id,
+        defaults=dict(bill_group_name=statement.bill_group_name)
+    )
+    return DailyBillingSummary.objects.select_for_update().get(
+        id=summary.id
+    )
+
+
+def add_job_billing(statement):
+    """
+    Add a new job billing statement to the summary of its day, must be
+    called in the transaction creating the statement.
+    """
+    billing_date = get_summary_date(statement.create_time)
+    month_start = datetime.combine(
+        billing_date.replace(day=1), time(), tzinfo=get_local_timezone()
+    )
+    charged_dates = {
+        get_summary_date(create_time)
+        for create_time in JobBillingStatement.objects.filter(
+            job_id=statement.job_id,
+            create_time__gte=month_start,
+            create_time__lte=statement.create_time
+        ).exclude(id=statement.id).values_list('create_time', flat=True)
+    }
+    summary = _get_summary(billing_date, statement.submitter, statement)
+    _add_job(
+        summary, statement,
+        billing_date not in charged_dates, not charged_dates
+    )
+    summary.save()
+
+
+def add_storage_billing(statement):
+    """
+    Add a new storage billing statement to the summary of its day, must
+    be called in the transaction creating the statement.
+    """
+    summary = _get_summary(
+        get_summary_date(statement.billing_date), statement.username,
+        statement
+    )
+    _add_storage(summary, statement)
+    summary.save()
+
+
+def rebuild_daily_billing_summary(
+        job_model=JobBillingStatement,
+        storage_model=StorageBillingStatement,
+        summary_model=DailyBillingSummary
+):
+    """Rebuild all the daily billing summaries from the statements."""
+    summaries = {}
+
+    def get_summary(billing_date, username, statement):
+        key = (billing_date, username, statement.bill_group_id)
+        if key not in summaries:
+            summaries[key] = summary_model(
+                billing_date=billing_date,
+                username=username,
+                bill_group_id=statement.bill_group_id,
+                bill_group_name=statement.bill_group_name
+            )
+        return summaries[key]
+
+    job_id, charged_dates, charged_months = None, set(), set()
+    for statement in job_model.objects.order_by(
+            'job_id', 'create_time'
+    ).iterator():
+        if statement.job_id != job_id:
+            job_id, charged_dates, charged_months = \
+                statement.job_id, set(), set()
+        billing_date = get_summary_date(statement.create_time)
+        billing_month = billing_date.replace(day=1)
+        _add_job(
+            get_summary(billing_date, statement.submitter, statement),
+            statement,
+            billing_date not in charged_dates,
+            billing_month not in charged_months
+        )
+        charged_dates.add(billing_date)
+        charged_months.add(billing_month)
+
+    for statement in storage_model.objects.iterator():
+        _add_storage(get_summary(
+            get_summary_date(statement.billing_date), statement.username,
+            statement
+        ), statement)
+
+    summary_model.objects.all().delete()
+    summary_model.objects.bulk_create(summaries.values(), batch_size=1000)
+    logger.info('Rebuild %d daily billing summaries', len(summaries))
@@ -0,0 +1,93 @@
+# Copyright 2015-present Lenovo
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import jsonfield.fields
+from django.db import migrations, models
+
+import lico.core.contrib.fields
+import lico.core.contrib.models
+
+
+def fill_daily_billing_summary(apps, schema_editor):
+    from lico.core.accounting.helpers.billing_summary_helper import (
+        rebuild_daily_billing_summary,
+    )
+
+    rebuild_daily_billing_summary(
+        job_model=apps.get_model('accounting', 'JobBillingStatement'),
+        storage_model=apps.get_model('accounting', 'StorageBillingStatement'),
+        summary_model=apps.get_model('accounting', 'DailyBillingSummary')
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounting', '0003_lico_accounting_1_5_0'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='jobbillingstatement',
+            name='job_id',
+            field=models.CharField(
+                blank=True, db_index=True, default='', max_length=32),
+        ),
+        migrations.CreateModel(
+            name='DailyBillingSummary',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True,
+                                        serialize=False, verbose_name='ID')),
+                ('billing_date', models.DateField()),
+                ('username', models.CharField(db_index=True, max_length=32)),
+                ('bill_group_id', models.IntegerField()),
+                ('bill_group_name', models.CharField(max_length=32)),
+                ('job_count', models.IntegerField(default=0)),
+                ('month_job_count', models.IntegerField(
+                    default=0,
+                    help_text='jobs charged for the first time of the month'
+                )),
+                ('runtime', models.BigIntegerField(
+                    default=0, help_text='unit: second')),
+                ('cpu_count', models.FloatField(
+                    default=0, help_text='unit:core*hour')),
+                ('cpu_cost', models.FloatField(default=0)),
+                ('memory_count', models.FloatField(
+                    default=0, help_text='unit:MB*hour')),
+                ('memory_cost', models.FloatField(default=0)),
+                ('gres_count', jsonfield.fields.JSONField(default=dict)),
+                ('gres_cost', jsonfield.fields.JSONField(default=dict)),
+                ('job_billing_cost', models.FloatField(default=0)),
+                ('storage_count', models.FloatField(
+                    default=0, help_text='unit:GB')),
+                ('storage_cost', models.FloatField(default=0)),
+                ('storage_billing_cost', models.FloatField(default=0)),
+                ('last_billing_time', lico.core.contrib.fields.DateTimeField(
+                    null=True)),
+                ('create_time', lico.core.contrib.fields.DateTimeField(
+                    auto_now_add=True)),
+                ('update_time', lico.core.contrib.fields.DateTimeField(
+                    auto_now=True)),
+            ],
+            options={
+                'unique_together': {
+                    ('billing_date', 'username', 'bill_group_id')
+                },
+            },
+            bases=(models.Model, lico.core.contrib.models.ToDictMixin),
+        ),
+        migrations.RunPython(
+            fill_daily_billing_summary, migrations.RunPython.noop
+        ),
+    ]
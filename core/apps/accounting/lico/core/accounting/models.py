@@ -46,7 +46,8 @@ class StorageBillingStatement(Model):
 
 
 class JobBillingStatement(Model):
-    job_id = CharField(null=False, max_length=32, blank=True, default="")
+    job_id = CharField(null=False, max_length=32, blank=True, default="",
+                       db_index=True)
     job_name = CharField(null=False, max_length=128, blank=True, default="")
     scheduler_id = CharField(null=False, max_length=32, blank=True,
                              default="", db_index=True)
@@ -83,6 +84,39 @@ class JobBillingStatement(Model):
     update_time = DateTimeField(auto_now=True)
 
 
+class DailyBillingSummary(Model):
+    billing_date = DateField(null=False)
+    username = CharField(max_length=32, db_index=True)
+    bill_group_id = IntegerField()
+    bill_group_name = CharField(max_length=32)
+    job_count = IntegerField(null=False, default=0)
+    month_job_count = IntegerField(
+        null=False, default=0,
+        help_text='jobs charged for the first time of the month'
+    )
+    runtime = BigIntegerField(null=False, default=0,
+                              help_text='unit: second')
+    cpu_count = FloatField(null=False, default=0,
+                           help_text='unit:core*hour')
+    cpu_cost = FloatField(null=False, default=0)
+    memory_count = FloatField(null=False, default=0,
+                              help_text='unit:MB*hour')
+    memory_cost = FloatField(null=False, default=0)
+    gres_count = JSONField(null=False, default=dict)
+    gres_cost = JSONField(null=False, default=dict)
+    job_billing_cost = FloatField(null=False, default=0)
+    storage_count = FloatField(null=False, default=0,
+                               help_text='unit:GB')
+    storage_cost = FloatField(null=False, default=0)
+    storage_billing_cost = FloatField(null=False, default=0)
+    last_billing_time = DateTimeField(null=True)
+    create_time = DateTimeField(auto_now_add=True)
+    update_time = DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('billing_date', 'username', 'bill_group_id')
+
+
 class BillGroup(Model):
     HOUR = "hour"
     MINUTE = "minute"
@@ -23,7 +23,6 @@ from dateutil.tz import tzoffset
 from django.db import transaction
 from django.db.models import ExpressionWrapper, F, FloatField, Sum
 from django.http import StreamingHttpResponse
-from pandas import DataFrame
 from rest_framework.exceptions import PermissionDenied
 from rest_framework.response import Response
 from rest_framework.status import HTTP_403_FORBIDDEN
@@ -36,8 +35,12 @@ from lico.core.contrib.views import APIView
 from ..exceptions import (
     InvalidParameterException, QueryBillingStatementFailedException,
 )
+from ..helpers.billing_summary_helper import get_summary_date
 from ..helpers.expense_report_helper import ExpenseReportExporter
-from ..models import Gresource, JobBillingStatement, StorageBillingStatement
+from ..models import (
+    DailyBillingSummary, Gresource, JobBillingStatement,
+    StorageBillingStatement,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -270,33 +273,30 @@ class ConsumeRankingView(APIView):
     permission_classes = (AsOperatorRole,)
 
     @staticmethod
-    def union_job_storage_bill_list(job_bill_query, storage_bill_query):
-        union_query = job_bill_query.values('submitter').annotate(
-            user_name=F('submitter'),
-            costs=Sum('billing_cost')
-        ).values_list(
-            'user_name',
-            'costs'
-        ).union(storage_bill_query.values('username').annotate(
-            user_name=F('username'),
-            costs=Sum('billing_cost')
-        ).values_list('user_name', 'costs'), all=True)
-
-        return list(union_query)
-
-    @staticmethod
-    def consume_aggregate(union_list):
+    def consume_ranking(start_date, end_date, value_type, values):
         """
-        :param union_list:[
-        ('user1', 2), ('user1', 5), ('user2', 4), ('user3', 10)...
-        ]
         :return:[['user3', 10], ['user1', 7], ['user2', 4]...]
         """
-        t_list = DataFrame(union_list).groupby(0).sum().to_records()
-        rank_list = [list(i) for i in t_list]
-        rank_list.sort(key=lambda x: (x[1], x[0]), reverse=True)
+        summary_query = DailyBillingSummary.objects.filter(
+            billing_date__gte=get_summary_date(start_date),
+            billing_date__lt=get_summary_date(end_date)
+        )
+        if not values:
+            pass
+        elif value_type == 'username':
+            summary_query = summary_query.filter(username__in=values)
+        else:
+            summary_query = summary_query.filter(bill_group_id__in=values)
 
-        return rank_list
+        return [
+            list(rank) for rank in summary_query.values('username').annotate(
+                costs=Sum(
+                    F('job_billing_cost') + F('storage_billing_cost')
+                )
+            ).order_by('-costs', '-username').values_list(
+                'username', 'costs'
+            )
+        ]
 
     @json_schema_validate({
         "type": "object",
@@ -339,23 +339,13 @@ class ConsumeRankingView(APIView):
         start_date, end_date = date_string_to_utctime(
             args['start_date'], args['end_date']
         )
-        value_type = args['filter']['value_type']
-        values = args['filter']['values']
-        job_bill_query, storage_bill_query = filter_by_date_range(
-            start_date, end_date
-        )
-        job_bill_query, storage_bill_query = filter_by_values(
-            value_type, values, job_bill_query, storage_bill_query
+        rank_list = self.consume_ranking(
+            start_date, end_date,
+            args['filter']['value_type'], args['filter']['values']
         )
-
-        if not job_bill_query.exists() and not storage_bill_query.exists():
+        if not rank_list:
             return Response({})
 
-        union_list = self.union_job_storage_bill_list(
-            job_bill_query, storage_bill_query
-        )
-        rank_list = self.consume_aggregate(union_list)
-
         data = {
             'total': len(rank_list[:10:]),
             'data': rank_list[:10:]
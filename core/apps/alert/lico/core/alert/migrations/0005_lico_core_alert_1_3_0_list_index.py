@@ -0,0 +1,36 @@
+# Copyright 2015-present Lenovo
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('alert', '0004_lico_core_alert_1_3_0'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='alert',
+            index=models.Index(
+                fields=['status', 'create_time'],
+                name='alert_alert_status_6c3f4b_idx'
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='alert',
+            index=models.Index(
+                fields=['node'], name='alert_alert_node_ada275_idx'
+            ),
+        ),
+    ]
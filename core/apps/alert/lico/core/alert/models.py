@@ -128,3 +128,9 @@ class Alert(Model):
         max_length=20, choices=STATUS_CHOICES, default=PRESENT)
     create_time = DateTimeField(auto_now_add=True, db_index=True)
     comment = models.TextField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'create_time']),
+            models.Index(fields=['node']),
+        ]
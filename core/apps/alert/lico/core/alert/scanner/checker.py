@@ -14,7 +14,7 @@
 
 import json
 import logging
-from collections import defaultdict
+from itertools import groupby
 
 from ..models import Policy
 from .datasource import DataSource
@@ -47,40 +47,46 @@ class AlertCheck(object):
             policys = Policy.objects.filter(
                 metric_policy=policy_name,
                 status=Policy.ON
-            )
+            ).order_by('duration', 'id')
         return policys
 
+    @staticmethod
+    def _hardware_info(policy, targets):
+        if policy.metric_policy != Policy.HARDWARE_DISCOVERY \
+                or targets.empty:
+            return {}
+        return {
+            node: json.loads(val)
+            for node, val in zip(targets['node'], targets['val'])
+        }
+
     @classmethod
-    def _alarm(cls, policy):
-        targets = DataSource(policy).get_data()
-        alarm_list = Judge(targets, policy).compare()
-        alarm_data = dict(
-            policy_id=policy.id
-        )
-        policy_name = Policy.objects.get(id=policy.id).metric_policy
-        hardware_info = defaultdict(dict)
-        # if policy_name == 'HARDWARE_DISCOVERY' and targets:
-        import pandas as pd
-        if policy_name == 'HARDWARE_DISCOVERY' \
-                and isinstance(targets, pd.DataFrame) \
-                and targets.empty is False:
-            host = targets.to_dict()['node']
-            val = targets.to_dict()['val']
-            for key, values in host.items():
-                hardware_info[values].update(json.loads(val[key]))
-        if alarm_list:
-            from ..tasks import create_alert
-            for alarm in alarm_list:
-                alarm_data["node"] = alarm["node"]
-                idx = alarm.get("index")
-                alarm_data["index"] = idx if idx else None
-                alarm_data["comment"] = hardware_info.get(alarm["node"])
-                create_alert.delay(alarm_data)
-        else:
-            logging.info("No alarm object needs to trigger an alarm")
+    def _alarm(cls, policy, targets):
+        hardware_info = cls._hardware_info(policy, targets)
+        return [
+            dict(
+                policy_id=policy.id,
+                node=alarm["node"],
+                index=alarm.get("index") or None,
+                comment=hardware_info.get(alarm["node"])
+            )
+            for alarm in Judge(targets, policy).compare()
+        ]
 
     @classmethod
     def checker(cls, metric):
-        policys = cls._get_policys(metric)
-        for policy in policys:
-            cls._alarm(policy)
+        alarm_data_list = []
+        for duration, policys in groupby(
+                cls._get_policys(metric), key=lambda p: p.duration
+        ):
+            policys = list(policys)
+            targets = DataSource(
+                policys[0].metric_policy, duration.total_seconds()
+            ).get_data()
+            for policy in policys:
+                alarm_data_list += cls._alarm(policy, targets)
+        if alarm_data_list:
+            from ..tasks import create_alerts
+            create_alerts.delay(alarm_data_list)
+        else:
+            logger.info("No alarm object needs to trigger an alarm")
@@ -19,139 +19,103 @@ from django.conf import settings
 from lico.core.contrib.client import Client
 
 from ..models import Policy
-from .base import Base
 
 logger = logging.getLogger(__name__)
 
-METHOD_MAPPING = {
-    Policy.CPUSAGE: "_get_cpu",
-    Policy.MEMORY_UTIL: "_get_memory_util",
-    Policy.DISK: "_get_disk",
-    Policy.NODE_ACTIVE: "_get_node_active",
-    Policy.ELECTRIC: "_get_energy",
-    Policy.TEMP: "_get_temp",
-    Policy.HARDWARE: "_get_hardware_health",
-    Policy.GPU_UTIL: "_get_gpu_util",
-    Policy.GPU_TEMP: "_get_gpu_temp",
-    Policy.GPU_MEM: "_get_gpu_mem",
-    Policy.HARDWARE_DISCOVERY: "_get_hardware_dis"
+NODE_METRIC = 'node_metric'
+GPU_METRIC = 'gpu_metric'
+
+# metric policy -> (measurement, metric, aggregation)
+METRIC_MAPPING = {
+    Policy.CPUSAGE: (NODE_METRIC, 'cpu_util', 'range'),
+    Policy.MEMORY_UTIL: (NODE_METRIC, 'memory_util', 'range'),
+    Policy.DISK: (NODE_METRIC, 'disk_util', 'range'),
+    Policy.NODE_ACTIVE: (NODE_METRIC, 'node_active', 'distinct'),
+    Policy.ELECTRIC: (NODE_METRIC, 'node_power', 'range'),
+    Policy.TEMP: (NODE_METRIC, 'node_temp', 'range'),
+    Policy.HARDWARE: (NODE_METRIC, 'node_health', 'distinct'),
+    Policy.GPU_UTIL: (GPU_METRIC, 'gpu_util', 'range'),
+    Policy.GPU_TEMP: (GPU_METRIC, 'gpu_temp', 'range'),
+    Policy.GPU_MEM: (GPU_METRIC, 'gpu_mem_usage', 'range'),
+    Policy.HARDWARE_DISCOVERY: (
+        NODE_METRIC, 'hardware_discovery', 'last'
+    ),
 }
 
+# values are written as strings, which influxdb cannot max()/min(), so
+# range metrics are pulled raw and reduced after casting them to float
+SELECTORS = {
+    'range': 'value as val',
+    'distinct': 'distinct(value) as val',
+    'last': 'last(value) as val',
+}
 
-class DataSource(Base):
-    def __init__(self, policy):
-        super().__init__(policy)
-        self._caller = getattr(self, METHOD_MAPPING[policy.metric_policy])
-
-    def _get_common_data(self, sql):
-        client = Client().influxdb_client()
-        from pandas import DataFrame as df
-        result = client.query(sql).get_points()
-        df_result = df.from_records(result)
-        if self._nodes and 'node' in df_result.columns:
-            df_result = df_result[df_result['node'].isin(self._nodes)]
-        return df_result
-
-    def _get_cpu(self):  # nosec B608
-        sql = f"select host as node, value as val " \
-              f"from node_metric " \
-              f"where metric='cpu_util' and " \
-              f"time > now() - {self._duration}s " \
-              f"group by host"
-
-        return self._get_common_data(sql)
-
-    def _get_memory_util(self):  # nosec B608
-        sql = f"select host as node, value as val " \
-              f"from node_metric " \
-              f"where metric='memory_util' and " \
-              f"time > now() - {self._duration}s " \
-              f"group by host"
-
-        return self._get_common_data(sql)
-
-    def _get_disk(self):  # nosec B608
-        sql = f"select host as node, value as val " \
-              f"from node_metric " \
-              f"where metric='disk_util' and " \
-              f"time > now() - {self._duration}s " \
-              f"group by host"
-        return self._get_common_data(sql)
-
-    def _get_energy(self):  # nosec B608
-        sql = f"select host as node, value as val " \
-              f"from node_metric " \
-              f"where metric='node_power' and " \
-              f"time > now() - {self._duration}s " \
-              f"group by host"
-        return self._get_common_data(sql)
-
-    def _get_temp(self):  # nosec B608
-        sql = f"select host as node, value as val " \
-              f"from node_metric " \
-              f"where metric='node_temp' and " \
-              f"time > now() - {self._duration}s " \
-              f"group by host"
-        return self._get_common_data(sql)
-
-    def _get_gpu_util(self):  # nosec B608
-        sql = f"select host as node, value as val, index " \
-              f"from gpu_metric " \
-              f"where metric='gpu_util' and " \
-              f"time > now() - {self._duration}s " \
-              f"group by host"
-        data = self._get_common_data(sql)
-        return self._exclude_mig_device(data)
-
-    def _get_gpu_temp(self):  # nosec B608
-        sql = f"select host as node, value as val, index " \
-              f"from gpu_metric " \
-              f"where metric='gpu_temp' and " \
-              f"time > now() - {self._duration}s " \
-              f"group by host"
-        return self._get_common_data(sql)
-
-    def _get_gpu_mem(self):  # nosec B608
-        sql = f"select host as node, value as val, index " \
-              f"from gpu_metric " \
-              f"where metric='gpu_mem_usage' and " \
-              f"time > now() - {self._duration}s " \
-              f"group by host"
-        data = self._get_common_data(sql)
-        return self._exclude_mig_device(data)
-
-    def _get_hardware_health(self):  # nosec B608
-        sql = f"select host as node, value as val " \
-              f"from node_metric " \
-              f"where metric='node_health' and " \
-              f"time > now() - {self._duration}s " \
-              f"group by host"
-        return self._get_common_data(sql)
-
-    def _get_node_active(self):  # nosec B608
-        sql = f"select host as node, value as val " \
-              f"from node_metric " \
-              f"where metric='node_active' and " \
-              f"time > now() - {self._duration}s " \
-              f"group by host"
-        return self._get_common_data(sql)
-
-    def _get_hardware_dis(self):  # nosec B608
-        sql = f"select host as node, LAST(value) as val " \
-              f"from node_metric " \
-              f"where metric='hardware_discovery' and " \
-              f"time > now() - {self._duration}s " \
-              f"group by host"
-        return self._get_common_data(sql)
+MIG_EXCLUDED_POLICIES = {Policy.GPU_UTIL, Policy.GPU_MEM}
+
+
+class DataSource(object):
+    """
+    Aggregated samples of one metric over the last ``duration`` seconds,
+    one row per host (and GPU index), shared by every policy watching
+    that metric.
+
+    Range metrics come back with ``max``/``min`` columns, the others
+    with a ``val`` column.
+    """
+
+    def __init__(self, metric_policy, duration):
+        self._metric_policy = metric_policy
+        self._duration = int(duration)
+        self._measurement, self._metric, self._aggregation = \
+            METRIC_MAPPING[metric_policy]
+        self._tags = ['host', 'index'] \
+            if self._measurement == GPU_METRIC else ['host']
+
+    @property
+    def columns(self):
+        columns = ['node', 'index'] if 'index' in self._tags else ['node']
+        if self._aggregation == 'range':
+            return columns + ['max', 'min']
+        return columns + ['val']
+
+    def _sql(self):  # nosec B608
+        return f"select {SELECTORS[self._aggregation]} " \
+               f"from {self._measurement} " \
+               f"where metric='{self._metric}' and " \
+               f"time > now() - {self._duration}s " \
+               f"group by {','.join(self._tags)}"
+
+    def _to_frame(self, result):
+        from pandas import DataFrame, concat
+
+        frames = []
+        for series in result.raw.get('series', []):
+            frame = DataFrame(
+                series.get('values', []), columns=series['columns']
+            )
+            for tag in self._tags:
+                frame[tag] = series.get('tags', {}).get(tag)
+            frames.append(frame)
+        if not frames:
+            return DataFrame(columns=self.columns)
+        data = concat(frames, ignore_index=True).rename(
+            columns={'host': 'node'}
+        )
+        if self._aggregation == 'range':
+            data['val'] = data['val'].astype(float)
+            data = data.groupby(
+                self.columns[:-2], sort=False
+            )['val'].agg(['max', 'min']).reset_index()
+        return data[self.columns]
 
     def _exclude_mig_device(self, data):
-        monitor_client = Client().monitor_client()
-        node_info = monitor_client.get_cluster_resource()
+        from pandas import DataFrame
+
         node_set = set(data['node'])
-        for info in node_info:
+        mig_devices = []
+        for info in Client().monitor_client().get_cluster_resource():
             if info.hostname not in node_set:
                 continue
-            node_required = data['node'].map(lambda x: x == info.hostname)
             for gpu_info in info.data.get(
                     f'{settings.ALERT.Gpu}_mig_mode', []):
                 if gpu_info.usage:
@@ -159,13 +123,20 @@ class DataSource(Base):
                         f"Skip the GPU {gpu_info.index}"
                         f" with MIG enabled on node {info.hostname}."
                     )
-                    gpu_index_required = data[
-                        'index'].map(lambda x: x == str(gpu_info.index))
-                    data.drop(
-                        index=data[node_required & gpu_index_required].index,
-                        inplace=True
-                        )
-        return data
+                    mig_devices.append((info.hostname, str(gpu_info.index)))
+        if not mig_devices:
+            return data
+        merged = data.merge(
+            DataFrame(mig_devices, columns=['node', 'index']),
+            on=['node', 'index'], how='left', indicator=True
+        )
+        return merged.loc[
+            merged['_merge'] == 'left_only', self.columns
+        ].reset_index(drop=True)
 
     def get_data(self):
-        return self._caller()
+        client = Client().influxdb_client()
+        data = self._to_frame(client.query(self._sql()))
+        if self._metric_policy in MIG_EXCLUDED_POLICIES and not data.empty:
+            data = self._exclude_mig_device(data)
+        return data
@@ -15,6 +15,8 @@
 from ..models import Policy
 from .base import Base
 
+NORMAL_STATES = {'on', 'ok', 'null'}
+
 
 class Judge(Base):
     def __init__(self, datas, policy):
@@ -22,52 +24,36 @@ class Judge(Base):
         self._datas = datas
 
     def _gen_alarm_list(self, targets):
-        if "index" in targets.columns:
-            return targets.loc[:, ['node', 'index']]\
-                .drop_duplicates().to_dict(orient='records')
+        columns = ['node', 'index'] if 'index' in targets.columns \
+            else ['node']
+        return targets.loc[:, columns]\
+            .drop_duplicates().to_dict(orient='records')
+
+    def _node_mask(self):
+        nodes = self._nodes
+        if nodes:
+            return self._datas['node'].isin(nodes)
+        return True
+
+    def _state_mask(self):
+        if self._policy.metric_policy == Policy.HARDWARE_DISCOVERY:
+            states = self._datas['val']
         else:
-            return targets.loc[:, ['node']]\
-                .drop_duplicates().to_dict(orient='records')
+            states = self._datas['val'].map(self.get_health)
+        return ~states.isin(NORMAL_STATES)
 
     def compare(self):
+        if self._datas.empty:
+            return []
         if 'val' in self._datas.columns:
-            if len(self._datas.val.to_list()) > 0:
-                if self._aggregate == "max":
-                    self._datas['val'] = self._datas['val'].astype(float)
-                    df_max = self._datas.groupby('node').max().reset_index()
-                    targets = df_max.loc[df_max.val <= self._val, :]
-                    return self._gen_alarm_list(targets)
-                elif self._aggregate == "min":
-                    self._datas['val'] = self._datas['val'].astype(float)
-                    df_min = self._datas.groupby('node').min().reset_index()
-                    targets = df_min.loc[df_min.val >= self._val, :]
-                    return self._gen_alarm_list(targets)
-                else:
-                    if self._policy.metric_policy == Policy.NODE_ACTIVE or \
-                            self._policy.metric_policy == Policy.HARDWARE:
-                        targets = self._datas.loc[:, ['node', 'val']]\
-                            .drop_duplicates()
-                        targets['val'] = targets.apply(
-                            lambda x: self.get_health(x.val), axis=1
-                        )
-                        val_set = set(targets.val.to_list())
-                        normal_set = {'on', 'ok', 'null'}
-                        df_alert = targets[targets['val'].isin(
-                            val_set.difference(normal_set)
-                        )]
-                        return self._gen_alarm_list(df_alert)
-                    elif self._policy.metric_policy == \
-                            Policy.HARDWARE_DISCOVERY:
-                        targets = self._datas.loc[:, ['node', 'val']] \
-                            .drop_duplicates()
-                        val_set = set(targets.val.to_list())
-                        normal_set = {'on', 'ok', 'null'}
-                        df_alert = targets[targets['val'].isin(
-                            val_set.difference(normal_set)
-                        )]
-                        return self._gen_alarm_list(df_alert)
-
-        return []
+            mask = self._state_mask()
+        elif self._aggregate == "max":
+            mask = self._datas['max'] <= self._val
+        elif self._aggregate == "min":
+            mask = self._datas['min'] >= self._val
+        else:
+            return []
+        return self._gen_alarm_list(self._datas[mask & self._node_mask()])
 
     @staticmethod
     def get_health(health):
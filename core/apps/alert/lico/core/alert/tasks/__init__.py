@@ -13,7 +13,7 @@
 # limitations under the License.
 
 from ..tasks.agent_tasks import email, script
-from ..tasks.creator_tasks import create_alert
+from ..tasks.creator_tasks import create_alert, create_alerts
 from ..tasks.scanner_tasks import (
     cpu_scanner, disk_scanner, energy_scanner, gpu_mem_scanner,
     gpu_temp_scanner, gpu_util_scanner, hardware_dis_scanner, hardware_scanner,
@@ -23,5 +23,6 @@ from ..tasks.scanner_tasks import (
 __all__ = ['cpu_scanner', 'memory_scanner', 'disk_scanner', 'energy_scanner',
            'temp_scanner', 'hardware_scanner', 'node_active',
            'gpu_mem_scanner', 'gpu_util_scanner', 'gpu_temp_scanner',
-           'create_alert', 'script', 'email', 'hardware_dis_scanner'
+           'create_alert', 'create_alerts', 'script', 'email',
+           'hardware_dis_scanner'
            ]
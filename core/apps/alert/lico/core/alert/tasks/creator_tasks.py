@@ -33,26 +33,44 @@ class AlertNoticeBroker(object):
                 func(alert)
 
 
+def _create_alert(alert_data):
+    policy = Policy.objects.select_for_update().get(
+        id=alert_data["policy_id"], status=Policy.STATUS_CHOICES[0][0]
+    )
+    alert_data["policy"] = policy
+    comment_val = alert_data.pop('comment', None)
+    query = Alert.objects.filter(**alert_data).exclude(
+        status='resolved'
+    )
+    if comment_val:
+        alert_data['comment'] = comment_val
+    if not query.exists():
+        alert = Alert.objects.create(**alert_data)
+        AlertNoticeBroker().handle(alert)
+
+
 @app.task(ignore_result=True)
 @atomic
 def create_alert(alert_data):
     policy_id = alert_data.get("policy_id", None)
     if policy_id is not None:
         try:
-            policy = Policy.objects.select_for_update().get(
-                id=policy_id, status=Policy.STATUS_CHOICES[0][0]
-            )
-            alert_data["policy"] = policy
-            comment_val = alert_data.pop('comment', None)
-            query = Alert.objects.filter(**alert_data).exclude(
-                status='resolved'
-            )
-            if comment_val:
-                alert_data['comment'] = comment_val
-            if not query.exists():
-                alert = Alert.objects.create(**alert_data)
-                AlertNoticeBroker().handle(alert)
-
+            _create_alert(alert_data)
         except Exception:
             logger.exception("Get Policy failed.")
             raise
+
+
+@app.task(ignore_result=True)
+def create_alerts(alert_data_list):
+    for alert_data in alert_data_list:
+        if alert_data.get("policy_id", None) is None:
+            continue
+        try:
+            with atomic():
+                _create_alert(alert_data)
+        except Exception:
+            logger.exception(
+                "Create alert failed for policy %s on node %s.",
+                alert_data["policy_id"], alert_data.get("node")
+            )
@@ -32,6 +32,9 @@ logger = logging.getLogger(__name__)
 
 class AlertView(DataTableView):
     permission_classes = (AsOperatorRole,)
+    keyset_pagination = True
+    count_limit = 10000
+    prefix_search = True
 
     def get_query(self, request, *args, **kwargs):
         return Alert.objects
@@ -77,11 +80,12 @@ class AlertView(DataTableView):
             props = search['props']
             keyword = search['keyword']
 
+            lookup = '__istartswith' if self.prefix_search else '__icontains'
             q = Q()
             for field in props:
                 prop = self.columns_mapping[field] \
                     if field in self.columns_mapping else field
-                q |= Q(**{prop + '__icontains': keyword})
+                q |= Q(**{prop + lookup: keyword})
 
             return query.filter(q) if keyword != "" else query
 
@@ -0,0 +1,93 @@
+# Copyright 2015-present Lenovo
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from types import SimpleNamespace
+from unittest import mock
+
+import pytest
+
+from lico.core.alert.models import Policy
+from lico.core.alert.scanner.datasource import DataSource
+
+
+def _series(tags, values):
+    return {
+        'name': 'metric',
+        'tags': tags,
+        'columns': ['time', 'val'],
+        'values': [
+            [f'2023-01-01T00:00:0{i}Z', value]
+            for i, value in enumerate(values)
+        ],
+    }
+
+
+@pytest.fixture
+def influxdb():
+    with mock.patch(
+            'lico.core.alert.scanner.datasource.Client'
+    ) as client:
+        yield client.return_value.influxdb_client.return_value
+
+
+def test_range_metric_reduces_string_values(influxdb):
+    # summary writes the metric values as strings
+    influxdb.query.return_value = SimpleNamespace(raw={'series': [
+        _series({'host': 'c1'}, ['10.5', '90', '9.25']),
+        _series({'host': 'c2'}, ['50']),
+    ]})
+
+    data = DataSource(Policy.CPUSAGE, 60).get_data()
+
+    sql = influxdb.query.call_args[0][0]
+    assert 'max(' not in sql and 'min(' not in sql
+    assert list(data.columns) == ['node', 'max', 'min']
+    assert data.set_index('node').to_dict('index') == {
+        'c1': {'max': 90.0, 'min': 9.25},
+        'c2': {'max': 50.0, 'min': 50.0},
+    }
+
+
+def test_gpu_range_metric_is_reduced_per_index(influxdb):
+    influxdb.query.return_value = SimpleNamespace(raw={'series': [
+        _series({'host': 'g1', 'index': '0'}, ['30', '70']),
+        _series({'host': 'g1', 'index': '1'}, ['5']),
+    ]})
+
+    data = DataSource(Policy.GPU_TEMP, 60).get_data()
+
+    assert list(data.columns) == ['node', 'index', 'max', 'min']
+    assert data.values.tolist() == [
+        ['g1', '0', 70.0, 30.0],
+        ['g1', '1', 5.0, 5.0],
+    ]
+
+
+def test_range_metric_without_samples(influxdb):
+    influxdb.query.return_value = SimpleNamespace(raw={})
+
+    data = DataSource(Policy.MEMORY_UTIL, 60).get_data()
+
+    assert data.empty
+    assert list(data.columns) == ['node', 'max', 'min']
+
+
+def test_distinct_metric_keeps_string_values(influxdb):
+    influxdb.query.return_value = SimpleNamespace(raw={'series': [
+        _series({'host': 'c1'}, ['on', 'off']),
+    ]})
+
+    data = DataSource(Policy.NODE_ACTIVE, 60).get_data()
+
+    assert data.values.tolist() == [['c1', 'on'], ['c1', 'off']]
@@ -13,6 +13,7 @@
 # limitations under the License.
 
 import sys
+from os import path
 from typing import List
 
 from django.conf import LazySettings
@@ -48,6 +49,11 @@ class Application(AbstractApplication):
             module.CONTAINER.setdefault(
                 'AI_CONTAINER_ROOT', '/home/lico/container'
             )
+            module.CONTAINER.setdefault(
+                'IMAGE_STORE',
+                path.join(module.CONTAINER['AI_CONTAINER_ROOT'], '.store')
+            )
+            module.CONTAINER.setdefault('IMAGE_COPY_TIME_LIMIT', 3600)
 
     def on_prepare(self, settings):
         if settings.LICO.ARCH == 'host':
@@ -0,0 +1,304 @@
+# Copyright 2015-present Lenovo
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import errno
+import hashlib
+import logging
+import os
+import tempfile
+import time
+from os import path
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 8 * 1024 * 1024
+FICLONE = 0x40049409
+BLOB_MODE = 0o644
+PROGRESS_INTERVAL = 1
+
+
+class _Progress(object):
+    def __init__(self, callback, total):
+        self.callback = callback
+        self.total = total
+        self.done = 0
+        self._reported = 0
+
+    def update(self, size):
+        self.done += size
+        now = time.monotonic()
+        if self.callback is not None and \
+                now - self._reported >= PROGRESS_INTERVAL:
+            self._reported = now
+            self.callback(self.done, self.total)
+
+
+def _reflink(src_fd, dst_fd):
+    import fcntl
+    try:
+        fcntl.ioctl(dst_fd, FICLONE, src_fd)
+    except OSError:
+        return False
+    return True
+
+
+def _copy_file_range(src_fd, dst_fd, size, progress):
+    copy_file_range = getattr(os, 'copy_file_range', None)
+    if copy_file_range is None:
+        return False
+    offset = 0
+    while offset < size:
+        try:
+            copied = copy_file_range(
+                src_fd, dst_fd, min(size - offset, 1 << 30)
+            )
+        except OSError as e:
+            if offset == 0 and e.errno in (
+                    errno.EXDEV, errno.ENOSYS, errno.EINVAL,
+                    errno.EOPNOTSUPP
+            ):
+                return False
+            raise
+        if not copied:
+            break
+        offset += copied
+        progress.update(copied)
+    return True
+
+
+def _sendfile(src_fd, dst_fd, size, progress):
+    offset = 0
+    while offset < size:
+        sent = os.sendfile(dst_fd, src_fd, offset, min(size - offset, 1 << 30))
+        if not sent:
+            break
+        offset += sent
+        progress.update(sent)
+
+
+def copy_file(src, dst, progress=None, reflink_only=False):
+    """
+    Copy ``src`` to the new file ``dst`` without moving the data through
+    user space: a reflink where the filesystem supports it, otherwise
+    copy_file_range, otherwise sendfile. With ``reflink_only``, give up
+    and return None if no reflink can be made.
+    """
+    with open(src, 'rb') as fsrc, open(dst, 'xb') as fdst:
+        src_fd, dst_fd = fsrc.fileno(), fdst.fileno()
+        if _reflink(src_fd, dst_fd):
+            return 'reflink'
+        if not reflink_only:
+            size = os.fstat(src_fd).st_size
+            if not isinstance(progress, _Progress):
+                progress = _Progress(progress, size)
+            if _copy_file_range(src_fd, dst_fd, size, progress):
+                return 'copy_file_range'
+            _sendfile(src_fd, dst_fd, size, progress)
+            return 'sendfile'
+    os.unlink(dst)
+    return None
+
+
+class ImageStore(object):
+    """
+    Content addressed store of image files, one blob per sha256 digest.
+
+    Blobs are owned by root, and the store directory is only accessible
+    by root, so private images stored here stay private. Blobs are also
+    indexed by size, so an upload whose size matches no blob is hashed
+    while it is copied in, and the others are hashed before anything is
+    written.
+    """
+
+    def __init__(self, root):
+        self.root = root
+
+    def blob_path(self, digest):
+        return path.join(self.root, 'sha256', digest[:2], digest)
+
+    def _size_path(self, size, digest=''):
+        return path.join(self.root, 'size', str(size), digest)
+
+    def _ensure_dir(self, dirname):
+        os.makedirs(self.root, mode=0o700, exist_ok=True)
+        os.makedirs(dirname, exist_ok=True)
+        return dirname
+
+    def _has_size(self, size):
+        try:
+            return bool(os.listdir(self._size_path(size)))
+        except FileNotFoundError:
+            return False
+
+    def ingest(self, src, progress=None):
+        """
+        Add the content of ``src`` to the store, return its digest and
+        whether the blob was created by this call. Identical content is
+        only stored once.
+        """
+        size = os.stat(src).st_size
+        if not self._has_size(size):
+            return self._copy_in(src, size, progress)
+
+        progress = _Progress(progress, 2 * size)
+        with open(src, 'rb', buffering=0) as fsrc:
+            digest = self._hash(fsrc, None, progress)
+        if path.isfile(self.blob_path(digest)):
+            logger.info('Image %s is already stored as %s', src, digest)
+            return digest, False
+
+        tmp = self._mktemp()
+        try:
+            os.unlink(tmp)
+            copy_file(src, tmp, progress)
+            return digest, self._commit(tmp, digest, size)
+        except BaseException:
+            if path.exists(tmp):
+                os.unlink(tmp)
+            raise
+
+    def _mktemp(self):
+        fd, tmp = tempfile.mkstemp(
+            dir=self._ensure_dir(path.join(self.root, 'tmp'))
+        )
+        os.close(fd)
+        return tmp
+
+    def _copy_in(self, src, size, progress):
+        # hash chunk by chunk while copying
+        tmp = self._mktemp()
+        try:
+            with open(src, 'rb', buffering=0) as fsrc, \
+                    open(tmp, 'wb', buffering=0) as fdst:
+                progress = _Progress(progress, size)
+                if _reflink(fsrc.fileno(), fdst.fileno()):
+                    digest = self._hash(fsrc, None, progress)
+                else:
+                    digest = self._hash(fsrc, fdst, progress)
+            return digest, self._commit(tmp, digest, size)
+        except BaseException:
+            if path.exists(tmp):
+                os.unlink(tmp)
+            raise
+
+    def _commit(self, tmp, digest, size):
+        blob = self.blob_path(digest)
+        if path.isfile(blob):
+            os.unlink(tmp)
+            return False
+        os.chmod(tmp, BLOB_MODE)
+        self._ensure_dir(path.dirname(blob))
+        os.rename(tmp, blob)
+        self._ensure_dir(self._size_path(size))
+        with open(self._size_path(size, digest), 'w'):
+            pass
+        return True
+
+    @staticmethod
+    def _hash(fsrc, fdst, progress):
+        sha256 = hashlib.sha256()
+        buf = bytearray(CHUNK_SIZE)
+        view = memoryview(buf)
+        while True:
+            size = fsrc.readinto(buf)
+            if not size:
+                break
+            sha256.update(view[:size])
+            if fdst is not None:
+                written = 0
+                while written < size:
+                    written += fdst.write(view[written:size])
+            progress.update(size)
+        return sha256.hexdigest()
+
+    def place(self, digest, target, hardlink=False, prepare=None,
+              owned=False):
+        """
+        Materialize the blob at ``target``: a hardlink if allowed,
+        otherwise a reflink, otherwise a copy through ``copy_file``. A
+        blob ``owned`` by this image that cannot be shared is moved
+        instead of copied. ``prepare`` is called on the file before it
+        is atomically renamed to ``target``.
+        """
+        tmp = path.join(
+            path.dirname(target),
+            f'.{path.basename(target)}.{os.getpid()}.tmp'
+        )
+        if path.lexists(tmp):
+            os.unlink(tmp)
+        try:
+            method = self._materialize(digest, tmp, hardlink, owned)
+            if prepare is not None:
+                prepare(tmp)
+            os.rename(tmp, target)
+        except BaseException:
+            if path.lexists(tmp):
+                os.unlink(tmp)
+            raise
+        logger.info('Place image %s at %s by %s', digest, target, method)
+        return method
+
+    def _materialize(self, digest, dst, hardlink, owned):
+        blob = self.blob_path(digest)
+        if hardlink:
+            try:
+                os.link(blob, dst)
+                return 'hardlink'
+            except OSError as e:
+                logger.info('Fail to hardlink %s: %s', blob, e)
+        method = copy_file(blob, dst, reflink_only=owned)
+        if method is None:
+            method = self._move_out(digest, dst)
+        return method
+
+    def _move_out(self, digest, dst):
+        blob = self.blob_path(digest)
+        try:
+            os.rename(blob, dst)
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                raise
+            return copy_file(blob, dst)
+        self._unlink_size(digest, os.stat(dst).st_size)
+        return 'move'
+
+    def _unlink_size(self, digest, size):
+        try:
+            os.unlink(self._size_path(size, digest))
+        except FileNotFoundError:
+            pass
+
+    def release(self, digest):
+        blob = self.blob_path(digest)
+        try:
+            size = os.stat(blob).st_size
+        except FileNotFoundError:
+            return
+        os.unlink(blob)
+        self._unlink_size(digest, size)
+        logger.info('Remove unused image %s', digest)
+
+
+def get_image_store():
+    from django.conf import settings
+    return ImageStore(settings.CONTAINER.IMAGE_STORE)
+
+
+def release_unused_image(digest):
+    from .models import SingularityImage
+
+    if digest and not SingularityImage.objects.filter(
+            digest=digest
+    ).exists():
+        get_image_store().release(digest)
@@ -27,6 +27,8 @@ class SingularityImage(Image):
     username = CharField(max_length=32, default="")
     status = IntegerField(
         default=TaskStatus.PENDING.value, choices=task_status)
+    progress = IntegerField(default=0)
+    digest = CharField(max_length=64, null=True, db_index=True)
 
     class Meta:
         unique_together = ('username', 'name')
@@ -12,22 +12,38 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import logging
 import pwd
 import stat
 from os import path
 
+from django.conf import settings
 from py.path import local
 
 from lico.core.base.celery import app
 
+from .image_store import copy_file, get_image_store, release_unused_image
 from .models import SingularityImage
 from .utils import TaskStatus, change_owner, user_image_path
 
+logger = logging.getLogger(__name__)
 
-@app.task(time_limit=600, ignore_result=True)
+
+def _report_progress(image_id):
+    def callback(done, total):
+        SingularityImage.objects.filter(id=image_id).update(
+            progress=min(int(done * 100 / total), 99) if total else 0
+        )
+    return callback
+
+
+@app.task(
+    time_limit=settings.CONTAINER.IMAGE_COPY_TIME_LIMIT, ignore_result=True
+)
 def copy_image(image_id, origin_path):
     image = SingularityImage.objects.get(id=image_id)
     image.status = TaskStatus.STARTED.value
+    image.progress = 0
     image.save()
     username = image.username
     if username != '':
@@ -36,27 +52,46 @@ def copy_image(image_id, origin_path):
         user_path.chown(user.pw_uid, user.pw_gid)
 
     target_path = local(image.image_path)
+    old_digest = image.digest
     try:
-        local(origin_path).copy(target_path)
-        change_owner(image, target_path)
+        store = get_image_store()
+        digest, created = store.ingest(
+            origin_path, progress=_report_progress(image.id)
+        )
+        # system images share owner and mode with the blob
+        store.place(
+            digest, str(target_path), hardlink=username == '',
+            prepare=lambda tmp: change_owner(image, local(tmp)),
+            owned=created
+        )
+        image.digest = digest
+        image.progress = 100
         image.status = TaskStatus.SUCCESS.value
         image.save()
     except Exception:
+        image.digest = None
         image.status = TaskStatus.FAILURE.value
         image.save()
         if target_path.exists():
             target_path.remove()
         raise
+    finally:
+        if old_digest != image.digest:
+            release_unused_image(old_digest)
 
 
-@app.task(time_limit=600, ignore_result=True)
+@app.task(
+    time_limit=settings.CONTAINER.IMAGE_COPY_TIME_LIMIT, ignore_result=True
+)
 def download_image(origin_path, target_path, uid, gid):
     target_path = local(target_path)
     target_basename = path.basename(target_path)
     target_dirname = path.dirname(target_path)
     hide_target_path = local(target_dirname).join(f".{target_basename}")
     try:
-        local(origin_path).copy(hide_target_path)
+        if hide_target_path.exists():
+            hide_target_path.remove()
+        copy_file(origin_path, str(hide_target_path))
         hide_target_path.chown(uid, gid)
         hide_target_path.chmod(stat.S_IRUSR | stat.S_IWUSR)
         hide_target_path.move(target_path)
@@ -33,6 +33,7 @@ from ...exceptions import (
     ImageAlreadyExist, ImageNotReady, TargetFileAlreadyExist,
 )
 from ...views import SearchImageListView
+from ..image_store import release_unused_image
 from ..models import SingularityImage, SingularityImageTag
 from ..utils import TaskStatus
 
@@ -344,6 +345,7 @@ class ImageDetailView(AbstractImageDetailView):
             image_path.remove()
 
         image.delete()
+        release_unused_image(image.digest)
 
         return Response()
 
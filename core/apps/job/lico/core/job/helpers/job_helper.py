@@ -25,6 +25,7 @@ from lico.scheduler.base.tres.trackable_resource_type import (
 from ..base.job_operate_state import JobOperateState
 from ..base.job_state import JobState
 from ..models import JobRunning
+from .running_host_helper import refresh_running_hosts
 from .utils import _tres_list_to_dict, _tres_to_str
 
 logger = logging.getLogger(__name__)
@@ -178,7 +179,7 @@ def _update_job_running(job, scheduler_job_running_list, sync_history=False):
             running.hosts.sort()
 
             if sync_history:
-                JobRunning.objects.update_or_create(
+                job_running, _ = JobRunning.objects.update_or_create(
                     job=job,
                     hosts=",".join(running.hosts),
                     defaults={
@@ -186,6 +187,7 @@ def _update_job_running(job, scheduler_job_running_list, sync_history=False):
                         "allocate_time": job.start_time
                     }
                 )
+                refresh_running_hosts(job_running)
             else:
                 job_running_obj = JobRunning.objects.filter(
                     job=job,
@@ -193,18 +195,23 @@ def _update_job_running(job, scheduler_job_running_list, sync_history=False):
                 )
 
                 if job_running_obj.exists():
-                    job_running_tres = job_running_obj[0].per_host_tres
-                    job_running_obj.update(per_host_tres=_get_updated_tres_str(
-                        job_tres_list=job_running_tres.split(','),
+                    job_running = job_running_obj[0]
+                    per_host_tres = _get_updated_tres_str(
+                        job_tres_list=job_running.per_host_tres.split(','),
                         scheduler_tres_list=per_host_tres_str_list
-                    ))
+                    )
+                    if per_host_tres != job_running.per_host_tres:
+                        job_running_obj.update(per_host_tres=per_host_tres)
+                        job_running.per_host_tres = per_host_tres
+                        refresh_running_hosts(job_running)
                 else:
-                    JobRunning.objects.create(
+                    job_running = JobRunning.objects.create(
                         job=job,
                         hosts=",".join(running.hosts),
                         per_host_tres=','.join(per_host_tres_str_list),
                         allocate_time=job.start_time
                     )
+                    refresh_running_hosts(job_running)
 
 
 def update_history_job_by_scheduler_job(query_job, scheduler_job):
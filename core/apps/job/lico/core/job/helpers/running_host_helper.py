@@ -0,0 +1,51 @@
+# Copyright 2015-present Lenovo
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from typing import Iterable, Union
+
+from ..base.job_state import JobState
+from ..models import JobRunning, JobRunningHost
+from ..utils import convert_tres
+
+
+def build_running_hosts(job_running: JobRunning):
+    tres_counter = convert_tres(job_running.per_host_tres)
+    return [
+        JobRunningHost(
+            job_running=job_running,
+            job_id=job_running.job_id,
+            hostname=hostname.lower(),
+            core_num=tres_counter['core_total_num'],
+            gpu_num=tres_counter['gpu_total_num']
+        )
+        for hostname in job_running.hosts.split(',') if hostname
+    ]
+
+
+def refresh_running_hosts(job_running: JobRunning):
+    JobRunningHost.objects.filter(job_running=job_running).delete()
+    JobRunningHost.objects.bulk_create(build_running_hosts(job_running))
+
+
+def query_running_hosts(hostnames: Union[str, Iterable[str]]):
+    """
+    Running job allocations on the given host(s), one row per job
+    allocation and host, with the job selected alongside.
+    """
+    if isinstance(hostnames, str):
+        hostnames = [hostnames]
+    return JobRunningHost.objects.filter(
+        hostname__in={hostname.lower() for hostname in hostnames},
+        job__state__in=JobState.get_running_state_values()
+    ).select_related('job')
@@ -28,6 +28,10 @@ def get_admin_scheduler():
     return create_scheduler()
 
 
+def _get_cache_ttl():
+    return dict(settings.JOB.get('SCHEDULER_CACHE_TTL', {}))
+
+
 def create_scheduler(user=None):
     username = user.username if user else 'root'
 
@@ -44,7 +48,8 @@ def create_scheduler(user=None):
                 ),
                 memory_retry_interval_second=settings.JOB.SLURM.get(
                     'MEMORY_RETRY_INTERVAL_SECOND', 0.5
-                )
+                ),
+                cache_ttl=_get_cache_ttl()
             )
         )
     if scheduler_code == 'pbs':
@@ -53,7 +58,7 @@ def create_scheduler(user=None):
         )
         return create_pbs_scheduler(
             username,
-            config=PbsConfig()
+            config=PbsConfig(cache_ttl=_get_cache_ttl())
         )
     if scheduler_code == 'lsf':
         from lico.scheduler.adapter.lsf.lsf_config import (
@@ -67,7 +72,8 @@ def create_scheduler(user=None):
                 ),
                 events_file_path=settings.JOB.LSF.get(
                     'EVENTS_FILE_PATH', ""
-                )
+                ),
+                cache_ttl=_get_cache_ttl()
             )
         )
     return None
@@ -0,0 +1,68 @@
+# Copyright 2015-present Lenovo
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+import lico.core.contrib.models
+
+
+def build_running_hosts(apps, schema_editor):
+    from lico.core.job.utils import convert_tres
+
+    JobRunning = apps.get_model('job', 'JobRunning')
+    JobRunningHost = apps.get_model('job', 'JobRunningHost')
+
+    running_hosts = []
+    for job_running in JobRunning.objects.iterator():
+        tres_counter = convert_tres(job_running.per_host_tres)
+        running_hosts.extend(
+            JobRunningHost(
+                job_running_id=job_running.id,
+                job_id=job_running.job_id,
+                hostname=hostname.lower(),
+                core_num=tres_counter['core_total_num'],
+                gpu_num=tres_counter['gpu_total_num']
+            )
+            for hostname in job_running.hosts.split(',') if hostname
+        )
+    JobRunningHost.objects.bulk_create(running_hosts, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('job', '0005_lico_job_1_8_0'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobRunningHost',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hostname', models.CharField(db_index=True, max_length=128)),
+                ('core_num', models.IntegerField(blank=True, default=0)),
+                ('gpu_num', models.FloatField(blank=True, default=0)),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='job_running_host', to='job.Job')),
+                ('job_running', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='running_hosts', to='job.JobRunning')),
+            ],
+            options={
+                'abstract': False,
+            },
+            bases=(models.Model, lico.core.contrib.models.ToDictMixin),
+        ),
+        migrations.RunPython(
+            build_running_hosts, migrations.RunPython.noop
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Copyright 2015-present Lenovo
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('job', '0006_lico_job_1_8_0_running_host'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(
+                fields=['submitter', 'delete_flag', 'submit_time'],
+                name='job_job_submitt_16cfc7_idx'
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(
+                fields=['state', 'delete_flag', 'submit_time'],
+                name='job_job_state_bb7ad8_idx'
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(
+                fields=['delete_flag', 'submit_time'],
+                name='job_job_delete__030b10_idx'
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(
+                fields=['job_name'], name='job_job_job_nam_d9d3e3_idx'
+            ),
+        ),
+    ]
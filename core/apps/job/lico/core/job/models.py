@@ -15,8 +15,8 @@
 from typing import Callable, Dict
 
 from django.db.models import (
-    PROTECT, BooleanField, CharField, ForeignKey, IntegerField,
-    ManyToManyField, TextField,
+    CASCADE, PROTECT, BooleanField, CharField, FloatField, ForeignKey, Index,
+    IntegerField, ManyToManyField, TextField,
 )
 
 from lico.core.contrib.client import Client
@@ -74,6 +74,15 @@ class Job(Model):
     priority = CharField(null=True, max_length=16, blank=True, default="")
     requeued = BooleanField(null=False, blank=True, default=False)
 
+    class Meta:
+        # for the job list, filtered and sorted by these columns
+        indexes = [
+            Index(fields=['submitter', 'delete_flag', 'submit_time']),
+            Index(fields=['state', 'delete_flag', 'submit_time']),
+            Index(fields=['delete_flag', 'submit_time']),
+            Index(fields=['job_name']),
+        ]
+
     @property
     def get_job_password(self):
         import re
@@ -127,6 +136,16 @@ class JobRunning(Model):
     allocate_time = DateTimeField(null=True, blank=True)
 
 
+class JobRunningHost(Model):
+    job_running = ForeignKey(JobRunning, blank=False, on_delete=CASCADE,
+                             related_name='running_hosts')
+    job = ForeignKey(Job, blank=False, on_delete=PROTECT,
+                     related_name='job_running_host')
+    hostname = CharField(null=False, max_length=128, db_index=True)
+    core_num = IntegerField(null=False, blank=True, default=0)
+    gpu_num = FloatField(null=False, blank=True, default=0)
+
+
 class JobCSRES(Model):
     job = ForeignKey(Job, blank=False, on_delete=PROTECT,
                      related_name='job_csres')
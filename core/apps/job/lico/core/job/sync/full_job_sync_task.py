@@ -12,6 +12,8 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from django.db.models import Q
+
 from ..base.job_comment import JobComment
 from ..base.job_state import JobState
 from ..helpers.scheduler_helper import get_admin_scheduler, parse_job_identity
@@ -26,27 +28,42 @@ class FullJobSyncTask(JobSyncTask):
 
     def _get_sync_job_pair_list(self, query_memory=False):
         job_pair_list = []
+        # Index waiting job pairs by job id and identity string.
+        # The first pair wins to keep the database order on conflicts.
+        pair_index_by_id = {}
+        pair_index_by_identity = {}
         # Query all waiting jobs from database
         waiting_jobs = Job.objects.filter(
             state__in=JobState.get_waiting_state_values()
         )
-        for job in waiting_jobs:
+        for index, job in enumerate(waiting_jobs):
             job_pair = SyncJobPair(
                 job=job,
                 scheduler_job=None
             )
             job_pair_list.append(job_pair)
+            pair_index_by_id.setdefault(job.id, index)
+            pair_index_by_identity.setdefault(job.identity_str, index)
         # Query recent jobs from scheduler
         recent_scheduler_jobs = self._scheduler.query_recent_jobs(query_memory)
-        extend_job_pair_list = []
+        not_found_jobs = []
         for scheduler_job in recent_scheduler_jobs:
-            found = False
-            for job_pair in job_pair_list:
-                if self.__is_same_job(job_pair.job, scheduler_job):
-                    job_pair.scheduler_job = scheduler_job
-                    found = True
-                    break
-            if found:
+            job_id_in_comment = self.__parse_job_id_from_comment(
+                scheduler_job.comment
+            ) if scheduler_job.comment else -1
+            matched = [
+                index for index in (
+                    pair_index_by_id.get(job_id_in_comment),
+                    pair_index_by_identity.get(
+                        scheduler_job.identity.to_string()
+                    ),
+                    pair_index_by_identity.get(
+                        scheduler_job.identity.to_alternative_string()
+                    )
+                ) if index is not None
+            ]
+            if matched:
+                job_pair_list[min(matched)].scheduler_job = scheduler_job
                 continue
             # Handle not found job
             # job_state = JobState.from_scheduler_job_state(
@@ -71,33 +88,60 @@ class FullJobSyncTask(JobSyncTask):
             # it must be created in db and can find by comment-id.
             # If there is no job comment, and it submit from
             # lico-core-job, the duplicate job risk may exist.
-            job_pair = SyncJobPair(
-                job=self.__query_job_by_scheduler_job(scheduler_job),
-                scheduler_job=scheduler_job
-            )
-            extend_job_pair_list.append(job_pair)
+            not_found_jobs.append((job_id_in_comment, scheduler_job))
+        extend_job_pair_list = self.__query_jobs_by_scheduler_jobs(
+            not_found_jobs
+        )
         return job_pair_list + extend_job_pair_list
 
-    def __is_same_job(self, job, scheduler_job):
-        job_id_in_comment = self.__parse_job_id_from_comment(
-            scheduler_job.comment
-        ) if scheduler_job.comment else -1
-        return job.id == job_id_in_comment or \
-            job.identity_str == scheduler_job.identity.to_string() or \
-            job.identity_str == scheduler_job.identity.to_alternative_string()
+    def _get_changed_job_pair_list(self, scheduler_jobs):
+        # Pair only the given scheduler jobs with their database jobs,
+        # jobs missing from the scheduler are left to the full sync.
+        return self.__query_jobs_by_scheduler_jobs([
+            (
+                self.__parse_job_id_from_comment(scheduler_job.comment)
+                if scheduler_job.comment else -1,
+                scheduler_job
+            )
+            for scheduler_job in scheduler_jobs
+        ])
+
+    def __query_jobs_by_scheduler_jobs(self, not_found_jobs):
+        if not not_found_jobs:
+            return []
+        comment_ids = set()
+        identity_strs = set()
+        for job_id_in_comment, scheduler_job in not_found_jobs:
+            if job_id_in_comment > 0:
+                comment_ids.add(job_id_in_comment)
+            identity_strs.add(scheduler_job.identity.to_string())
+            # the identity of a job submitted around a month boundary
+            alternative_str = scheduler_job.identity.to_alternative_string()
+            if alternative_str:
+                identity_strs.add(alternative_str)
+        jobs_by_id = {}
+        jobs_by_identity = {}
+        for job in Job.objects.filter(
+                Q(id__in=comment_ids) | Q(identity_str__in=identity_strs)
+        ).order_by('id'):
+            jobs_by_id[job.id] = job
+            jobs_by_identity.setdefault(job.identity_str, job)
 
-    def __query_job_by_scheduler_job(self, scheduler_job):
-        job_id_in_comment = self.__parse_job_id_from_comment(
-            scheduler_job.comment
-        ) if scheduler_job.comment else -1
-        if job_id_in_comment > 0:
-            try:
-                return Job.objects.get(id=job_id_in_comment)
-            except Job.DoesNotExist:
-                pass
-        job_identity_str = scheduler_job.identity.to_string()
-        # If not found job by identity_str, it will return None.
-        return Job.objects.filter(identity_str=job_identity_str).first()
+        job_pair_list = []
+        for job_id_in_comment, scheduler_job in not_found_jobs:
+            job = jobs_by_id.get(job_id_in_comment) \
+                if job_id_in_comment > 0 else None
+            if job is None:
+                # If not found job by identity_str, it will be None.
+                job = jobs_by_identity.get(
+                    scheduler_job.identity.to_string()
+                ) or jobs_by_identity.get(
+                    scheduler_job.identity.to_alternative_string()
+                )
+            job_pair_list.append(
+                SyncJobPair(job=job, scheduler_job=scheduler_job)
+            )
+        return job_pair_list
 
     def __parse_job_id_from_comment(self, comment_str):
         job_comment = JobComment.from_comment(comment_str)
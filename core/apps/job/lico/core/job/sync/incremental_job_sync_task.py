@@ -0,0 +1,61 @@
+# Copyright 2015-present Lenovo
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+import time
+
+from django.conf import settings
+
+from .full_job_sync_task import FullJobSyncTask
+
+logger = logging.getLogger(__name__)
+
+# Seconds the change window reaches back before the last successful
+# cycle, to cover clock skew and changes made while it was running.
+WATERMARK_OVERLAP = 60
+
+
+class IncrementalJobSyncTask(FullJobSyncTask):
+    # Kept for the life of the sync process, like missing_jobs_cache.
+    watermark = None
+    last_full_sync = 0
+
+    def __init__(self):
+        super().__init__()
+        self._full_sync = False
+
+    def sync_job(self, ignore_job_identity_list=None):
+        cls = type(self)
+        start = time.time()
+        self._full_sync = cls.watermark is None or \
+            start - cls.last_full_sync >= settings.JOB.get(
+                'JOB_SYNC_FULL_INTERVAL', 300
+            )
+
+        super().sync_job(ignore_job_identity_list)
+
+        # Retry the same window if any job failed to sync
+        if self.metrics['failed']:
+            return
+        cls.watermark = start - WATERMARK_OVERLAP
+        if self._full_sync:
+            cls.last_full_sync = start
+
+    def _get_sync_job_pair_list(self, query_memory=False):
+        if self._full_sync:
+            logger.info('Run full job sync reconciliation')
+            return super()._get_sync_job_pair_list(query_memory)
+        return self._get_changed_job_pair_list(
+            self._scheduler.query_changed_jobs(self.watermark, query_memory)
+        )
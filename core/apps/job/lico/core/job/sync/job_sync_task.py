@@ -15,6 +15,7 @@
 import logging
 import time
 from abc import ABCMeta, abstractmethod
+from collections import Counter
 
 from django.conf import settings
 from django.utils.timezone import now
@@ -35,8 +36,13 @@ query_memory_recorder = time.time()
 class JobSyncTask(metaclass=ABCMeta):
     # for jobs cannot be queried from scheduler
     missing_jobs_cache = {}
+    # counters of the last sync cycle: fetched, changed, written and
+    # failed jobs
+    metrics = Counter()
 
     def sync_job(self, ignore_job_identity_list=None):  # noqa: C901
+        start = time.time()
+        metrics = self.metrics = Counter()
         query_memory = False
         global query_memory_recorder
         current_time = time.time()
@@ -46,10 +52,15 @@ class JobSyncTask(metaclass=ABCMeta):
             query_memory_recorder = current_time
         job_pair_list = self._get_sync_job_pair_list(query_memory)
         logger.debug("Job pair list: {}".format(job_pair_list))
+        metrics['fetched'] = sum(
+            1 for job_pair in job_pair_list
+            if job_pair.scheduler_job is not None
+        )
         for job_pair in job_pair_list:
             try:
                 # Job that submit from console
                 if job_pair.job is None:
+                    metrics['changed'] += 1
                     job = Job.objects.create(
                         job_name=job_pair.scheduler_job.name[:128],
                         submitter=job_pair.scheduler_job.submitter_username,
@@ -59,6 +70,7 @@ class JobSyncTask(metaclass=ABCMeta):
                     update_job_by_scheduler_job(job, job_pair.scheduler_job)
                     job.operate_state = JobOperateState.CREATED.value
                     job.save()
+                    metrics['written'] += 1
                     self._on_job_changed(job, charge=True)
                     continue
                 # Job that in creating
@@ -89,6 +101,7 @@ class JobSyncTask(metaclass=ABCMeta):
                     # Not creating job need be completed
                     # Because the cancelling RestAPI can update
                     # operate_state, so need reload object.
+                    metrics['changed'] += 1
                     job_pair.job.refresh_from_db()
                     if job_pair.job.operate_state == \
                             JobOperateState.CANCELLING.value:
@@ -121,6 +134,7 @@ class JobSyncTask(metaclass=ABCMeta):
                         )
 
                     job_pair.job.save(update_fields=update_fields)
+                    metrics['written'] += 1
                     self._on_job_changed(job_pair.job, charge=False)
                     # Don't need recycle job resource, because
                     # can't get job information from scheduler.
@@ -135,12 +149,14 @@ class JobSyncTask(metaclass=ABCMeta):
                         job_changed(job_pair):
                     # Only sync process can update state fields.
                     # So no need to reload.
+                    metrics['changed'] += 1
                     current_state = job_pair.job.state
                     update_fields = update_job_by_scheduler_job(
                         job_pair.job,
                         job_pair.scheduler_job
                     )
                     job_pair.job.save(update_fields=update_fields)
+                    metrics['written'] += 1
                     next_state = job_pair.job.state
                     self._on_job_changed(job_pair.job, charge=True)
                     if job_need_recycle(current_state, next_state):
@@ -151,7 +167,14 @@ class JobSyncTask(metaclass=ABCMeta):
                                 "Recycle resource job: {}".format(job.id)
                             )
             except Exception:
+                metrics['failed'] += 1
                 logger.exception("Sync job failed.")
+        logger.info(
+            "Job sync cycle: fetched %s, changed %s, written %s, failed %s "
+            "in %.2fs",
+            metrics['fetched'], metrics['changed'], metrics['written'],
+            metrics['failed'], time.time() - start
+        )
 
     @abstractmethod
     def _get_sync_job_pair_list(self, query_memory=False):
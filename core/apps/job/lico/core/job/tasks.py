@@ -19,6 +19,7 @@ from django.conf import settings
 
 from .clean.dirty_job_clean_task import CleanDirtyJobTask
 from .sync.full_job_sync_task import FullJobSyncTask
+from .sync.incremental_job_sync_task import IncrementalJobSyncTask
 from .sync.owns_job_sync_task import OwnsJobSyncTask
 
 logger = logging.getLogger(__name__)
@@ -31,6 +32,8 @@ def job_sync_task():  # pragma: no cover
         task = FullJobSyncTask()
     if settings.JOB.JOB_SYNC_MODE == "owns":
         task = OwnsJobSyncTask()
+    if settings.JOB.JOB_SYNC_MODE == "incremental":
+        task = IncrementalJobSyncTask()
     task.sync_job()
     CleanDirtyJobTask().clean_dirty_job()
     end = time.time()
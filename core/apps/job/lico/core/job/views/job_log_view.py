@@ -25,6 +25,8 @@ from ..helpers.fs_operator_helper import get_fs_operator
 
 logger = logging.getLogger(__name__)
 
+LOG_CHUNK_SIZE = 4 * 1024 * 1024
+
 
 class JobLogView(APIView):
 
@@ -59,6 +61,10 @@ class JobLogView(APIView):
                 'type': 'string',
                 'pattern': r'^\d+$'
             },
+            'offset': {
+                'type': 'string',
+                'pattern': r'^\d+$'
+            },
         },
         "required": ['file_path', 'line_num'],
     }, is_get=True)
@@ -84,6 +90,21 @@ class JobLogView(APIView):
             logger.error('No permission: %s', file_path)
             return Response(error_resp)
 
+        # Tail from a byte offset returned by the previous poll
+        if 'offset' in request.query_params:
+            log, offset = fopr.read_content_since(
+                file_path, int(request.query_params['offset']),
+                LOG_CHUNK_SIZE
+            )
+            return Response(
+                {
+                    'data': {
+                        "log": base64.b64encode(log).decode(),
+                        "offset": offset
+                    }
+                }
+            )
+
         total_line_num = fopr.count_file_lines(file_path, mode='rb')
 
         # If 'lines' in request parameters, then return the entire file
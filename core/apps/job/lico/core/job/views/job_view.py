@@ -51,6 +51,9 @@ logger = logging.getLogger(__name__)
 
 
 class JobListView(DataTableView):
+    keyset_pagination = True
+    count_limit = 10000
+    prefix_search = True
     columns_mapping = {  # <display field name>: <DB field name>
         'id': 'id',
         'scheduler_id': 'scheduler_id',
@@ -110,7 +113,16 @@ class JobListView(DataTableView):
                     ignore_non_lico_user=False
                 )
                 break
-        return super().filters(query, filters).distinct()
+        query = super().filters(query, filters)
+        # a job is joined once per tag when filtering by tags
+        if any(
+            self.columns_mapping.get(
+                field['prop'], field['prop']
+            ).startswith('tags__') and field['values']
+            for field in filters
+        ):
+            query = query.distinct()
+        return query
 
 
 class InternalJobView(InternalAPIView):
@@ -17,8 +17,7 @@ from rest_framework.response import Response
 from lico.core.contrib.permissions import AsOperatorRole
 from lico.core.contrib.views import APIView
 
-from ..base.job_state import JobState
-from ..models import JobRunning
+from ..helpers.running_host_helper import query_running_hosts
 
 
 class RunningJobDetailView(APIView):
@@ -26,29 +25,16 @@ class RunningJobDetailView(APIView):
 
     def get(self, request, hostname):
         runing_joblist = []
-        query = JobRunning.objects.filter(
-            job__state__in=JobState.get_running_state_values())
-
-        for running_job in query:
-            job_dict = {
-                'core_num_on_node': 0,
-                'gpu_num_on_node': 0
-            }
-            if hostname.lower() in running_job.hosts.lower().split(','):
-                job = running_job.job
-                job_dict['id'] = job.id
-                job_dict['jobid'] = job.scheduler_id
-                job_dict['jobname'] = job.job_name
-                job_dict['queue'] = job.queue
-                job_dict['submitter'] = job.submitter
-                job_dict['starttime'] = job.start_time
-                for i in job.tres.split(','):
-                    key, value = i.split(':')
-                    if key == 'C':
-                        job_dict['core_num_on_node'] = int(float(value))
-                        continue
-                    if key.startswith('G/gpu'):
-                        job_dict['gpu_num_on_node'] += int(float(value))
-                        continue
-                runing_joblist.append(job_dict)
+        for running_host in query_running_hosts(hostname):
+            job = running_host.job
+            runing_joblist.append({
+                'id': job.id,
+                'jobid': job.scheduler_id,
+                'jobname': job.job_name,
+                'queue': job.queue,
+                'submitter': job.submitter,
+                'starttime': job.start_time,
+                'core_num_on_node': running_host.core_num,
+                'gpu_num_on_node': int(running_host.gpu_num)
+            })
         return Response(runing_joblist)
@@ -22,11 +22,13 @@ from typing import Any, Callable, Union
 import attr
 from django.conf import settings
 from django.db import transaction
-from django.db.models import Sum
 from django.db.utils import IntegrityError
+from django.utils.timezone import now
 from psutil import disk_usage
 
-from lico.core.monitor_host.models import Cluster, Gpu, MonitorNode
+from lico.core.monitor_host.models import (
+    Cluster, Gpu, GpuLogicalDevice, HardwareHealth, MonitorNode,
+)
 from lico.core.monitor_host.utils import (
     ClusterClient, convert_unit, init_datasource,
 )
@@ -134,6 +136,8 @@ type_mapping = {
     "temperature": float,
     "power": float,
 }
+BULK_BATCH_SIZE = 500
+
 gpu_type_mapping = {
     "vendor": lambda x: int(float(x)),
     "memory_used": lambda x: round(convert_unit(
@@ -179,34 +183,176 @@ class LatestMonitorSync:
             "temperature", "bandwidth_util", "memory_usage"
         ]
 
+        # Latest rows loaded from db, changes are applied to them in memory
+        # and written back in bulk by apply_changes.
+        self.now = now()
+        self.nodes = {}  # {hostname: MonitorNode}
+        self.hardware_healths = defaultdict(list)  # {hostname: [...]}
+        self.gpus = defaultdict(dict)  # {hostname: {index: Gpu}}
+        # {(hostname, index): {(dev_id, metric): GpuLogicalDevice}}
+        self.gpu_logical_devices = defaultdict(dict)
+        self.created = defaultdict(list)
+        self.updated = defaultdict(dict)
+        self.updated_fields = defaultdict(set)
+        self.deleted = defaultdict(set)
+
     def update(self):
         hostlist = ClusterClient().get_hostlist()
-        MonitorNode.objects.exclude(
-            hostname__in=hostlist
-        ).delete()
-
-        self.update_no_monitor()
-
-        for nodes_info in self.monitor_data:
-            if self._node_status(nodes_info.hostname,
-                                 attr.asdict(nodes_info.node_metric)):
-                try:
-                    self.save_node(nodes_info.hostname,
-                                   attr.asdict(nodes_info.node_metric))
-                    self.save_gpu(nodes_info.hostname,
-                                  attr.asdict(nodes_info.gpu_metric))
-                except IntegrityError as e:
-                    self._modify_cluster_metric(nodes_info.hostname)
-                    logger.info(e)
-                    continue
-                except Exception as e:
-                    logger.info(e)
-                    continue
-            else:
-                continue
+        try:
+            with transaction.atomic():
+                MonitorNode.objects.exclude(
+                    hostname__in=hostlist
+                ).delete()
+                self.load_latest()
+
+                self.update_no_monitor()
+
+                for nodes_info in self.monitor_data:
+                    if self._node_status(nodes_info.hostname,
+                                         attr.asdict(nodes_info.node_metric)):
+                        try:
+                            self.save_node(
+                                nodes_info.hostname,
+                                attr.asdict(nodes_info.node_metric)
+                            )
+                            self.save_gpu(
+                                nodes_info.hostname,
+                                attr.asdict(nodes_info.gpu_metric)
+                            )
+                        except IntegrityError as e:
+                            self._modify_cluster_metric(nodes_info.hostname)
+                            logger.info(e)
+                            continue
+                        except Exception as e:
+                            logger.info(e)
+                            continue
+                    else:
+                        continue
+
+                self.apply_changes()
+        except IntegrityError as e:
+            logger.info(e)
 
         self.save_cluster()
 
+    def load_latest(self):
+        self.nodes = {
+            node.hostname: node for node in MonitorNode.objects.all()
+        }
+        for hardware_health in HardwareHealth.objects.all():
+            self.hardware_healths[hardware_health.monitor_node_id].append(
+                hardware_health
+            )
+        gpu_keys = {}
+        for gpu in Gpu.objects.all():
+            self.gpus[gpu.monitor_node_id][gpu.index] = gpu
+            gpu_keys[gpu.id] = (gpu.monitor_node_id, gpu.index)
+        for gpu_dev in GpuLogicalDevice.objects.all():
+            self.gpu_logical_devices[gpu_keys[gpu_dev.gpu_id]][
+                (gpu_dev.dev_id, gpu_dev.metric)
+            ] = gpu_dev
+
+    def _stage_update(self, obj, values):
+        # Reject the row like the db would, before it is changed in memory
+        for field, value in values.items():
+            if value is None and not obj._meta.get_field(field).null:
+                raise IntegrityError(
+                    f'NOT NULL constraint failed: '
+                    f'{obj._meta.db_table}.{field}'
+                )
+        for field, value in values.items():
+            if getattr(obj, field) == value:
+                continue
+            setattr(obj, field, value)
+            # New rows are written by bulk_create with all their fields
+            if not obj._state.adding:
+                self.updated[type(obj)][obj.pk] = obj
+                self.updated_fields[type(obj)].add(field)
+
+    def _stage_create(self, obj, values):
+        self._stage_update(obj, values)
+        self.created[type(obj)].append(obj)
+        return obj
+
+    def _stage_node(self, hostname, values):
+        # same as update_or_create, the update time is always refreshed
+        values = dict(values, update_time=self.now)
+        node = self.nodes.get(hostname)
+        if node is None:
+            node = self.nodes[hostname] = self._stage_create(
+                MonitorNode(hostname=hostname), values
+            )
+        else:
+            self._stage_update(node, values)
+        return node
+
+    def _stage_hardware_health(self, hostname, sensors):
+        exist_healths = {}
+        for hardware_health in self.hardware_healths.pop(hostname, []):
+            if hardware_health.name in sensors and \
+                    hardware_health.name not in exist_healths:
+                exist_healths[hardware_health.name] = hardware_health
+            else:
+                self.deleted[HardwareHealth].add(hardware_health.pk)
+
+        for name, values in sensors.items():
+            hardware_health = exist_healths.get(name)
+            if hardware_health is None:
+                hardware_health = self._stage_create(
+                    HardwareHealth(monitor_node_id=hostname, name=name),
+                    values
+                )
+            else:
+                self._stage_update(hardware_health, values)
+            self.hardware_healths[hostname].append(hardware_health)
+
+    def apply_changes(self):
+        for model in (GpuLogicalDevice, Gpu, HardwareHealth):
+            if self.deleted[model]:
+                model.objects.filter(pk__in=self.deleted[model]).delete()
+
+        MonitorNode.objects.bulk_create(
+            self.created[MonitorNode], batch_size=BULK_BATCH_SIZE
+        )
+        HardwareHealth.objects.bulk_create(
+            self.created[HardwareHealth], batch_size=BULK_BATCH_SIZE
+        )
+        self._create_gpu()
+
+        for model, objs in self.updated.items():
+            objs = [
+                obj for pk, obj in objs.items()
+                if pk not in self.deleted[model]
+            ]
+            if objs:
+                model.objects.bulk_update(
+                    objs, self.updated_fields[model],
+                    batch_size=BULK_BATCH_SIZE
+                )
+
+    def _create_gpu(self):
+        new_gpus = self.created[Gpu]
+        if new_gpus:
+            Gpu.objects.bulk_create(new_gpus, batch_size=BULK_BATCH_SIZE)
+            # bulk_create does not set the primary key on MariaDB
+            gpu_ids = {
+                (hostname, index): gpu_id
+                for hostname, index, gpu_id in Gpu.objects.filter(
+                    monitor_node_id__in={
+                        gpu.monitor_node_id for gpu in new_gpus
+                    }
+                ).values_list('monitor_node_id', 'index', 'id')
+            }
+            for gpu in new_gpus:
+                gpu.id = gpu_ids[(gpu.monitor_node_id, gpu.index)]
+
+        new_gpu_devs = self.created[GpuLogicalDevice]
+        for gpu_dev in new_gpu_devs:
+            gpu_dev.gpu_id = gpu_dev.gpu.id
+        GpuLogicalDevice.objects.bulk_create(
+            new_gpu_devs, batch_size=BULK_BATCH_SIZE
+        )
+
     def _node_status(self, hostname, node_dict):
         node_status = type_mapping["node_active"](node_dict.get(
             "node_active", {}).get("value", ""))
@@ -221,75 +367,79 @@ class LatestMonitorSync:
                     return has_monitor
 
         # node_active is off or node_active is on but don't have monitor_data
-        self.node_default_dict['node_active'] = node_status
+        node_default_dict = dict(
+            self.node_default_dict, node_active=node_status
+        )
         if not node_status:
-            self.node_default_dict.pop("disk_used", "")
-            self.node_default_dict.pop("health", "")
+            node_default_dict.pop("disk_used", "")
+            node_default_dict.pop("health", "")
 
-        node, _ = MonitorNode.objects.update_or_create(
-            hostname=hostname, defaults=self.node_default_dict)
+        self._stage_node(hostname, node_default_dict)
         if node_status:
-            node.hardware_health.all().delete()
-        self._no_monitor_gpu(node)
+            self._stage_hardware_health(hostname, {})
+        self._no_monitor_gpu(hostname)
 
         # add for node don't have monitor data
         if not has_monitor and node_status:
-            self._extra_cluster_metric(node)
+            self._extra_cluster_metric(hostname)
 
     def _modify_cluster_metric(self, hostname):
         try:
             self.cluster.pop(hostname)
-            node = MonitorNode.objects.get(hostname=hostname)
-            self._extra_cluster_metric(node)
+            self._extra_cluster_metric(hostname)
         except Exception as e:
             logger.info(e)
 
-    def _extra_cluster_metric(self, node):
+    def _extra_cluster_metric(self, hostname):
+        node = self.nodes[hostname]
+        gpus = self.gpus[hostname]
         self.cluster_metric["cpu_count"] += self.format_value(
             node.cpu_total)
         self.cluster_metric["memory_total"] += \
             self.format_value(node.memory_total)
 
-        self.cluster_metric["gpu_card_total"] += node.gpu.count()
+        self.cluster_metric["gpu_card_total"] += len(gpus)
 
         gpu_allocable_total, gpu_dev_total, logic_num = 0, 0, 0
-        for gpu in node.gpu.all():
+        for index, gpu in gpus.items():
+            dev_num = len({
+                dev_id for dev_id, _ in
+                self.gpu_logical_devices[(hostname, index)]
+            })
             if gpu.vendor == Gpu.NVIDIA:
                 if gpu.mig_mode == 1:
-                    logic_num = gpu.gpu_logical_device.values(
-                        'dev_id').distinct().count()
+                    logic_num = dev_num
             elif gpu.vendor == Gpu.INTEL:
-                logic_num = gpu.gpu_logical_device.values(
-                    'dev_id').distinct().count()
+                logic_num = dev_num
             gpu_allocable_total += logic_num if logic_num > 0 else 1
             gpu_dev_total += logic_num
         self.cluster_metric["gpu_allocable_total"] += gpu_allocable_total
         self.cluster_metric["gpu_dev_total"] += gpu_dev_total
 
         self.cluster_metric["gpu_memory_total"] += self.format_value(
-            node.gpu.aggregate(Sum("memory_total")).get(
-                "memory_total__sum"))
+            sum(gpu.memory_total for gpu in gpus.values()))
 
-    def _no_monitor_gpu(self, node):
+    def _no_monitor_gpu(self, hostname):
         # update gpu dynamic data for host is shut down or monitor
         # service is stopped
-        node.gpu.update(**self.gpu_default_dict)
-
-        for gpu in node.gpu.all():
-            gpu.gpu_logical_device.filter(
-                metric__in=self.gpu_logic_default_list).update(value='')
+        for index, gpu in self.gpus[hostname].items():
+            self._stage_update(gpu, self.gpu_default_dict)
+            for (dev_id, metric), gpu_dev in \
+                    self.gpu_logical_devices[(hostname, index)].items():
+                if metric in self.gpu_logic_default_list:
+                    self._stage_update(gpu_dev, {'value': ''})
 
     def update_no_monitor(self):
         # update dynamic data for nodes that not in the return
         # of init_datasource but in cluster_client.get_hostlist()
-        monitor_host_list = [
-            nodes_info.hostname for nodes_info in self.monitor_data]
-        nodes = MonitorNode.objects.exclude(hostname__in=monitor_host_list)
-        if nodes:
-            nodes.update(**self.node_default_dict)
-            for node in nodes:
-                node.hardware_health.all().delete()
-                self._no_monitor_gpu(node)
+        monitor_host_list = {
+            nodes_info.hostname for nodes_info in self.monitor_data}
+        for hostname, node in self.nodes.items():
+            if hostname in monitor_host_list:
+                continue
+            self._stage_update(node, self.node_default_dict)
+            self._stage_hardware_health(hostname, {})
+            self._no_monitor_gpu(hostname)
 
     @staticmethod
     def _delete_status(output):
@@ -328,7 +478,6 @@ class LatestMonitorSync:
 
         return node_dict
 
-    @transaction.atomic
     def save_node(self, hostname, node_metric):
         node_dict = self.parse_node(node_metric)
         self.cluster[hostname]["node"] = node_dict
@@ -340,39 +489,29 @@ class LatestMonitorSync:
             logger.info(e)
             health = {}
 
-        node, _ = MonitorNode.objects.update_or_create(
-            hostname=hostname,
-            defaults=node_dict
-        )
+        self._stage_node(hostname, node_dict)
 
-        update_names = []
+        sensors = {}
         for sensor in health.get("badreadings", []):
             # ipmi
             if sensor.get("name"):
-                hardware_health, _ = node.hardware_health.update_or_create(
-                    name=sensor.get("name"),
-                    defaults={
-                        'health': sensor.get('health', ''),
-                        'states': sensor.get('states', ''),
-                        'units': sensor.get('units', ''),
-                        'value': sensor.get('value', ''),
-                        'type': sensor.get('type', '')
-                    }
-                )
+                sensors[sensor.get("name")] = {
+                    'health': sensor.get('health', ''),
+                    'states': sensor.get('states', ''),
+                    'units': sensor.get('units', ''),
+                    'value': sensor.get('value', ''),
+                    'type': sensor.get('type', '')
+                }
             # redfish
             elif sensor.get("SensorName"):
-                hardware_health, _ = node.hardware_health.update_or_create(
-                    name=sensor.get("SensorName"),
-                    defaults={
-                        'health': sensor.get('Severity', ''),
-                        'states': sensor.get('Message', ''),
-                        'units': sensor.get('units', ''),
-                        'value': sensor.get('value', ''),
-                        'type': sensor.get('type', '')
-                    }
-                )
-            update_names.append(hardware_health.name)
-        node.hardware_health.exclude(name__in=update_names).delete()
+                sensors[sensor.get("SensorName")] = {
+                    'health': sensor.get('Severity', ''),
+                    'states': sensor.get('Message', ''),
+                    'units': sensor.get('units', ''),
+                    'value': sensor.get('value', ''),
+                    'type': sensor.get('type', '')
+                }
+        self._stage_hardware_health(hostname, sensors)
 
     def parse_gpu(self, gpu_physics_metric):
         gpu_dict = defaultdict(dict)
@@ -460,42 +599,60 @@ class LatestMonitorSync:
                 dev.update({metric: (logic.get("value"),
                                      logic.get("unit"))})
 
-    @transaction.atomic
     def save_gpu(self, hostname, gpu_physics_metric):
-        node, _ = MonitorNode.objects.get_or_create(hostname=hostname)
+        self._stage_node(hostname, {})
 
         gpu_info, gpu_logic_info = self.parse_gpu(gpu_physics_metric)
         self.cluster[hostname]["gpu"] = gpu_info
         self.cluster[hostname]["gpu_logic"] = gpu_logic_info
 
-        update_ids = []
+        gpus = self.gpus[hostname]
+        update_indexes = set()
         for index, value in gpu_info.items():
-            gpu, _ = node.gpu.update_or_create(
-                index=index,
-                defaults=value
-            )
+            gpu_index = int(index)
+            gpu = gpus.get(gpu_index)
+            if gpu is None:
+                gpu = gpus[gpu_index] = self._stage_create(
+                    Gpu(monitor_node_id=hostname, index=gpu_index), value
+                )
+            else:
+                self._stage_update(gpu, value)
 
             devs = gpu_logic_info.get(index, {})
-            self.save_gpu_logic_device(gpu, devs)
+            self.save_gpu_logic_device(hostname, gpu, devs)
 
-            update_ids.append(gpu.id)
+            update_indexes.add(gpu_index)
 
-        node.gpu.exclude(id__in=update_ids).delete()
+        for gpu_index in set(gpus) - update_indexes:
+            self.deleted[Gpu].add(gpus.pop(gpu_index).pk)
+            self.gpu_logical_devices.pop((hostname, gpu_index), None)
 
-    @staticmethod
-    def save_gpu_logic_device(gpu, devs):
+    def save_gpu_logic_device(self, hostname, gpu, devs):
+        gpu_devs = self.gpu_logical_devices[(hostname, gpu.index)]
         update_ids = set()
 
         for dev_id, info in devs.items():
             for metric, value in info.items():
-                gpu_dev, _ = gpu.gpu_logical_device.update_or_create(
-                    dev_id=dev_id,
-                    metric=metric,
-                    defaults={"value": value[0], "units": value[1]}
-                )
-                update_ids.add(gpu_dev.dev_id)
+                values = {
+                    "value": value[0],
+                    "units": value[1],
+                    "update_time": self.now
+                }
+                gpu_dev = gpu_devs.get((dev_id, metric))
+                if gpu_dev is None:
+                    gpu_devs[(dev_id, metric)] = self._stage_create(
+                        GpuLogicalDevice(
+                            gpu=gpu, dev_id=dev_id, metric=metric
+                        ),
+                        values
+                    )
+                else:
+                    self._stage_update(gpu_dev, values)
+                update_ids.add(dev_id)
 
-        gpu.gpu_logical_device.exclude(dev_id__in=update_ids).delete()
+        for key in list(gpu_devs):
+            if key[0] not in update_ids:
+                self.deleted[GpuLogicalDevice].add(gpu_devs.pop(key).pk)
 
     def cluster_summary(self):
         cpu_util_sum, cpu_count, node_temp = 0, 0, 0
@@ -611,20 +768,29 @@ class LatestMonitorSync:
     def save_cluster(self):
         self.cluster_summary()
 
-        update_metrics = []
+        exist_clusters = {
+            cluster.metric: cluster
+            for cluster in Cluster.objects.filter(name=settings.LICO.DOMAIN)
+        }
+        update_clusters, create_clusters = [], []
         for metric, metric_value in self.cluster_metric.items():
             if isinstance(metric_value, float):
                 value = round(metric_value, 2)
             else:
                 value = metric_value
-            Cluster.objects.update_or_create(
-                name=settings.LICO.DOMAIN,
-                metric=metric,
-                defaults={"value": value}
-            )
-            update_metrics.append(metric)
+            cluster = exist_clusters.get(metric)
+            if cluster is None:
+                create_clusters.append(Cluster(
+                    name=settings.LICO.DOMAIN, metric=metric, value=value
+                ))
+            else:
+                cluster.value = value
+                cluster.update_time = self.now
+                update_clusters.append(cluster)
+        Cluster.objects.bulk_update(update_clusters, ['value', 'update_time'])
+        Cluster.objects.bulk_create(create_clusters)
         Cluster.objects.exclude(name=settings.LICO.DOMAIN,
-                                metric__in=update_metrics).delete()
+                                metric__in=self.cluster_metric).delete()
 
 
 def sync_latest(data_list):
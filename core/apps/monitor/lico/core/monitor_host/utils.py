@@ -17,12 +17,14 @@ import logging
 import os
 import re
 from collections import defaultdict
+from functools import lru_cache
 
 import attr
 import requests
 import xmltodict
 from django.conf import settings
 from django.db.models import Q
+from pandas import DataFrame, Series, concat, to_numeric
 
 from lico.core.contrib.client import Client
 
@@ -615,6 +617,31 @@ gpu_dev_re = re.compile(
     r'mem_usage|sm_count|temp)$')
 job_gpu_re = re.compile(
     r'^job_([0-9a-zA-Z]*)_(gpu)(\d+)(.*)_(util|mem_usage)$')
+gpu_spec_re = re.compile(r'(gpu)(\d+)_([\d+_]*)$')
+
+UNIT_MAPPING = {
+    'BITS': 2.0 ** -3,
+    'BYTES': 1.0,
+    'KB': 1000.0 ** 1,
+    'MB': 1000.0 ** 2,
+    'GB': 1000.0 ** 3,
+    'TB': 1000.0 ** 4,
+    'PB': 1000.0 ** 5,
+    'EB': 1000.0 ** 6,
+    'ZB': 1000.0 ** 7,
+    'YB': 1000.0 ** 8,
+
+    'KIB': 1024.0 ** 1,
+    'MIB': 1024.0 ** 2,
+    'GIB': 1024.0 ** 3,
+    'TIB': 1024.0 ** 4,
+    'PIB': 1024.0 ** 5,
+    'EIB': 1024.0 ** 6,
+    'ZIB': 1024.0 ** 7,
+    'YIB': 1024.0 ** 8,
+}
+
+DATASOURCE_COLUMNS = ['hostname', 'metric', 'value', 'unit', 'output']
 
 _SQL = """
 SELECT hostname, metric, output_data as output, LAST(value) as value, unit
@@ -633,33 +660,20 @@ def calculate_util(used, total):
     return round(100.0 * float(used) / float(total), 2)
 
 
+# Bounded, job metric names keep changing as jobs come and go
+@lru_cache(maxsize=4096)
+def match_metric(pattern, metric):
+    # Metric names repeat on every host, so each one is matched only once
+    metric_match = pattern.match(metric)
+    return metric_match.groups() if metric_match else None
+
+
 def convert_unit(value, unit, target_unit='BYTES'):
-    unit_mapping = {
-        'BITS': 2.0 ** -3,
-        'BYTES': 1.0,
-        'KB': 1000.0 ** 1,
-        'MB': 1000.0 ** 2,
-        'GB': 1000.0 ** 3,
-        'TB': 1000.0 ** 4,
-        'PB': 1000.0 ** 5,
-        'EB': 1000.0 ** 6,
-        'ZB': 1000.0 ** 7,
-        'YB': 1000.0 ** 8,
-
-        'KIB': 1024.0 ** 1,
-        'MIB': 1024.0 ** 2,
-        'GIB': 1024.0 ** 3,
-        'TIB': 1024.0 ** 4,
-        'PIB': 1024.0 ** 5,
-        'EIB': 1024.0 ** 6,
-        'ZIB': 1024.0 ** 7,
-        'YIB': 1024.0 ** 8,
-    }
-    if not unit or not unit_mapping.get(unit.upper()) or \
-            not unit_mapping.get(target_unit.upper()):
+    if not unit or not UNIT_MAPPING.get(unit.upper()) or \
+            not UNIT_MAPPING.get(target_unit.upper()):
         return value, unit
-    value_bytes = float(value) * unit_mapping[unit.upper()]
-    return value_bytes / unit_mapping[target_unit.upper()], target_unit
+    value_bytes = float(value) * UNIT_MAPPING[unit.upper()]
+    return value_bytes / UNIT_MAPPING[target_unit.upper()], target_unit
 
 
 @attr.s(frozen=True)
@@ -794,9 +808,9 @@ def set_job_attr(metric, job_info, value_dict, memory_total=0):
     value, output, unit = \
         value_dict['value'], value_dict['output'], value_dict['unit']
 
-    job_match = job_re.match(metric)
+    job_match = match_metric(job_re, metric)
     if job_match:
-        scheduler_id, metric_name = job_match.groups()
+        scheduler_id, metric_name = job_match
         job_dict = getattr(job_info, metric_name, defaultdict(list))
         index = dev_id = None
         if metric_name == 'mem_used' and memory_total != 0:
@@ -812,11 +826,10 @@ def set_job_attr(metric, job_info, value_dict, memory_total=0):
              'dev_id': dev_id, 'unit': unit})
         return
 
-    job_gpu_match = job_gpu_re.match(metric)
+    job_gpu_match = match_metric(job_gpu_re, metric)
     if not job_gpu_match:
         return
-    scheduler_id, gpu_str, index, dev_str, gpu_metric_name = \
-        job_gpu_match.groups()
+    scheduler_id, gpu_str, index, dev_str, gpu_metric_name = job_gpu_match
     gpu_metric = gpu_str + '_' + gpu_metric_name
     dev_id = dev_str[1:].replace('_', '.') if dev_str else ''
     gpu_job_dict = getattr(job_info, gpu_metric, defaultdict(list))
@@ -832,10 +845,10 @@ def set_job_attr(metric, job_info, value_dict, memory_total=0):
 def set_gpu_attr(metric, gpu_info, value_dict):
     value, output, unit = \
         value_dict['value'], value_dict['output'], value_dict['unit']
-    gpu_match = gpu_re.match(metric)
+    gpu_match = match_metric(gpu_re, metric)
 
     if gpu_match:
-        gpu_str, index, metric_name = gpu_match.groups()
+        gpu_str, index, metric_name = gpu_match
         gpu_metric = gpu_str + '_' + metric_name
         gpu_dict = getattr(gpu_info, gpu_metric, defaultdict(list))
         gpu_metric_dict = \
@@ -843,10 +856,10 @@ def set_gpu_attr(metric, gpu_info, value_dict):
         gpu_dict[index].append(gpu_metric_dict)
         return
 
-    gpu_dev_match = gpu_dev_re.match(metric)
+    gpu_dev_match = match_metric(gpu_dev_re, metric)
     if gpu_dev_match:
         gpu_dev_model = gpu_info.gpu_dev_model
-        gpu_str, index, dev_str, gpu_metric_name = gpu_dev_match.groups()
+        gpu_str, index, dev_str, gpu_metric_name = gpu_dev_match
         metric_name = gpu_str + '_dev_' + gpu_metric_name
         gpu_dev_dict = getattr(gpu_dev_model, metric_name, defaultdict(list))
         dev_id = dev_str.replace('_', '.')
@@ -855,11 +868,10 @@ def set_gpu_attr(metric, gpu_info, value_dict):
         gpu_dev_dict[index].append(gpu_dev_metric_dict)
         return
 
-    gpu_spec_re = re.compile(r'(gpu)(\d+)_([\d+_]*)$')
-    gpu_spec_match = gpu_spec_re.match(metric)
-    if gpu_spec_re:
+    gpu_spec_match = match_metric(gpu_spec_re, metric)
+    if gpu_spec_match:
         gpu_dev_model = gpu_info.gpu_dev_model
-        gpu_str, index, dev_str = gpu_spec_match.groups()
+        gpu_str, index, dev_str = gpu_spec_match
         gpu_dev_metric = gpu_str + '_dev_spec'
         gpu_dict = getattr(gpu_dev_model, gpu_dev_metric, defaultdict(list))
         dev_id = dev_str.replace('_', '.')
@@ -869,11 +881,11 @@ def set_gpu_attr(metric, gpu_info, value_dict):
 
 
 def set_node_attr(metric, node_info, value_dict):
-    node_re_match = node_re.match(metric)
+    node_re_match = match_metric(node_re, metric)
     if not node_re_match:
         getattr(node_info, metric, {}).update(value_dict)
         return
-    for node_metric in node_re_match.groups():
+    for node_metric in node_re_match:
         if node_metric:
             getattr(node_info, node_metric, {}).update(value_dict)
 
@@ -885,87 +897,89 @@ def _generator_sql():
     return influx_sql + _NODE_ACTIVE_SQL
 
 
-def _init_datasource(metrics_dict):
-    for calculate_metric in ['disk_total', 'memory_total']:
-        metric_match = re.match(r'^(disk|memory)_total$', calculate_metric)
-        metric_str = metric_match.groups()[0]
-        # total_dict for example:
-        # {
-        #     'value': '0.0', 'unit': 'BYTES',
-        #     'output': '[OK] - Disk total = 0.0B, Disk used = 0.0B '
-        # }
-        total = metrics_dict.get(calculate_metric, {}).get('value', None)
-        used = metrics_dict.get(metric_str + '_used', {}).get('value', None)
-        if total is None or used is None:
-            continue
-        metrics_dict[metric_str + '_util'] = {
-            'value': '0.0' if int(float(total)) == 0 else str(
-                calculate_util(used, float(total))),
-            'unit': '%', 'output': ''}
-    state_list = []
-    for active_metric in ['rta', 'pl']:
-        active_metric_dict = metrics_dict.pop(active_metric, {})
-        if not active_metric_dict:
-            continue
-        state_list.append(active_metric_dict['output'].strip().upper())
-    state = NODE_ON if NODE_ON in state_list else NODE_OFF
-    covert_state = {NODE_ON: 'on', NODE_OFF: 'off'}
-    metrics_dict['node_active'] = \
-        {'value': covert_state[state], 'unit': '', 'output': ''}
+def _datasource_frame(datasource_results):
+    frames = [
+        DataFrame(series.get('values', []), columns=series['columns'],
+                  dtype=object)
+        for datasource in datasource_results if datasource
+        for series in datasource.raw.get('series', [])
+    ]
+    if not frames:
+        return DataFrame(columns=DATASOURCE_COLUMNS, dtype=object)
+    return concat(frames, ignore_index=True)[DATASOURCE_COLUMNS]
+
+
+def _metric_series(frame, metric, values):
+    rows = (frame['metric'] == metric).values
+    return Series(
+        values[rows].values, index=frame['hostname'][rows].values
+    ).dropna()
+
+
+def _calculate_util_frame(frame, values):
+    util_frames = []
+    for metric_str in ['disk', 'memory']:
+        total, used = _metric_series(
+            frame, metric_str + '_total', values
+        ).align(
+            _metric_series(frame, metric_str + '_used', values), join='inner'
+        )
+        util = (100.0 * used / total).round(2).astype(str).where(
+            total.abs() >= 1, '0.0')
+        util_frames.append(DataFrame({
+            'hostname': util.index, 'metric': metric_str + '_util',
+            'value': util.values, 'unit': '%', 'output': ''
+        }, columns=DATASOURCE_COLUMNS))
+    return util_frames
+
+
+def _node_active_frame(frame, hostlist):
+    state = frame['output'].astype(str).str.strip().str.upper()
+    on_nodes = set(frame['hostname'][
+        frame['metric'].isin(['rta', 'pl']) & (state == NODE_ON)
+    ])
+    return DataFrame({
+        'hostname': hostlist,
+        'metric': 'node_active',
+        'value': ['on' if host in on_nodes else 'off' for host in hostlist],
+        'unit': '', 'output': ''
+    }, columns=DATASOURCE_COLUMNS)
 
 
 def convert_datasource(datasource_results, hostlist):
-    node_info_dict = defaultdict(dict)
-    for datasource in datasource_results:
-        if not datasource:
-            continue
-        for points in datasource.get_points():
-            host = points['hostname']
-            if host not in hostlist:
-                continue
-            value, metric, output_data, unit = \
-                points['value'], points['metric'], \
-                points['output'], points['unit']
-            value, unit = convert_unit(value, unit)
-            value_dict = {
-                'value': str(value),
-                'unit': unit,
-                'output': output_data
-            }
-            node_info_dict[host][metric] = value_dict
+    """
+        Convert the points of all hosts column by column, return a DataFrame
+        with the columns of DATASOURCE_COLUMNS, for example:
 
-    off_nodes = set(hostlist) - set(node_info_dict.keys())
-    if off_nodes:
-        for off_node in off_nodes:
-            node_info_dict[off_node]['rta'] = \
-                {'value': '', 'output': 'DOWN', 'unit': 'seconds'}
-            node_info_dict[off_node]['pl'] = \
-                {'value': '', 'output': 'DOWN', 'unit': 'percent'}
+            hostname    metric      value       unit    output
+            head        cpu_util    10          %       [OK] - CPU ...
+            head        memory_used 1024.0      BYTES   [OK] - Memory ...
+            head        memory_util 25.0        %
+            head        node_active on
 
+        Values are strings, sized values are converted to BYTES,
+        the rta/pl points are replaced by node_active.
     """
-        node_info_dict for example:
-            {
-                'head': {
-                    'cpu_util': {
-                        'value': '10',
-                        'output': '[OK] - CPU Utiliztion = 10%',
-                        'unit': '%'},
-                    ...
-                    'rta': {
-                        'value': '0.00023',
-                        'output': 'UP', # UP or DOWN
-                        'unit': 'seconds'
-                    },
-                    'pl': {
-                        'value': '0',
-                        'output': 'UP', # UP or DOWN
-                        'unit': 'percent'
-                   }
-                },
-                ...
-            }
-    """
-    return node_info_dict
+    hostlist = list(dict.fromkeys(hostlist))
+    frame = _datasource_frame(datasource_results)
+    frame = frame[frame['hostname'].isin(hostlist)].drop_duplicates(
+        ['hostname', 'metric'], keep='last')
+
+    factor = frame['unit'].str.upper().map(UNIT_MAPPING)
+    values = to_numeric(frame['value'], errors='coerce') * factor.fillna(1.0)
+    converted = factor.notna() & values.notna()
+    frame = frame.assign(
+        value=frame['value'].astype(str).where(
+            ~converted, values.astype(str)),
+        unit=frame['unit'].where(~converted, 'BYTES')
+    )
+
+    return concat(
+        [frame[~frame['metric'].isin(['rta', 'pl'])]] +
+        _calculate_util_frame(frame, values) +
+        [_node_active_frame(frame, hostlist)],
+        ignore_index=True
+    ).drop_duplicates(['hostname', 'metric'], keep='last')
 
 
 def init_datasource():
@@ -981,26 +995,33 @@ def init_datasource():
     hostlist = ClusterClient().get_hostlist()
     if not datasource_results:
         return datasource_list
-    node_info_dict = convert_datasource(datasource_results, hostlist)
-
-    for hostname, metrics_dict in node_info_dict.items():
-        node_info = \
-            NodesInfo(hostname, NodeMetric(), GpuPhysicsMetric(), JobMetric())
-        _init_datasource(metrics_dict)
-        memory_total = metrics_dict.get('memory_total', {}).get('value', 0)
-        for metric, value_dict in metrics_dict.items():
-            if not value_dict:
-                continue
-            if metric.startswith('gpu'):
-                set_gpu_attr(metric, node_info.gpu_metric, value_dict)
-                continue
-            if metric.startswith('job'):
-                set_job_attr(
-                    metric, node_info.job_metric, value_dict, memory_total
-                )
-                continue
-            set_node_attr(metric, node_info.node_metric, value_dict)
-        datasource_list.append(node_info)
+    frame = convert_datasource(datasource_results, hostlist)
+
+    node_info_dict = {
+        hostname: NodesInfo(
+            hostname, NodeMetric(), GpuPhysicsMetric(), JobMetric())
+        for hostname in frame['hostname'].unique()
+    }
+    memory_total_rows = frame['metric'] == 'memory_total'
+    memory_totals = dict(zip(
+        frame['hostname'][memory_total_rows],
+        frame['value'][memory_total_rows]
+    ))
+    for hostname, metric, value, unit, output in zip(
+            *(frame[column] for column in DATASOURCE_COLUMNS)):
+        node_info = node_info_dict[hostname]
+        value_dict = {'value': value, 'unit': unit, 'output': output}
+        if metric.startswith('gpu'):
+            set_gpu_attr(metric, node_info.gpu_metric, value_dict)
+            continue
+        if metric.startswith('job'):
+            set_job_attr(
+                metric, node_info.job_metric, value_dict,
+                memory_totals.get(hostname, 0)
+            )
+            continue
+        set_node_attr(metric, node_info.node_metric, value_dict)
+    datasource_list.extend(node_info_dict.values())
     return datasource_list
 
 
@@ -16,6 +16,7 @@ import logging
 import re
 from abc import ABCMeta, abstractmethod
 
+from django.db.models import Count
 from influxdb.exceptions import InfluxDBClientError, InfluxDBServerError
 from rest_framework.response import Response
 
@@ -244,10 +245,13 @@ class GroupTendencyBaseView(APIView, metaclass=ABCMeta):  # pragma: no cover
 
 class GroupHeatBaseView(APIView, metaclass=ABCMeta):  # pragma: no cover
     LAST_VALUE_PERIOD = '30s'
+    EMPTY_VALUE = None
 
     def get(self, request, groupname):
         nodesdata = ClusterClient().get_group_nodelist(groupname)
         # nodesdata = list(groupobject.nodes.values("id", "hostname"))
+        if not nodesdata:
+            return self.return_success(nodesdata)
         metric = self.get_db_metric()
         if len(metric) == 2:
             _params = {}
@@ -256,22 +260,23 @@ class GroupHeatBaseView(APIView, metaclass=ABCMeta):  # pragma: no cover
                                 f"{_metric}_out": f"{_metric}_out"})
         else:
             _params = {"metric": metric}
+        # One query grouped by host for the whole node group,
+        # the result is joined with the node list in memory.
+        sql = self.get_sql().format(
+            field_sql=self.get_scale_data['sql'],
+            table=self.get_db_table(),
+            period=self.LAST_VALUE_PERIOD
+        )
+        logger.info("sql:%s", sql)
         try:
-            for item in nodesdata:
-                sql = self.get_sql().format(
-                    field_sql=self.get_scale_data['sql'],
-                    table=self.get_db_table(),
-                    period=self.LAST_VALUE_PERIOD
-                )
-                logger.info("sql:%s", sql)
-                data = InfluxClient().get(sql,
-                                          bind_params=dict({
-                                              "host": item['hostname']
-                                          }, **_params))
-                data = self.handle_query_data(data)
-                item.update(data)
-        except InfluxDBServerError or InfluxDBClientError as e:
+            data = InfluxClient().get(sql, bind_params=_params)
+        except (InfluxDBServerError, InfluxDBClientError) as e:
             raise InfluxDBException from e
+        host_values = self.handle_query_data(data)
+        for item in nodesdata:
+            item['value'] = host_values.get(
+                item['hostname'], self.EMPTY_VALUE
+            )
         return self.return_success(nodesdata)
 
     @abstractmethod
@@ -289,16 +294,23 @@ class GroupHeatBaseView(APIView, metaclass=ABCMeta):  # pragma: no cover
         return {'sql': 'LAST(value)', 'handle_key': ['last']}
 
     def get_sql(self):
-        sql = "select {field_sql} from hour.{table} where  host=$host \
-         and metric=$metric and time > now() - {period}"
+        sql = "select host, {field_sql} from hour.{table} where \
+         metric=$metric and time > now() - {period} group by host"
         return sql
 
     def handle_query_data(self, data):
+        """
+        Return the last value of every host, for example:
+        {
+            'c1': 12.5,
+            'c2': 3.0
+        }
+        """
         handle_key = self.get_scale_data['handle_key'][0]
-        for item in data.get_points():
-            return {'value': str_to_float(item[handle_key])}
-        else:
-            return {'value': None}
+        return {
+            point['host']: str_to_float(point[handle_key])
+            for point in data.get_points()
+        }
 
     def return_success(self, data, *args, **kwargs):
         return Response({"heat": data})
@@ -307,41 +319,62 @@ class GroupHeatBaseView(APIView, metaclass=ABCMeta):  # pragma: no cover
 class GroupHeatGpuBaseView(GroupHeatBaseView):  # pragma: no cover
 
     def get_sql(self):
-        sql = "select {field_sql} from hour.{table} where  host=$host \
-         and metric=$metric and index=$index and time > now() - {period}"
+        sql = "select host, index, {field_sql} from hour.{table} where \
+         metric=$metric and time > now() - {period} group by host, index"
         return sql
 
     def get(self, request, groupname):
         gpu_heat_data = []
         nodesdata = ClusterClient().get_group_nodelist(groupname)
         # nodesdata = list(groupobject.nodes.values("id", "hostname"))
-        metric = self.get_db_metric()
-        _params = {"metric": metric}
+        if not nodesdata:
+            return self.return_success(gpu_heat_data)
+        hostnames = [item['hostname'] for item in nodesdata]
+        gpu_count = dict(
+            MonitorNode.objects.filter(
+                hostname__in=hostnames
+            ).annotate(
+                gpu_count=Count('gpu')
+            ).values_list('hostname', 'gpu_count')
+        )
+        sql = self.get_sql().format(
+            field_sql=self.get_scale_data['sql'],
+            table=self.get_db_table(),
+            period=self.LAST_VALUE_PERIOD
+        )
+        logger.info("sql:%s", sql)
         try:
-            for item in nodesdata:
-                hostname = item['hostname']
-                gpu_number = MonitorNode.objects.get(
-                    hostname=hostname).gpu.count()
-                for index in range(gpu_number):
-                    _params['index'] = str(index)
-                    sql = self.get_sql().format(
-                        field_sql=self.get_scale_data['sql'],
-                        table=self.get_db_table(),
-                        period=self.LAST_VALUE_PERIOD
-                    )
-                    logger.info("sql:%s", sql)
-                    data = InfluxClient().get(sql,
-                                              bind_params=dict({
-                                                  "host": hostname
-                                              }, **_params))
-                    data = self.handle_query_data(data)
-                    gpu_heat_data.append({"hostname": hostname,
-                                          "gpu_index": index,
-                                          "value": data['value']})
-        except InfluxDBServerError or InfluxDBClientError as e:
+            data = InfluxClient().get(
+                sql, bind_params={"metric": self.get_db_metric()}
+            )
+        except (InfluxDBServerError, InfluxDBClientError) as e:
             raise InfluxDBException from e
+        gpu_values = self.handle_query_data(data)
+        for hostname in hostnames:
+            for index in range(gpu_count.get(hostname, 0)):
+                gpu_heat_data.append({
+                    "hostname": hostname,
+                    "gpu_index": index,
+                    "value": gpu_values.get(
+                        (hostname, str(index)), self.EMPTY_VALUE
+                    )
+                })
         return self.return_success(gpu_heat_data)
 
+    def handle_query_data(self, data):
+        """
+        Return the last value of every gpu, for example:
+        {
+            ('c1', '0'): 12.5,
+            ('c1', '1'): 3.0
+        }
+        """
+        handle_key = self.get_scale_data['handle_key'][0]
+        return {
+            (point['host'], point['index']): str_to_float(point[handle_key])
+            for point in data.get_points()
+        }
+
 
 class ClusterTendencyBaseView(APIView, metaclass=ABCMeta):  # pragma: no cover
     TENDENCY_INTERVAL_TIME = {
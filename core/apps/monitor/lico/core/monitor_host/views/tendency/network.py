@@ -164,15 +164,15 @@ class GroupHeatNetworkView(GroupHeatBaseView):
     def get_scale_data(self):
         return {'sql': 'last(value)', 'handle_key': ['last']}
 
+    EMPTY_VALUE = ',,,'
+
     def sql_factory(self, db_metric):
         db_in = f"{db_metric}_in"
         db_out = f"{db_metric}_out"
-        sql_in = "select {field_sql} from hour.{table} where " \
-                 "host=$host and metric=$%s " \
-                 "and time > now() - {period}"
-        sql_out = "select {field_sql} from hour.{table} where " \
-                  "host=$host and metric=$%s " \
-                  "and time > now() - {period}"
+        sql_in = "select host, {field_sql} from hour.{table} where " \
+                 "metric=$%s and time > now() - {period} group by host"
+        sql_out = "select host, {field_sql} from hour.{table} where " \
+                  "metric=$%s and time > now() - {period} group by host"
         sql = "%s;%s" % (sql_in % db_in, sql_out % db_out)
         return sql
 
@@ -184,14 +184,20 @@ class GroupHeatNetworkView(GroupHeatBaseView):
 
     def handle_query_data(self, data):
         handle_key = self.get_scale_data['handle_key'][0]
-        value = []
-        for ret in (data[:2], data[2:]):
-            current = [p.get(handle_key, '')
-                       for a in ret
-                       for p in a.get_points()]
-            value += current if len(current) == 2 else ['', '']
-
-        return {'value': ','.join(value)}
+        # eth_in, eth_out, ib_in, ib_out
+        metric_values = [
+            {p['host']: p.get(handle_key, '') for p in ret.get_points()}
+            for ret in data
+        ]
+        hosts = set().union(*metric_values)
+        result = {}
+        for host in hosts:
+            value = []
+            for ret in (metric_values[:2], metric_values[2:]):
+                current = [a[host] for a in ret if host in a]
+                value += current if len(current) == 2 else ['', '']
+            result[host] = ','.join(value)
+        return result
 
 
 class NodeHistoryIbView(NodeHistoryNetworkView):
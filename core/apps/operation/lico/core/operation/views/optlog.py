@@ -39,6 +39,9 @@ logger = logging.getLogger(__name__)
 
 
 class OptLogView(DataTableView):
+    keyset_pagination = True
+    count_limit = 10000
+    prefix_search = True
     columns_mapping = {
         'id': 'id',
         'operator': 'operator',
@@ -17,6 +17,7 @@ import logging
 from dateutil.tz import tzutc
 from rest_framework.response import Response
 
+from lico.core.contrib.authentication import remote_auth_cache
 from lico.core.contrib.schema import json_schema_validate
 
 from ..models import ApiKey, User
@@ -86,6 +87,7 @@ class ApiKeyView(APIView):
                 api_key=api_key,
             )
         )
+        remote_auth_cache.invalidate(request.user.username)
 
         return Response()
 
@@ -111,10 +113,12 @@ class ApiKeyView(APIView):
         ).update(
             expire_time=expire_time
         )
+        remote_auth_cache.invalidate(request.user.username)
         return Response()
 
     def delete(self, request):
         request.user.apikey.delete()
+        remote_auth_cache.invalidate(request.user.username)
         return Response()
 
 
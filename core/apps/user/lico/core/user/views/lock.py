@@ -19,6 +19,7 @@ from django.db.transaction import atomic
 from django.utils.timezone import now
 from rest_framework.response import Response
 
+from lico.core.contrib.authentication import remote_auth_cache
 from lico.core.contrib.permissions import AsAdminRole
 from lico.core.contrib.schema import json_schema_validate
 
@@ -58,6 +59,7 @@ class LockView(APIView):
             hours=request.data["hours"]
         )
         user.save()
+        remote_auth_cache.invalidate(user.username)
         return Response()
 
     @atomic
@@ -90,6 +92,7 @@ class FullLockView(APIView):
         user.fail_chances = 0
         user.effective_time = date(year=MAXYEAR, month=12, day=31)
         user.save()
+        remote_auth_cache.invalidate(user.username)
 
         # Deny ssh access
         Libuser().modify_user_lock(user.username, lock=True)
@@ -31,6 +31,7 @@ from django.utils import timezone
 from rest_framework.exceptions import PermissionDenied
 from rest_framework.response import Response
 
+from lico.core.contrib.authentication import remote_auth_cache
 from lico.core.contrib.eventlog import EventLog
 from lico.core.contrib.permissions import AsAdminRole
 from lico.core.contrib.schema import json_schema_validate
@@ -299,6 +300,7 @@ class UserDetailView(APIView):
                 raise InvalidLibuserOperation from e
         delete_user_id = delete_user.id
         delete_user.delete()
+        remote_auth_cache.invalidate(delete_user_username)
         EventLog.opt_create(
             request.user.username, EventLog.user, EventLog.delete,
             EventLog.make_list(delete_user_id, delete_user_username)
@@ -340,6 +342,7 @@ class UserDetailView(APIView):
                 if key in request.data
             }
         DataBase().update_user(pk=pk, data=data)
+        remote_auth_cache.invalidate(other_user.username)
 
         # Only admin can modify group info
         if request.user.is_admin and \
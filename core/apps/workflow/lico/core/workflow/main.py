@@ -31,7 +31,6 @@ class Application(AbstractApplication):
         )
         scheduler.add_job(
             func=scanner.workflow_beat,
-            args=[int(settings.WORKFLOW.WORKFLOW_BEAT_INTERVAL)],
             trigger='interval',
             seconds=settings.WORKFLOW.WORKFLOW_BEAT_INTERVAL,
             max_instances=1,
@@ -13,14 +13,27 @@
 # limitations under the License.
 
 import logging
+from collections import Counter
+from datetime import timedelta
+from os import path
+
+from django.conf import settings
+from django.utils import timezone
 
 from lico.core.contrib.client import Client
 
-from ..models import Workflow
+from ..models import Workflow, WorkflowStepJob
 from .state import JobOperateState, JobState
 
 logger = logging.getLogger(__name__)
 
+QUERY_JOBS_BATCH_SIZE = 1000
+JOB_STATE_FIELDS = ['id', 'state', 'operate_state']
+# job_id of a step job claimed by a scan and being submitted
+SUBMITTING_JOB_ID = 0
+# a claim this old was lost together with its scan
+SUBMITTING_TIMEOUT = timedelta(minutes=10)
+
 job_running_state = JobState.get_waiting_state_values()
 job_finished_state = JobState.get_final_state_values()
 job_operate_state = {
@@ -32,120 +45,212 @@ job_operate_state = {
 }
 
 
-def cancel_workflow(workflow):
+class ScanContext(object):
+    """
+    Job states shared by the workflows advanced in one scan, fetched in
+    bulk through the internal job API, and the counters of that scan.
+    """
+
+    def __init__(self):
+        self.stats = Counter()
+        self._jobs = {}
+
+    def prefetch(self, job_ids):
+        missing = sorted({
+            job_id for job_id in job_ids
+            if job_id not in (None, -1, SUBMITTING_JOB_ID)
+            and job_id not in self._jobs
+        })
+        job_client = Client().job_client()
+        for i in range(0, len(missing), QUERY_JOBS_BATCH_SIZE):
+            batch = missing[i:i + QUERY_JOBS_BATCH_SIZE]
+            self.stats['query_calls'] += 1
+            try:
+                jobs = job_client.query_jobs_in_range(
+                    job_ids=batch, fields=JOB_STATE_FIELDS
+                )
+            except Exception:
+                logger.exception('query jobs error, ids: %s', batch)
+                continue
+            self.stats['queried_jobs'] += len(batch)
+            self._jobs.update(dict.fromkeys(batch))
+            self._jobs.update((job['id'], job) for job in jobs)
+
+    def prefetch_workflows(self, workflow_ids):
+        self.prefetch(
+            WorkflowStepJob.objects.filter(
+                workflow_step__workflow__in=workflow_ids
+            ).exclude(job_id__isnull=True).values_list('job_id', flat=True)
+        )
+
+    def get_job(self, job_id):
+        if job_id not in self._jobs:
+            self.prefetch([job_id])
+        return self._jobs.get(job_id)
+
+
+def cancel_workflow(workflow, context):
     job_client = Client().job_client(username=workflow.owner)
-    steps = workflow.workflow_steps.iterator()
-    for step in steps:
-        step_jobs_query = step.step_job
-        if step_jobs_query.count() > 0:
-            jobs_id = step_jobs_query.values_list(
-                "job_id", flat=True
-            )
-            for job_id in jobs_id:
-                if job_id in [None, -1]:
-                    continue
-                try:
-                    job_dict = job_client.query_job(job_id)
-                except Exception:
-                    logger.exception('query job error, id:%s', job_id)
-                else:
-                    if job_dict['state'] in job_running_state:
-                        try:
-                            job_client.cancel_job(job_id)
-                            logger.info('cancelled a job, id: %s', job_id)
-                        except Exception:
-                            logger.exception('cancel job error, id:%s', job_id)
-
-
-def scan_workflow(workflow):
-    steps = workflow.workflow_steps.order_by('order').iterator()
+    jobs_id = WorkflowStepJob.objects.filter(
+        workflow_step__workflow=workflow
+    ).exclude(job_id__isnull=True).values_list("job_id", flat=True)
+    context.prefetch(jobs_id)
+    for job_id in jobs_id:
+        if job_id in [None, -1, SUBMITTING_JOB_ID]:
+            continue
+        job_dict = context.get_job(job_id)
+        if job_dict is None:
+            logger.error('query job error, id:%s', job_id)
+        elif job_dict['state'] in job_running_state:
+            try:
+                job_client.cancel_job(job_id)
+                context.stats['cancelled'] += 1
+                logger.info('cancelled a job, id: %s', job_id)
+            except Exception:
+                logger.exception('cancel job error, id:%s', job_id)
+
+
+def scan_workflow(workflow, context):
+    """
+    Advance the workflow by the states of its step jobs and claim the
+    step jobs to submit next, they are submitted by ``submit_jobs`` once
+    the workflow lock is released.
+    """
+    step_jobs = list(
+        WorkflowStepJob.objects.filter(
+            workflow_step__workflow=workflow
+        ).defer('json_body').select_related('workflow_step').order_by(
+            'workflow_step__order', 'workflow_step_id', 'id'
+        )
+    )
+    context.prefetch(step_job.job_id for step_job in step_jobs)
     step_dict = {
         "running_job_list": [],
         "to_be_failed": False,
         "to_be_cancelled": True if workflow.status == Workflow.CANCELLING
         else False
     }
-    for step in steps:
-        step_jobs_query = step.step_job.order_by("id")
-        if step_jobs_query.count() <= 0:
-            continue
+    claimed = []
+    for index, step_job in enumerate(step_jobs):
+        if step_job.job_id is None:
+            # step_job.job_id is None, submit job
+            _claim_job(step_job, step_dict, claimed)
+        elif not _check_claim(step_job, step_dict):
+            # step_job.job_id is integer, step_job has been created
+            _query_job(step_job, step_dict, workflow.run_policy, context)
 
-        for step_job in step_jobs_query.iterator():
-            if step_job.job_id is None:
-                # step_job.job_id is None, submit job
-                _submit_job(
-                    workflow.owner, step_job, step_dict, workflow.run_policy)
-            else:
-                # step_job.job_id is integer, step_job has been created
-                _query_job(
-                    workflow.owner, step_job, step_dict, workflow.run_policy)
-
-            if len(step_dict['running_job_list']) >= workflow.max_submit_jobs:
-                # step has enough running step_job
-                return
-        if len(step_dict['running_job_list']):
+        if len(step_dict['running_job_list']) >= workflow.max_submit_jobs:
+            # step has enough running step_job
+            return claimed
+        last_of_step = index + 1 == len(step_jobs) or \
+            step_jobs[index + 1].workflow_step_id != step_job.workflow_step_id
+        if last_of_step and len(step_dict['running_job_list']):
             # step has running step_job
-            return
+            return claimed
 
     if step_dict["to_be_cancelled"]:
         workflow.status = Workflow.CANCELLED
-        workflow.save()
-        return
-    if step_dict["to_be_failed"]:
+    elif step_dict["to_be_failed"]:
         workflow.status = Workflow.FAILED
-        workflow.save()
-        return
-    workflow.status = Workflow.COMPLETED
+    else:
+        workflow.status = Workflow.COMPLETED
     workflow.save()
+    return claimed
+
+
+def submit_jobs(workflow, step_jobs, context):
+    template_client = Client().template_client(username=workflow.owner)
+    for index, step_job in enumerate(step_jobs):
+        submitted = _submit_job(template_client, step_job, context)
+        if not submitted and Workflow.ALL_COMPLETED == workflow.run_policy:
+            # give the other claims back, the next scan fails the workflow
+            WorkflowStepJob.objects.filter(
+                id__in=[other.id for other in step_jobs[index + 1:]],
+                job_id=SUBMITTING_JOB_ID
+            ).update(job_id=None)
+            return
+
 
+def _check_claim(step_job, step_dict):
+    # return True while the step_job is being submitted by another scan
+    if step_job.job_id != SUBMITTING_JOB_ID:
+        return False
+    if step_job.update_time > timezone.now() - SUBMITTING_TIMEOUT:
+        step_dict["running_job_list"].append(step_job.job_id)
+        return True
+    # the submit result is unknown, do not risk submitting it twice
+    logger.error(
+        'submit step_job lost, id: %s, name: %s',
+        step_job.id, step_job.job_name)
+    step_job.job_id = -1
+    step_job.save()
+    return False
 
-def _query_job(owner, step_job, step_dict, run_policy):
+
+def _query_job(step_job, step_dict, run_policy, context):
     if step_job.job_id == -1:
         if Workflow.ALL_COMPLETED == run_policy:
             step_dict['to_be_failed'] = True
         return
 
-    job_client = Client().job_client(username=owner)
-    try:
-        query_result = job_client.query_job(step_job.job_id)
-    except Exception as e:
-        logger.exception('query job error, id: %s', step_job.job_id)
-        logger.exception(e)
-    else:
-        if query_result['state'] in job_running_state:
-            step_dict["running_job_list"].append(step_job.job_id)
-        elif query_result['state'] in job_finished_state:
-            if query_result['operate_state'] == job_operate_state['CF']:
-                if Workflow.ALL_COMPLETED == run_policy:
-                    step_dict['to_be_failed'] = True
-            elif query_result['operate_state'] in [
-                job_operate_state['CAD'], job_operate_state['CAG']
-            ]:
-                step_dict['to_be_cancelled'] = True
-            # then completed
-
-
-def _submit_job(owner, step_job, step_dict, run_policy):
+    query_result = context.get_job(step_job.job_id)
+    if query_result is None:
+        logger.error('query job error, id: %s', step_job.job_id)
+    elif query_result['state'] in job_running_state:
+        step_dict["running_job_list"].append(step_job.job_id)
+    elif query_result['state'] in job_finished_state:
+        if query_result['operate_state'] == job_operate_state['CF']:
+            if Workflow.ALL_COMPLETED == run_policy:
+                step_dict['to_be_failed'] = True
+        elif query_result['operate_state'] in [
+            job_operate_state['CAD'], job_operate_state['CAG']
+        ]:
+            step_dict['to_be_cancelled'] = True
+        # then completed
+
+
+def _with_notify_hook(json_body):
+    notify_url = path.join(
+        settings.GATEWAY.get('URL', 'http://127.0.0.1:18080/api/'),
+        'workflow/notifyjob/'
+    )
+    return dict(
+        json_body,
+        job_notify=list(json_body.get('job_notify', [])) + [{
+            'type': 'complete',
+            'url': notify_url,
+            'method': 'POST',
+            'notice': 'lico_restapi'
+        }]
+    )
+
+
+def _claim_job(step_job, step_dict, claimed):
     if step_dict["to_be_failed"] or step_dict['to_be_cancelled']:
         # has failed or cancelled job, quit
         return
-    template_client = Client().template_client(username=owner)
+    step_job.job_id = SUBMITTING_JOB_ID
+    step_job.save()
+    claimed.append(step_job)
+    step_dict["running_job_list"].append(step_job.job_id)
+
+
+def _submit_job(template_client, step_job, context):
     try:
         submit_result = template_client.submit_template_job(
-            step_job.template_id, step_job.json_body)
-        logger.info(
-            'submit step_job completed, job_id: %s',
-            submit_result['id'])
-        step_job.job_id = submit_result['id']
-        step_job.save()
-        step_dict["running_job_list"].append(submit_result['id'])
-
+            step_job.template_id, _with_notify_hook(step_job.json_body))
     except Exception:
         # create job failed, save a especial job_id
         step_job.job_id = -1
-        step_job.save()
-        if Workflow.ALL_COMPLETED == run_policy:
-            step_dict["to_be_failed"] = True
         logger.exception(
             'submit step_job error, id: %s, name: %s',
             step_job.id, step_job.job_name)
+    else:
+        logger.info(
+            'submit step_job completed, job_id: %s',
+            submit_result['id'])
+        step_job.job_id = submit_result['id']
+        context.stats['submitted'] += 1
+    # autocommitted right away, outside of the workflow lock
+    step_job.save()
+    return step_job.job_id != -1
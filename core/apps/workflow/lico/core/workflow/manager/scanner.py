@@ -13,12 +13,14 @@
 # limitations under the License.
 
 import logging
-from datetime import timedelta
+import time
+
+from django.db import transaction
 
 from ..models import Workflow, WorkflowPeriodicTask
 from ..schedules import TzAwareCrontab
 from ..views import Operation, _handle_workflow_operation
-from .operator import cancel_workflow, scan_workflow
+from .operator import ScanContext, cancel_workflow, scan_workflow, submit_jobs
 
 logger = logging.getLogger(__name__)
 
@@ -34,35 +36,78 @@ class WorkflowScanner(object):
 
     @classmethod
     def scan(cls):
-        all_workflow = Workflow.objects.exclude(
-            status__in=workflow_finished_status).iterator()
-
-        for workflow in all_workflow:
-            # fetch one from all_workflow
-            if "starting" == workflow.status:
-                workflow.status = None
-                workflow.save()
-                scan_workflow(workflow)
-
-            elif "cancelling" == workflow.status:
-                cancel_workflow(workflow)
-                scan_workflow(workflow)
-
-            elif workflow.status is None:
-                scan_workflow(workflow)
-
-            else:
-                logger.error(
-                    "Workflow status error, id: %s, error status: %s",
-                    workflow.id, workflow.status)
-                # workflow status error
-
+        start = time.time()
+        context = ScanContext()
+        workflow_ids = list(
+            Workflow.objects.exclude(
+                status__in=workflow_finished_status
+            ).values_list('id', flat=True)
+        )
+        context.prefetch_workflows(workflow_ids)
+
+        for workflow_id in workflow_ids:
+            try:
+                cls.advance(workflow_id, context)
+            except Exception:
+                logger.exception("Scan workflow failed, id: %s", workflow_id)
+
+        logger.info(
+            "Workflow scan: %s workflows, %s jobs queried in %s calls, "
+            "%s jobs submitted, %s jobs cancelled in %.2fs",
+            len(workflow_ids), context.stats['queried_jobs'],
+            context.stats['query_calls'], context.stats['submitted'],
+            context.stats['cancelled'], time.time() - start
+        )
 
-def workflow_beat(interval):
-    tasks = WorkflowPeriodicTask.objects.filter(is_enabled=True)
+    @classmethod
+    def advance(cls, workflow_id, context=None):
+        if context is None:
+            context = ScanContext()
+        while True:
+            # lock only to decide, jobs are submitted and cancelled after
+            # the commit so the notifications are not blocked meanwhile
+            with transaction.atomic():
+                # serialize the beat scan and job notifications per workflow
+                workflow = Workflow.objects.select_for_update().filter(
+                    id=workflow_id
+                ).exclude(status__in=workflow_finished_status).first()
+                if workflow is None:
+                    return
+
+                if "starting" == workflow.status:
+                    workflow.status = None
+                    workflow.save()
+                    claimed = scan_workflow(workflow, context)
+
+                elif "cancelling" == workflow.status:
+                    claimed = scan_workflow(workflow, context)
+
+                elif workflow.status is None:
+                    claimed = scan_workflow(workflow, context)
+
+                else:
+                    logger.error(
+                        "Workflow status error, id: %s, error status: %s",
+                        workflow.id, workflow.status)
+                    # workflow status error
+                    return
+
+            if "cancelling" == workflow.status:
+                cancel_workflow(workflow, context)
+            if not claimed:
+                return
+            # the claimed step jobs are skipped by concurrent scans
+            submit_jobs(workflow, claimed, context)
+
+
+def workflow_beat():
     now = TzAwareCrontab().now()
+    tasks = WorkflowPeriodicTask.objects.filter(
+        is_enabled=True, next_run_at__lte=now
+    ).select_related(
+        'workflow', 'crontab', 'clocked'
+    ).order_by('next_run_at')
 
-    last_scan_at = now - timedelta(seconds=interval)
     for task in tasks.iterator():
         # If last_run_at is None, means the task has never been triggered.
         if not task.last_run_at and task.workflow.status == Workflow.CREATED:
@@ -70,11 +115,6 @@ def workflow_beat(interval):
         else:
             operation = Operation.RERUN
 
-        schedstate = task.schedule.is_due(last_scan_at)
-
-        if not schedstate.is_due:
-            continue  # wait for next beat
-
         # run or rerun the workflow
         try:
             _handle_workflow_operation(task.workflow, operation)
@@ -83,14 +123,12 @@ def workflow_beat(interval):
                 "Unexpected workflow {0} for the loop, the status is {1} "
                 "and skip it".format(task.workflow.id, task.workflow.status)
             )
-            continue
+        else:
+            task.last_run_at = now
+            task.total_run_count += 1
         finally:
             # disable clocked workflows once the trigger time passed
             if task.is_one_off:
                 task.is_enabled = False
-                task.save()
-
-        task.last_run_at = now
-        task.total_run_count += 1
-
-        task.save()
+            # move next_run_at past now, also when the trigger failed
+            task.save()
@@ -0,0 +1,67 @@
+# Copyright 2015-present Lenovo
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from django.db import migrations, models
+
+
+def fill_next_run_at(apps, schema_editor):
+    from lico.core.workflow.models import cronexp, next_cron_time
+
+    WorkflowPeriodicTask = apps.get_model('workflow', 'WorkflowPeriodicTask')
+
+    tasks = WorkflowPeriodicTask.objects.filter(
+        is_enabled=True
+    ).select_related('crontab', 'clocked')
+    for task in tasks.iterator():
+        if task.clocked:
+            task.next_run_at = task.clocked.clocked_time
+        elif task.crontab:
+            crontab = task.crontab
+            task.next_run_at = next_cron_time(
+                ' '.join(cronexp(field) for field in (
+                    crontab.minute, crontab.hour, crontab.day_of_month,
+                    crontab.month_of_year, crontab.day_of_week
+                )),
+                crontab.timezone, task.last_run_at
+            )
+        else:
+            continue
+        task.save(update_fields=['next_run_at'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workflow', '0002_lico_workflow_1_2_0'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='workflowperiodictask',
+            name='next_run_at',
+            field=models.DateTimeField(
+                blank=True,
+                db_index=True,
+                editable=False,
+                help_text='Datetime that the schedule will next trigger '
+                          'the task to run. '
+                          'None if is_enabled is set to False.',
+                null=True,
+                verbose_name='Next Run Datetime'
+            ),
+        ),
+        migrations.RunPython(
+            fill_next_run_at, migrations.RunPython.noop
+        ),
+    ]
@@ -127,6 +127,13 @@ class WorkflowPeriodicTask(Model):
         help_text='Datetime that the schedule last triggered the task to run. '
                   'Reset to None if is_enabled is set to False.'
     )
+    next_run_at = models.DateTimeField(
+        auto_now=False, auto_now_add=False,
+        editable=False, blank=True, null=True, db_index=True,
+        verbose_name='Next Run Datetime',
+        help_text='Datetime that the schedule will next trigger the task to '
+                  'run. None if is_enabled is set to False.'
+    )
     total_run_count = models.PositiveIntegerField(
         default=0, editable=False,
         verbose_name='Total Run Count',
@@ -154,6 +161,11 @@ class WorkflowPeriodicTask(Model):
         if self.crontab is None and self.clocked is None:
             raise ValidationError("Please set one schedule type")
 
+        self.next_run_at = self.get_next_run_at()
+        update_fields = kw.get('update_fields')
+        if update_fields is not None and 'next_run_at' not in update_fields:
+            kw['update_fields'] = list(update_fields) + ['next_run_at']
+
         super().save(*a, **kw)
 
     @property
@@ -167,8 +179,7 @@ class WorkflowPeriodicTask(Model):
     def is_one_off(self):
         return self.clocked is not None
 
-    @property
-    def next_run_at(self):
+    def get_next_run_at(self):
         # Both the task has no crontab or clocked and the task is disabled,
         # then the next_run_at is None
         if self.is_enabled is False:
@@ -176,30 +187,32 @@ class WorkflowPeriodicTask(Model):
         if self.clocked:
             return self.clocked.clocked_time
         if self.crontab:
-            now = start_time = datetime.utcnow().astimezone(
-                tz=self.crontab.timezone
+            return next_cron_time(
+                self.crontab.to_cron, self.crontab.timezone, self.last_run_at
             )
-            if self.last_run_at:
-                start_time = self.last_run_at.astimezone(
-                    tz=self.crontab.timezone
-                )
-            itr = croniter.croniter(self.crontab.to_cron, start_time)
-            next_run = itr.get_next(datetime)
-            if next_run >= now:
-                return next_run
-            else:
-                return croniter.croniter(
-                    self.crontab.to_cron, now
-                ).get_next(datetime)
 
     def as_dict_on_finished(
             self, result, is_exlucded, **kwargs
     ):
         if not is_exlucded('next_run_at'):
-            result['next_run_at'] = self.next_run_at
+            result['next_run_at'] = self.get_next_run_at()
         return result
 
 
+def next_cron_time(cron, tz, last_run_at=None):
+    """
+    Next fire time of the cron expression after ``last_run_at``, or after
+    now if that one has already passed.
+    """
+    now = start_time = datetime.now(tz=tz)
+    if last_run_at:
+        start_time = last_run_at.astimezone(tz=tz)
+    next_run = croniter.croniter(cron, start_time).get_next(datetime)
+    if next_run >= now:
+        return next_run
+    return croniter.croniter(cron, now).get_next(datetime)
+
+
 def cronexp(field):
     """Representation of cron expression."""
     return field and str(field).replace(' ', '') or '*'
@@ -15,8 +15,8 @@
 from django.urls import path
 
 from .views import (
-    WorkflowDetailView, WorkflowStepJobMoveView, WorkflowStepJobView,
-    WorkflowStepView, WorkflowView,
+    WorkflowDetailView, WorkflowJobNotifyView, WorkflowStepJobMoveView,
+    WorkflowStepJobView, WorkflowStepView, WorkflowView,
 )
 
 urlpatterns = [
@@ -25,4 +25,7 @@ urlpatterns = [
     path('step/<int:workflow_id>/', WorkflowStepView.as_view()),
     path('job/<int:step_id>/', WorkflowStepJobView.as_view()),
     path('job/<int:step_id>/move/', WorkflowStepJobMoveView.as_view()),
+
+    # internal view
+    path('notifyjob/', WorkflowJobNotifyView.as_view()),
 ]
@@ -21,7 +21,7 @@ from django.utils import timezone
 from rest_framework.response import Response
 
 from lico.core.contrib.schema import json_schema_validate
-from lico.core.contrib.views import APIView, DataTableView
+from lico.core.contrib.views import APIView, DataTableView, InternalAPIView
 
 from . import schedules
 from .exceptions import (
@@ -599,3 +599,28 @@ class WorkflowStepJobMoveView(APIView):
 
         ret_dict = job.as_dict(inspect_related=False)
         return Response(ret_dict)
+
+
+class WorkflowJobNotifyView(InternalAPIView):
+    """
+    Completion hook of the step jobs, advance the owning workflow right
+    away instead of waiting for the next scan.
+    """
+
+    def post(self, request):
+        from .manager.scanner import WorkflowScanner
+
+        job_id = request.data.get('id')
+        workflow_ids = WorkflowStepJob.objects.filter(
+            job_id=job_id
+        ).values_list(
+            'workflow_step__workflow_id', flat=True
+        ).distinct() if isinstance(job_id, int) and job_id > 0 else []
+        for workflow_id in workflow_ids:
+            try:
+                WorkflowScanner.advance(workflow_id)
+            except Exception:
+                logger.exception(
+                    'Advance workflow failed, id: %s', workflow_id
+                )
+        return Response({})
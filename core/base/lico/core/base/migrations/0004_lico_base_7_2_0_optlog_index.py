@@ -0,0 +1,45 @@
+# Copyright 2015-present Lenovo
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0003_lico_base_7_2_0'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='operationlog',
+            index=models.Index(
+                fields=['operate_time'],
+                name='base_operat_operate_06ed1a_idx'
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='operationlog',
+            index=models.Index(
+                fields=['operator', 'operate_time'],
+                name='base_operat_operato_3ec55e_idx'
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='operationlog',
+            index=models.Index(
+                fields=['module', 'operate_time'],
+                name='base_operat_module_94550b_idx'
+            ),
+        ),
+    ]
@@ -85,6 +85,13 @@ class OperationLog(models.Model):
         max_length=128, null=False, blank=False)
     operator = models.CharField(max_length=256, null=False, blank=False)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['operate_time']),
+            models.Index(fields=['operator', 'operate_time']),
+            models.Index(fields=['module', 'operate_time']),
+        ]
+
 
 class LogDetail(models.Model):
     object_id = models.IntegerField()
@@ -19,11 +19,11 @@ from datetime import datetime
 from os import path
 from typing import Any, Dict
 
-import requests
 from dateutil.tz import tzutc
 from requests.exceptions import HTTPError
 
 from lico.client.contrib.exception import Unauthorized, UnknownError
+from lico.client.contrib.session import get_session
 
 from .dataclass import HostPasswd, HostUser, LocalUserNotFound, User
 
@@ -35,11 +35,19 @@ class AuthClient(metaclass=ABCMeta):
         self,
         secret,
         url: str = 'http://127.0.0.1:18080/api/',
-        timeout: int = 30
+        timeout: int = 30,
+        pool_size: int = 10,
+        max_retries: int = 3,
+        backoff_factor: float = 0.3
     ):
         self.secret = secret
         self.url = url
         self.timeout = timeout
+        self.session = get_session(
+            pool_size=pool_size,
+            max_retries=max_retries,
+            backoff_factor=backoff_factor
+        )
 
     def auth(self, authorization: str) -> User:
         return self._get_user_info(
@@ -56,7 +64,7 @@ class AuthClient(metaclass=ABCMeta):
         )
 
     def _get_user_info(self, **kwargs):
-        response = requests.get(
+        response = self.session.get(
             url=path.join(self.url, 'user/auth/'),
             timeout=self.timeout,
             **kwargs
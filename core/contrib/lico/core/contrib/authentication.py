@@ -12,7 +12,11 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import hashlib
+import threading
+import time
 from abc import ABCMeta, abstractmethod
+from collections import OrderedDict
 
 from rest_framework.authentication import (
     BaseAuthentication, get_authorization_header,
@@ -70,9 +74,91 @@ class LicoAuthentication(BaseAuthentication, metaclass=ABCMeta):
             ) from e
 
 
+class RemoteAuthCache:
+    """
+    Process wide LRU cache of the users verified by the remote auth api,
+    entries live for ``ttl`` seconds but never beyond the jwt ``exp``.
+    """
+
+    def __init__(self, maxsize=4096, ttl=60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._users = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(keyword, token):
+        return hashlib.sha256(f'{keyword} {token}'.encode()).hexdigest()
+
+    @staticmethod
+    def _token_exp(keyword, token):
+        if keyword != 'jwt':
+            return None
+        import jwt
+        try:
+            payload = jwt.decode(token, options={'verify_signature': False})
+        except jwt.InvalidTokenError:
+            return 0
+        exp = payload.get('exp')
+        return exp if isinstance(exp, (int, float)) else None
+
+    def get(self, keyword, token):
+        key = self._key(keyword, token)
+        with self._lock:
+            entry = self._users.get(key)
+            if entry is not None and entry[1] > time.monotonic():
+                self._users.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            if entry is not None:
+                del self._users[key]
+            self.misses += 1
+            return None
+
+    def set(self, keyword, token, user):
+        expires = time.monotonic() + self.ttl
+        exp = self._token_exp(keyword, token)
+        if exp is not None:
+            expires = min(expires, time.monotonic() + exp - time.time())
+        key = self._key(keyword, token)
+        with self._lock:
+            self._users[key] = (user, expires)
+            self._users.move_to_end(key)
+            while len(self._users) > self.maxsize:
+                self._users.popitem(last=False)
+
+    def invalidate(self, username=None):
+        """Drop the entries of ``username``, or all entries if None."""
+        with self._lock:
+            if username is None:
+                self._users.clear()
+                return
+            for key in [
+                key for key, (user, _) in self._users.items()
+                if user.username == username
+            ]:
+                del self._users[key]
+
+    def stats(self):
+        with self._lock:
+            return dict(
+                hits=self.hits, misses=self.misses,
+                size=len(self._users), maxsize=self.maxsize
+            )
+
+
+remote_auth_cache = RemoteAuthCache()
+
+
 def _remote_auth(keyword, token):
     from lico.core.contrib.client import Client
 
+    user = remote_auth_cache.get(keyword, token)
+    if user is not None:
+        return user, None
+
     client = Client().auth_client()
 
     try:
@@ -87,6 +173,7 @@ def _remote_auth(keyword, token):
             detail='Unknown Error occured when call remote authenicate:'
         ) from e
 
+    remote_auth_cache.set(keyword, token, user)
     return user, None
 
 
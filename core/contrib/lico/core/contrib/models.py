@@ -12,6 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import re
 from typing import Callable, Dict, Iterable, Optional
 
 from django.db.models import Model as BaseModel
@@ -141,6 +142,20 @@ class QuerySet(BaseQuerySet):
 
         return self.extra(where=[where_clause])  # nosec
 
+    def ci_prefix_search(self, **kwargs):
+        # case insensitive search by prefix, which can use the column index
+        db_table_name = self.model._meta.db_table
+        where_clauses, params = [], []
+        for prop, keyword in kwargs.items():
+            where_clauses.append(
+                f"{db_table_name}.{prop} LIKE %s COLLATE utf8_general_ci"
+            )
+            params.append(re.sub(r'([\\%_])', r'\\\1', keyword) + '%')
+
+        return self.extra(  # nosec
+            where=[' OR '.join(where_clauses)], params=params
+        )
+
     def ci_exact(self, **kwargs):
         # query with case insensitive
         db_table_name = self.model._meta.db_table
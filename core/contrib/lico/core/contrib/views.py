@@ -15,7 +15,11 @@
 import json
 import logging
 from abc import ABCMeta, abstractmethod
+from functools import reduce
+from operator import or_
 
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Q
 from jsonschema import ValidationError, validate
 from rest_framework.response import Response
 from rest_framework.views import APIView as BaseAPIView
@@ -23,6 +27,7 @@ from rest_framework.views import APIView as BaseAPIView
 from .authentication import (
     JWTInternalAnonymousAuthentication, RemoteJWTWebAuthentication,
 )
+from .base64 import decode_base64url, encode_base64url
 from .exceptions import InvalidJSON
 from .permissions import AsUserRole, IsAuthenticated
 
@@ -55,6 +60,12 @@ class InternalAPIView(BaseAPIView, metaclass=ABCMeta):
 
 class BaseDataTableView(BaseAPIView, metaclass=ABCMeta):
     columns_mapping = {}
+    # accept a "cursor" instead of an offset and page by the sort columns
+    keyset_pagination = False
+    # in cursor mode, stop counting the filtered rows at this number
+    count_limit = None
+    # search by case insensitive prefix, which can use the column index
+    prefix_search = False
     _SCHEMA = {
         "type": "object",
         "properties": {
@@ -66,6 +77,9 @@ class BaseDataTableView(BaseAPIView, metaclass=ABCMeta):
                 'type': 'number',
                 'minimum': 0
             },
+            'cursor': {
+                'type': 'string'
+            },
             'sort': {
                 'type': 'object',
                 'properties': {
@@ -128,6 +142,10 @@ class BaseDataTableView(BaseAPIView, metaclass=ABCMeta):
         query = self.global_search(query, param_args)
         query = self.global_sort(query, param_args)
 
+        if self.keyset_pagination and 'cursor' in param_args \
+                and query is not None:
+            return Response(self.get_page_by_cursor(query, param_args))
+
         filtered_total = 0 if query is None else query.count()
         offset = param_args['offset'] \
             if param_args['offset'] < filtered_total else 0
@@ -142,6 +160,137 @@ class BaseDataTableView(BaseAPIView, metaclass=ABCMeta):
             }
         )
 
+    def get_page_by_cursor(self, query, param_args):
+        """
+        Page through the query from where the cursor of the previous page
+        stopped, an empty cursor starts from the first page.
+
+        When sorting by model fields, the next page is filtered by the
+        sort values of the last row (with the primary key to break ties)
+        instead of skipping rows with OFFSET, so deep pages cost as much
+        as the first one. The filtered total is counted once and carried
+        in the cursor.
+        """
+        sort_fields = self.global_sort_fields(param_args)
+        keys = self._get_keyset(query.model, sort_fields)
+        cursor = self._load_cursor(param_args['cursor'], keys)
+        length = param_args['length']
+
+        if cursor.get('total') is None:
+            count_query = query.order_by()
+            if self.count_limit is not None:
+                count_query = count_query[:self.count_limit]
+            cursor['total'] = count_query.count()
+            cursor['capped'] = self.count_limit is not None and \
+                cursor['total'] >= self.count_limit
+
+        if keys is None:
+            offset = cursor.get('offset', 0)
+            results = list(query[offset:offset + length + 1])
+        else:
+            query = query.order_by(*(
+                ('-' if descending else '') + field.name
+                for field, descending in keys
+            ))
+            if cursor.get('values') is not None:
+                query = query.filter(
+                    self._keyset_filter(keys, cursor['values'])
+                )
+            results = list(query[:length + 1])
+
+        next_cursor = None
+        if len(results) > length:
+            results = results[:length]
+            if results:
+                next_cursor = self._dump_cursor(
+                    cursor, keys, results[-1], len(results)
+                )
+        return {
+            'offset': cursor.get('offset', 0) + len(results),
+            'total': cursor['total'],
+            'total_capped': cursor['capped'],
+            'next_cursor': next_cursor,
+            'data': [self.trans_result(result) for result in results],
+        }
+
+    @staticmethod
+    def _get_keyset(model, sort_fields):
+        keys = []
+        for sort_field in sort_fields:
+            if not isinstance(sort_field, str):
+                return None
+            try:
+                field = model._meta.get_field(sort_field.lstrip('-'))
+            except FieldDoesNotExist:
+                return None
+            if not field.concrete or field.is_relation:
+                return None
+            keys.append((field, sort_field.startswith('-')))
+        pk = model._meta.pk
+        if all(field != pk for field, _ in keys):
+            keys.append((pk, keys[-1][1] if keys else False))
+        return keys
+
+    @staticmethod
+    def _keyset_filter(keys, values):
+        """
+        Rows after the given sort values, NULL being the lowest value as
+        MySQL sorts it:
+        (k1 > v1) OR (k1 = v1 AND k2 > v2) OR ...
+        """
+        conditions = []
+        equal = Q()
+        for (field, descending), value in zip(keys, values):
+            if value is None:
+                after = None if descending else \
+                    Q(**{field.name + '__isnull': False})
+                same = Q(**{field.name + '__isnull': True})
+            else:
+                lookup = '__lt' if descending else '__gt'
+                after = Q(**{field.name + lookup: value})
+                if descending and field.null:
+                    after |= Q(**{field.name + '__isnull': True})
+                same = Q(**{field.name: value})
+            if after is not None:
+                conditions.append(equal & after)
+            equal &= same
+        return reduce(or_, conditions)
+
+    @staticmethod
+    def _load_cursor(cursor, keys):
+        if not cursor:
+            return {}
+        try:
+            cursor = json.loads(decode_base64url(cursor.encode()))
+            values = cursor.get('values')
+            if (keys is None) != (values is None) or \
+                    keys is not None and len(values) != len(keys):
+                raise ValueError('cursor does not match the sort')
+            if values is not None:
+                cursor['values'] = [
+                    None if value is None else field.to_python(value)
+                    for (field, _), value in zip(keys, values)
+                ]
+        except Exception as e:
+            logger.exception('Invalid cursor')
+            raise InvalidJSON(e) from e
+        return cursor
+
+    @staticmethod
+    def _dump_cursor(cursor, keys, last_result, length):
+        next_cursor = dict(
+            offset=cursor.get('offset', 0) + length,
+            total=cursor['total'],
+            capped=cursor['capped']
+        )
+        if keys is not None:
+            next_cursor['values'] = [
+                getattr(last_result, field.attname) for field, _ in keys
+            ]
+        return encode_base64url(
+            json.dumps(next_cursor, default=str).encode()
+        ).decode()
+
     def params(self, request, args):
         return args
 
@@ -168,6 +317,8 @@ class BaseDataTableView(BaseAPIView, metaclass=ABCMeta):
             for field in props:
                 prop = self.columns_mapping.get(field, field)
                 search_dict[prop] = keyword
+            if self.prefix_search:
+                return query.ci_prefix_search(**search_dict)
             return query.ci_search(**search_dict)
 
     def global_sort_fields(self, param_args):
@@ -30,6 +30,7 @@ from lico.ssh import RemoteSSH
 from .exception import (
     INITERROR, OUTPUTERROR, RUNERROR, HTTPBadRequest, MaxJobsReached,
 )
+from .watcher import JobWatcher
 
 logger = logging.getLogger(__name__)
 
@@ -55,6 +56,7 @@ class BuildJobManager:
         self.port = port
         self.username = username
         self.password = password
+        self.watcher = JobWatcher()
         scheduler.add_listener(
             self._listener,
             EVENT_JOB_ADDED | EVENT_JOB_SUBMITTED |
@@ -81,6 +83,7 @@ class BuildJobManager:
 
         workspace = self.infos[job_id]
         self._cancel_job(workspace).ensure()
+        self.watcher.cancel(workspace)
 
     @staticmethod
     def _kill_process(pid):
@@ -134,40 +137,21 @@ class BuildJobManager:
     def _cancel_job(self, workspace: str):
         return local(workspace).join(f'.cancel.{self.builder}.job')
 
-    def ensure_cancel(self, workspace):
-        return self._cancel_job(workspace).exists()
-
     def task(  # noqa: C901
             self, fs, workspace, output, data,
             user, log_path, *args, **kwargs
     ):
-        import threading
-        import time
         from multiprocessing import Process
 
-        # async upload
-        timer = None
-
-        def async_upload(upload_list):
-            nonlocal timer
-            for path in upload_list:
-                if os.path.exists(path['src']):
-                    try:
-                        fs.upload_file(path['src'], path['dst'])
-                    except Exception:
-                        logger.error(f"Failed to upload file "
-                                     f"from {path['src']} to {path['dst']}")
-                        continue
-            timer = threading.Timer(2, async_upload, (upload_list,))
-            timer.start()
-
-        upload_list = []
-        for path in output:
-            if path.get("auto-sync"):
-                upload_list.append(path)
-
-        if upload_list:
-            async_upload(upload_list)
+        # cancel markers and auto-sync outputs are handled by the watcher
+        upload_list = [
+            path for path in output
+            if path.get('src') and path.get('auto-sync')
+        ]
+        watched = self.watcher.register(
+            workspace, self._cancel_job(workspace).basename, fs, upload_list
+        )
+        conn = None
 
         # main
         try:
@@ -187,8 +171,7 @@ class BuildJobManager:
             init_process = Process(target=download_dir)
             init_process.start()
             while init_process.is_alive():
-                time.sleep(1)
-                if self.ensure_cancel(workspace):
+                if watched.wait(1):
                     self._kill_process(init_process.pid)
                     return
 
@@ -198,7 +181,6 @@ class BuildJobManager:
                 b"Finished to work environment preparation\n", "ab"
             )
             # run
-            conn = None
             log_stream = local(log_path).open('a')
 
             def run():
@@ -222,9 +204,9 @@ class BuildJobManager:
             from concurrent.futures import ThreadPoolExecutor
             with ThreadPoolExecutor(max_workers=1) as executor:
                 future = executor.submit(run)
-                while future.running():
-                    time.sleep(1)
-                    if self.ensure_cancel(workspace):
+                future.add_done_callback(watched.notify)
+                while not future.done():
+                    if watched.wait():
                         if conn is not None:
                             conn.close()
                         future.cancel()
@@ -247,21 +229,11 @@ class BuildJobManager:
                                      f"from {path['src']} to {path['dst']}")
                         raise OUTPUTERROR
         finally:
+            self.watcher.unregister(workspace)
             for path in output:
-                if path.get('src') and path.get('auto-sync'):
-                    try:
-                        fs.upload_file(path['src'], path['dst'])
-                    except Exception:
-                        logger.error(f"Failed to upload file "
-                                     f"from {path['src']} to {path['dst']}")
-                        continue
-
                 if fs.filesystem.path_exists(path['dst']):
                     fs.filesystem.chown(path['dst'], user.pw_uid, user.pw_gid)
 
-            if timer is not None:
-                timer.cancel()
-
             if conn is not None:
                 conn.close()
 
@@ -0,0 +1,271 @@
+# Copyright 2015-present Lenovo
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+import os
+import select
+import struct
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+SYNC_INTERVAL = 2
+POLL_INTERVAL = 1
+COPY_BLOCK_SIZE = 1024 * 1024
+
+
+class Inotify:
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_NONBLOCK = os.O_NONBLOCK
+    IN_CLOEXEC = os.O_CLOEXEC
+
+    EVENT_HEADER = struct.Struct('iIII')
+
+    def __init__(self):
+        import ctypes
+        import ctypes.util
+
+        self._libc = ctypes.CDLL(
+            ctypes.util.find_library('c'), use_errno=True
+        )
+        self.fd = self._libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if self.fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+
+    @classmethod
+    def create(cls):
+        try:
+            return cls()
+        except (OSError, AttributeError):
+            logger.warning(
+                'inotify is not available, fall back to polling',
+                exc_info=True
+            )
+            return None
+
+    def add_watch(self, path, mask):
+        import ctypes
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), mask)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno), path)
+        return wd
+
+    def rm_watch(self, wd):
+        self._libc.inotify_rm_watch(self.fd, wd)
+
+    def read_events(self):
+        try:
+            buf = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return
+        offset = 0
+        while offset < len(buf):
+            wd, mask, _, length = self.EVENT_HEADER.unpack_from(buf, offset)
+            offset += self.EVENT_HEADER.size
+            name = buf[offset:offset + length].rstrip(b'\0')
+            offset += length
+            yield wd, mask, os.fsdecode(name)
+
+
+class SyncFile:
+    def __init__(self, src, dst):
+        self.src = src
+        self.dst = dst
+        self.ino = None
+        self.size = None
+        self.mtime = None
+
+    def sync(self, fs):
+        try:
+            st = os.stat(self.src)
+        except FileNotFoundError:
+            return
+        if (st.st_ino, st.st_size, st.st_mtime_ns) == \
+                (self.ino, self.size, self.mtime):
+            return
+
+        if self._appendable(fs, st):
+            self._append(fs, st.st_size)
+        else:
+            fs.upload_file(self.src, self.dst)
+
+        self.ino = st.st_ino
+        self.mtime = st.st_mtime_ns
+        self.size = fs.filesystem.path_getsize(self.dst)
+
+    def _appendable(self, fs, st):
+        if self.size is None or st.st_ino != self.ino \
+                or st.st_size <= self.size:
+            return False
+        try:
+            return fs.filesystem.path_getsize(self.dst) == self.size
+        except OSError:
+            return False
+
+    def _append(self, fs, end):
+        with open(self.src, 'rb') as src, \
+                fs.filesystem.open_file(self.dst, 'ab') as dst:
+            src.seek(self.size)
+            remaining = end - self.size
+            while remaining > 0:
+                block = src.read(min(COPY_BLOCK_SIZE, remaining))
+                if not block:
+                    break
+                dst.file_handle.write(block)
+                remaining -= len(block)
+
+
+class WatchedJob:
+    def __init__(self, workspace, marker, fs, upload_list):
+        self.workspace = workspace
+        self.marker = marker
+        self.fs = fs
+        self.files = [
+            SyncFile(path['src'], path['dst']) for path in upload_list
+        ]
+        self.cancelled = False
+        self.wd = None
+        self._wakeup = threading.Event()
+        self._lock = threading.Lock()
+
+    def cancel(self):
+        self.cancelled = True
+        self._wakeup.set()
+
+    def notify(self, *args):
+        self._wakeup.set()
+
+    def wait(self, timeout=None):
+        self._wakeup.wait(timeout)
+        return self.cancelled
+
+    def check_marker(self):
+        if os.path.exists(os.path.join(self.workspace, self.marker)):
+            self.cancel()
+
+    def sync(self):
+        with self._lock:
+            for sync_file in self.files:
+                try:
+                    sync_file.sync(self.fs)
+                except Exception:
+                    logger.error(
+                        f"Failed to upload file "
+                        f"from {sync_file.src} to {sync_file.dst}"
+                    )
+
+
+class JobWatcher:
+    """
+    Watch the cancel markers and auto-sync outputs of all running jobs
+    from one background thread.
+    """
+
+    def __init__(
+            self, sync_interval=SYNC_INTERVAL, poll_interval=POLL_INTERVAL
+    ):
+        self.sync_interval = sync_interval
+        self.poll_interval = poll_interval
+        self._jobs = {}
+        self._watches = {}
+        self._lock = threading.Lock()
+        self._thread = None
+        self._inotify = Inotify.create()
+
+    def register(self, workspace, marker, fs, upload_list=()):
+        job = WatchedJob(workspace, marker, fs, upload_list)
+        if self._inotify is not None:
+            try:
+                job.wd = self._inotify.add_watch(
+                    workspace, Inotify.IN_CREATE | Inotify.IN_MOVED_TO
+                )
+            except OSError:
+                logger.warning(
+                    'Failed to watch workspace %s', workspace, exc_info=True
+                )
+        with self._lock:
+            self._jobs[workspace] = job
+            if job.wd is not None:
+                self._watches[job.wd] = job
+            self._ensure_thread()
+        job.check_marker()
+        return job
+
+    def unregister(self, workspace):
+        with self._lock:
+            job = self._jobs.pop(workspace, None)
+            if job is not None and job.wd is not None:
+                self._watches.pop(job.wd, None)
+        if job is None:
+            return
+        if job.wd is not None:
+            self._inotify.rm_watch(job.wd)
+        job.sync()
+
+    def cancel(self, workspace):
+        with self._lock:
+            job = self._jobs.get(workspace)
+        if job is not None:
+            job.cancel()
+
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(
+                target=self._run, name='lico-async-task-watcher',
+                daemon=True
+            )
+            self._thread.start()
+
+    def _run(self):
+        next_sync = time.monotonic()
+        while True:
+            try:
+                timeout = max(next_sync - time.monotonic(), 0)
+                if self._inotify is None:
+                    time.sleep(min(timeout, self.poll_interval))
+                    self._poll_markers()
+                else:
+                    self._wait_events(timeout)
+                if time.monotonic() >= next_sync:
+                    self._sync()
+                    next_sync = time.monotonic() + self.sync_interval
+            except Exception:
+                logger.exception('Job watcher failed')
+                time.sleep(self.poll_interval)
+
+    def _wait_events(self, timeout):
+        readable, _, _ = select.select([self._inotify.fd], [], [], timeout)
+        if not readable:
+            return
+        for wd, _, name in self._inotify.read_events():
+            with self._lock:
+                job = self._watches.get(wd)
+            if job is not None and name == job.marker:
+                job.cancel()
+
+    def _poll_markers(self):
+        with self._lock:
+            jobs = list(self._jobs.values())
+        for job in jobs:
+            job.check_marker()
+
+    def _sync(self):
+        with self._lock:
+            jobs = [job for job in self._jobs.values() if job.files]
+        for job in jobs:
+            job.sync()
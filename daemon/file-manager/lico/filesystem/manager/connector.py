@@ -30,12 +30,13 @@ from .imjoy_elfinder.api_const import (
     R_OPTIONS_MIME_FIRST_ORDER, R_OPTIONS_PATH, R_OPTIONS_SEPARATOR,
     R_OPTIONS_SYNC_CHK_AS_TS, R_OPTIONS_SYNC_MIN_MS, R_OPTIONS_UI_CMD_MAP,
     R_OPTIONS_UPLOAD_MAX_CONN, R_OPTIONS_UPLOAD_MAX_SIZE,
-    R_OPTIONS_UPLOAD_MIME, R_OPTIONS_UPLOAD_OVERWRITE, R_TREE, R_UPLMAXFILE,
-    R_UPLMAXSIZE,
+    R_OPTIONS_UPLOAD_MIME, R_OPTIONS_UPLOAD_OVERWRITE, R_REMOVED, R_TREE,
+    R_UPLMAXFILE, R_UPLMAXSIZE,
 )
 from .imjoy_elfinder.elfinder import (
     COMMANDS, Connector, _check_name, _mimetype,
 )
+from .path_index import get_path_index
 
 logger = logging.getLogger(__name__)
 
@@ -66,6 +67,8 @@ class FilesConnector(Connector):
     ):
         self.user = user
         self.adapter = adapter
+        # Hashes are indexed per user instead of in the shared class cache
+        self._cached_path = get_path_index(self.user.username)
         super().__init__(
             self.user.workspace, self.user.workspace, base_url,
             upload_max_size, tmb_dir, expose_real_path,
@@ -77,6 +80,7 @@ class FilesConnector(Connector):
         super().run(http_request)
         self._handle_rep_added()
         self._handle_rep_cwd()
+        self._handle_rep_removed()
         return self._http_status_code, self._http_header, self._response
 
     def __getattr__(self, item_key):
@@ -118,6 +122,13 @@ class FilesConnector(Connector):
             else:
                 cwd["phash"] = self._hash(os.path.dirname(path))
 
+    def _handle_rep_removed(self):
+        """drop removed, renamed and moved paths from the path index."""
+        for fhash in self._response.get(R_REMOVED, []):
+            path = self._cached_path.get(fhash)
+            if path:
+                self._cached_path.discard(path)
+
     def _is_allowed(self, path: str, access: str) -> bool:
         """ Determine the file permissions."""
         if not os.path.lexists(path):
@@ -413,38 +424,9 @@ class FilesConnector(Connector):
             self._response['data'] = base64.b64encode(f.read()).decode()
             self._response['type'] = os.path.splitext(cur_file)[-1]
 
-    # flake8: noqa: C901
     def _find_dir(self, fhash, path=None):
         """Find directory by hash."""
-        fhash = str(fhash)
-        # try to get find it in the cache
-        cached_path = self._cached_path.get(fhash)
-        if cached_path:
-            return cached_path
-
-        try:
-            decode_path = base64.b16decode(fhash.encode()).decode()
-        except Exception:
-            decode_path = None
-        if decode_path:
-            if self.valid_path_pattern.match(decode_path) is None:
-                return None
-            return decode_path
-
-        if not path:
-            path = self._options["root"]
-            if fhash == self._hash(path):
-                return path
-
-        if self.valid_path_pattern.match(path) is None or not os.path.isdir(path):
-            return None
-
-        for root, dirs, _ in os.walk(path, topdown=True, followlinks=True):
-            for folder in dirs:
-                folder_path = os.path.join(root, folder)
-                if fhash == self._hash(folder_path):
-                    return folder_path
-        return None
+        return self._find(fhash, path)
 
     def __put(self) -> None:
         """Save content in file."""
@@ -621,30 +603,12 @@ class FilesConnector(Connector):
         try:
             decode_path = base64.b16decode(fhash.encode()).decode()
         except Exception:
-            decode_path = None
-        if decode_path:
-            if self.valid_path_pattern.match(decode_path) is None:
-                return None
-            return decode_path
-
-        if not parent:
-            parent = self._options["root"]
-            if fhash == self._hash(parent):
-                return parent
-
-        if self.valid_path_pattern.match(parent) is None or os.path.isdir(parent):
-            for root, dirs, files in os.walk(
-                    parent, topdown=True, followlinks=True
-            ):
-                for folder in dirs:
-                    folder_path = os.path.join(root, folder)
-                    if fhash == self._hash(folder_path):
-                        return folder_path
-                for fil in files:
-                    file_path = os.path.join(root, fil)
-                    if fhash == self._hash(file_path):
-                        return file_path
-        return None
+            # Every hash handed out is the b16 encoded path, one that can
+            # not be decoded is unknown and walking the tree can't match it
+            return None
+        if self.valid_path_pattern.match(decode_path) is None:
+            return None
+        return decode_path
 
     def __get(self) -> None:
         target = self._request.get(API_TARGET)
@@ -0,0 +1,209 @@
+# -*- coding: utf-8 -*-
+# Copyright 2015-present Lenovo
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import datetime
+import os
+import re
+import uuid
+from urllib.parse import quote
+
+import falcon
+from dateutil.tz import tzutc
+
+# Used when the WSGI server can not sendfile() the file descriptor
+SEND_BLOCK_SIZE = 1024 * 1024
+MAX_RANGES = 16
+
+RANGE_SPEC = re.compile(r'^\s*(\d*)\s*-\s*(\d*)\s*$')
+
+
+class FileRange(object):
+    """File object limited to ``length`` bytes from ``start``.
+
+    ``fileno`` is kept so the ``wsgi.file_wrapper`` of the server can
+    still send it with sendfile() from the current offset.
+    """
+
+    def __init__(self, fp, start, length):
+        fp.seek(start)
+        self._fp = fp
+        self._remaining = length
+
+    def read(self, size=-1):
+        size = self._remaining if size is None or size < 0 \
+            else min(max(size, SEND_BLOCK_SIZE), self._remaining)
+        data = self._fp.read(size)
+        self._remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self._fp.fileno()
+
+    def close(self):
+        self._fp.close()
+
+
+class InvalidRange(ValueError):
+    pass
+
+
+def _parse_range_spec(spec, size):
+    match = RANGE_SPEC.match(spec)
+    if match is None:
+        raise InvalidRange(spec)
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        if last and int(last) < start:
+            raise InvalidRange(spec)
+        return start, min(int(last), size - 1) if last else size - 1
+    if last:
+        return max(size - int(last), 0), size - 1
+    raise InvalidRange(spec)
+
+
+def parse_range(header, size):
+    """Return the merged (start, end) byte ranges of a Range header.
+
+    None means the header is ignored and the whole file is sent,
+    an empty list means none of the ranges is satisfiable.
+    """
+    unit, _, specs = header.partition('=')
+    if unit.strip().lower() != 'bytes' or not specs:
+        return None
+    try:
+        ranges = [_parse_range_spec(spec, size) for spec in specs.split(',')]
+    except InvalidRange:
+        return None
+    if len(ranges) > MAX_RANGES:
+        return None
+
+    merged = []
+    for start, end in sorted(r for r in ranges if r[0] <= r[1]):
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def _get_datetime_header(request, header):
+    try:
+        return request.get_header_as_datetime(header)
+    except falcon.HTTPInvalidHeader:
+        return None
+
+
+def _not_modified(request, etag, mtime):
+    if_none_match = request.if_none_match
+    if if_none_match is not None:
+        return '*' in if_none_match or etag in if_none_match
+    if_modified_since = _get_datetime_header(request, 'If-Modified-Since')
+    return if_modified_since is not None and mtime <= if_modified_since
+
+
+def _if_range(request, etag, mtime):
+    if_range = request.get_header('If-Range')
+    if not if_range:
+        return True
+    if if_range.startswith('"'):
+        return if_range.strip('"') == etag
+    if if_range.startswith('W/'):
+        return False
+    return _get_datetime_header(request, 'If-Range') == mtime
+
+
+def _part_header(boundary, start, end, size):
+    return (
+        '\r\n--{0}\r\n'
+        'Content-Type: application/octet-stream\r\n'
+        'Content-Range: bytes {1}-{2}/{3}\r\n\r\n'
+    ).format(boundary, start, end, size).encode()
+
+
+def _multipart_ranges(fp, ranges, size, boundary):
+    try:
+        for start, end in ranges:
+            yield _part_header(boundary, start, end, size)
+            part = FileRange(fp, start, end - start + 1)
+            while True:
+                data = part.read(SEND_BLOCK_SIZE)
+                if not data:
+                    break
+                yield data
+        yield '\r\n--{0}--\r\n'.format(boundary).encode()
+    finally:
+        fp.close()
+
+
+def _multipart_length(ranges, size, boundary):
+    return len('\r\n--{0}--\r\n'.format(boundary)) + sum(
+        len(_part_header(boundary, start, end, size)) + end - start + 1
+        for start, end in ranges
+    )
+
+
+def send_file(request, response, file_path):
+    fp = open(file_path, "rb")
+    stat = os.fstat(fp.fileno())
+    size = stat.st_size
+    mtime = datetime.datetime.utcfromtimestamp(int(stat.st_mtime))
+    # Stable across processes and restarts, unlike hash() of the path
+    etag = '{0:x}-{1:x}-{2:x}'.format(
+        stat.st_ino, stat.st_mtime_ns, size
+    )
+
+    response.last_modified = datetime.datetime.fromtimestamp(
+        stat.st_mtime, tz=tzutc()
+    )
+    response.etag = etag
+    response.accept_ranges = 'bytes'
+
+    conditional = request.method in ('GET', 'HEAD')
+    if conditional and _not_modified(request, etag, mtime):
+        fp.close()
+        response.status = falcon.HTTP_304
+        return
+
+    response.downloadable_as = quote(os.path.basename(file_path))
+    response.content_type = 'application/octet-stream'
+
+    range_header = request.get_header('Range')
+    ranges = None
+    if conditional and range_header and _if_range(request, etag, mtime):
+        ranges = parse_range(range_header, size)
+
+    if ranges is None:
+        response.set_stream(FileRange(fp, 0, size), size)
+    elif not ranges:
+        fp.close()
+        response.status = falcon.HTTP_416
+        response.set_header('Content-Range', 'bytes */{0}'.format(size))
+        response.content_length = 0
+    elif len(ranges) == 1:
+        start, end = ranges[0]
+        response.status = falcon.HTTP_206
+        response.content_range = (start, end, size)
+        response.set_stream(FileRange(fp, start, end - start + 1),
+                            end - start + 1)
+    else:
+        boundary = uuid.uuid4().hex
+        response.status = falcon.HTTP_206
+        response.content_type = \
+            'multipart/byteranges; boundary={0}'.format(boundary)
+        response.set_stream(
+            _multipart_ranges(fp, ranges, size, boundary),
+            _multipart_length(ranges, size, boundary)
+        )
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+# Copyright 2015-present Lenovo
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import threading
+from collections import OrderedDict
+
+PATH_INDEX_SIZE = 65536
+
+
+class PathIndex(object):
+    """Bounded LRU index from the hashes handed out to their paths."""
+
+    def __init__(self, maxsize=PATH_INDEX_SIZE):
+        self.maxsize = maxsize
+        self._paths = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._paths)
+
+    def __setitem__(self, fhash, path):
+        with self._lock:
+            self._paths[fhash] = path
+            self._paths.move_to_end(fhash)
+            while len(self._paths) > self.maxsize:
+                self._paths.popitem(last=False)
+
+    def get(self, fhash, default=None):
+        with self._lock:
+            path = self._paths.get(fhash)
+            if path is None:
+                return default
+            self._paths.move_to_end(fhash)
+            return path
+
+    def discard(self, path):
+        """Drop the path and everything indexed below it."""
+        prefix = path.rstrip(os.sep) + os.sep
+        with self._lock:
+            stale = [
+                fhash for fhash, indexed in self._paths.items()
+                if indexed == path or indexed.startswith(prefix)
+            ]
+            for fhash in stale:
+                del self._paths[fhash]
+
+
+_path_indexes = {}
+_path_indexes_lock = threading.Lock()
+
+
+def get_path_index(username):
+    with _path_indexes_lock:
+        return _path_indexes.setdefault(username, PathIndex())
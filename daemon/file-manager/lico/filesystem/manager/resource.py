@@ -13,15 +13,13 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import datetime
 import logging
 import os
-from urllib.parse import quote
 
 import falcon
-from dateutil.tz import tzutc
 
 from .connector import FilesConnector
+from .download import send_file
 from .imjoy_elfinder.api_const import (
     API_DIRS, API_NAME, API_TARGETS, API_UPLOAD, API_UPLOAD_PATH,
 )
@@ -73,18 +71,7 @@ def run_connector(response, connector, http_request, request):
         # send file
         file_path = con_response["__send_file"]
         if os.path.exists(file_path) and not os.path.isdir(file_path):
-            response.set_stream(open(file_path, "rb"), 32768)
-            response.content_length = os.path.getsize(file_path)
-            response.downloadable_as = quote(os.path.basename(file_path))
-            response.content_type = 'application/octet-stream'
-            response.last_modified = datetime.datetime.fromtimestamp(
-                os.path.getmtime(file_path), tz=tzutc()
-            )
-            response.etag = "%s-%s-%s" % (
-                os.path.getmtime(file_path),
-                os.path.getsize(file_path),
-                hash(file_path),
-            )
+            send_file(request, response, file_path)
         else:
             response.data = "Unable to find: {}".format(request.path_info)
     else:
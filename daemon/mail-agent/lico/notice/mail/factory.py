@@ -13,30 +13,44 @@
 # limitations under the License.
 
 import logging
+from functools import lru_cache
 
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=1)
+def sender_factory(configure, spool, pool_size, timeout):
+    from .sender import MailSender
+    from .spool import MailConfig, Spool
+
+    return MailSender(
+        MailConfig(configure), Spool(spool),
+        pool_size=pool_size, timeout=timeout
+    )
+
+
 def app_factory(
         global_config,
         configure='/var/lib/lico/mail-agent.json',
         timeout=60,
+        spool='/var/lib/lico/mail-agent.spool',
+        pool_size='2',
         **local_conf
 ):
     import falcon
 
     from .resource import Configure, Message
 
+    sender = sender_factory(configure, spool, int(pool_size), int(timeout))
+    sender.start()
+
     app = falcon.API()
     app.req_options.strip_url_path_trailing_slash = True
     app.add_route(
         '/api/notice/mail/config', Configure(configure)
     )
     app.add_route(
-        '/api/notice/mail', Message(
-            configure,
-            timeout=timeout
-        )
+        '/api/notice/mail', Message(sender)
     )
 
     return app
@@ -14,7 +14,7 @@
 
 import json
 import logging
-import socket
+import os
 from os import path
 
 import falcon
@@ -77,11 +77,13 @@ class Configure(object):
 
     )
     def on_post(self, req, resp):
-        with open(self.filepath, 'w') as f:
+        tmp = f'{self.filepath}.tmp'
+        with open(tmp, 'w') as f:
             json.dump(
                 self._form_config(req.media),
                 f
             )
+        os.replace(tmp, self.filepath)
 
         resp.status = falcon.HTTP_OK
 
@@ -101,9 +103,8 @@ class Configure(object):
 
 
 class Message(object):
-    def __init__(self, filepath, timeout):
-        self.filepath = filepath
-        self.timeout = timeout
+    def __init__(self, sender):
+        self.sender = sender
 
     @jsonschema.validate({
         'type': 'object',
@@ -127,84 +128,17 @@ class Message(object):
         ]
     })
     def on_post(self, req, resp):
-        if path.exists(self.filepath):
-            with open(self.filepath) as f:
-                config = json.load(f)
-        else:
-            config = {}
+        config = self.sender.config.get()
 
         if config.get('enabled', False):
-            try:
-                self.send_mail(
-                    sender=config.get('sender_address', ''),
-                    address=req.media['target'],
-                    subject=req.media['title'],
-                    data=req.media['msg'],
-                    host=config.get('server_address', ''),
-                    port=config.get('server_port', ''),
-                    ssl=config.get('ssl', 'NULL'),
-                    username=config.get('username', ''),
-                    password=config.get('password', ''),
-                    timeout=self.timeout
-                )
-                resp.status = falcon.HTTP_OK
-                resp.media = {}
-            except socket.error as e:
-                raise falcon.HTTPBadRequest(
-                    code=13002,
-                    description='Mail test failed.'
-                ) from e
+            self.sender.start()
+            self.sender.send(
+                target=req.media['target'],
+                title=req.media['title'],
+                msg=req.media['msg']
+            )
+            resp.status = falcon.HTTP_OK
+            resp.media = {}
         else:
             resp.status = falcon.HTTP_NO_CONTENT
             # resp.media = {}
-
-    def send_mail(
-            self,
-            sender, address, subject, data,
-            host, port, ssl, username, password, timeout
-    ):
-        try:
-            client = self._make_client(
-                host, port, ssl, username, password, timeout
-            )
-            self._send_mail(
-                client, sender, address, subject, data
-            )
-        except socket.error:
-            logger.exception('Fail to send email')
-            raise
-
-    @staticmethod
-    def _make_client(
-            host, port, ssl, username, password, timeout
-    ):
-        from smtplib import SMTP, SMTP_SSL
-        if ssl == 'SSL':
-            client = SMTP_SSL(host, port, timeout=timeout)
-        elif ssl == 'TLS':
-            client = SMTP(host, port, timeout=timeout)
-            client.starttls()
-        else:
-            client = SMTP(host, port, timeout=timeout)
-
-        if username and password:
-            client.login(username, password)
-
-        return client
-
-    @staticmethod
-    def _send_mail(client, sender, address, subject, data):
-        from email.header import Header
-        from email.mime.multipart import MIMEMultipart
-        from email.mime.text import MIMEText
-
-        msg = MIMEMultipart('alternative')
-        msg.add_header('Content-Type', 'text/html;charset=utf-8')
-        msg.attach(MIMEText(data, 'html', 'utf-8'))
-
-        msg['SUBJECT'] = Header(subject, 'utf-8')
-        msg['FROM'] = sender
-        msg['TO'] = ', '.join(address)
-
-        client.sendmail(sender, address, msg.as_string())
-        logger.info('send mail success from:%s to:%s', sender, address)
@@ -0,0 +1,231 @@
+# Copyright 2015-present Lenovo
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+import os
+import smtplib
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+POLL_INTERVAL = 1
+IDLE_TIMEOUT = 60
+NOOP_INTERVAL = 10
+CLAIM_SIZE = 20
+MAX_RECIPIENTS = 50
+MAX_ATTEMPTS = 10
+RETRY_BASE = 5
+RETRY_MAX = 600
+
+
+class SMTPConnection(object):
+    """
+    One authenticated SMTP connection, kept open between mails and
+    reopened when the configure changes or the server dropped it.
+    """
+
+    def __init__(self, timeout):
+        self.timeout = timeout
+        self.client = None
+        self.key = None
+        self.last_used = 0
+
+    def get(self, config):
+        key = tuple(
+            config.get(name) for name in (
+                'server_address', 'server_port', 'ssl',
+                'username', 'password'
+            )
+        )
+        if self.client is not None and key != self.key:
+            self.close()
+        if self.client is not None and \
+                time.monotonic() - self.last_used > NOOP_INTERVAL:
+            try:
+                alive = self.client.noop()[0] == 250
+            except (smtplib.SMTPException, OSError):
+                alive = False
+            if not alive:
+                self.close(quit=False)
+        if self.client is None:
+            self.client = self._make_client(*key, timeout=self.timeout)
+            self.key = key
+        return self.client
+
+    @staticmethod
+    def _make_client(host, port, ssl, username, password, timeout):
+        from smtplib import SMTP, SMTP_SSL
+        if ssl == 'SSL':
+            client = SMTP_SSL(host, port, timeout=timeout)
+        elif ssl == 'TLS':
+            client = SMTP(host, port, timeout=timeout)
+            client.starttls()
+        else:
+            client = SMTP(host, port, timeout=timeout)
+
+        if username and password:
+            client.login(username, password)
+
+        return client
+
+    def send(self, config, message):
+        """
+        Send to the pending recipients of the message, at most
+        MAX_RECIPIENTS per transaction, dropping the delivered ones from
+        ``message['target']`` as it goes.
+        """
+        sender = config.get('sender_address', '')
+        content = self._format(
+            sender, message['to'], message['title'], message['msg']
+        )
+        try:
+            client = self.get(config)
+            while message['target']:
+                recipients = message['target'][:MAX_RECIPIENTS]
+                refused = client.sendmail(sender, recipients, content)
+                if refused:
+                    logger.warning('Mail refused by server: %s', refused)
+                del message['target'][:MAX_RECIPIENTS]
+                logger.info(
+                    'send mail success from:%s to:%s', sender, recipients
+                )
+        except BaseException:
+            self.close(quit=False)
+            raise
+        finally:
+            self.last_used = time.monotonic()
+
+    @staticmethod
+    def _format(sender, address, subject, data):
+        from email.header import Header
+        from email.mime.multipart import MIMEMultipart
+        from email.mime.text import MIMEText
+
+        msg = MIMEMultipart('alternative')
+        msg.add_header('Content-Type', 'text/html;charset=utf-8')
+        msg.attach(MIMEText(data, 'html', 'utf-8'))
+
+        msg['SUBJECT'] = Header(subject, 'utf-8')
+        msg['FROM'] = sender
+        msg['TO'] = ', '.join(address)
+
+        return msg.as_string()
+
+    def close_if_idle(self):
+        if self.client is not None and \
+                time.monotonic() - self.last_used > IDLE_TIMEOUT:
+            self.close()
+
+    def close(self, quit=True):
+        if self.client is None:
+            return
+        try:
+            if quit:
+                self.client.quit()
+            else:
+                self.client.close()
+        except (smtplib.SMTPException, OSError):
+            self.client.close()
+        finally:
+            self.client = None
+            self.key = None
+
+
+class MailSender(object):
+    """
+    Deliver the spooled mails from ``pool_size`` background threads,
+    each one keeping its own SMTP connection alive.
+    """
+
+    def __init__(self, config, spool, pool_size=2, timeout=60):
+        self.config = config
+        self.spool = spool
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self._pid = None
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition()
+
+    def start(self):
+        # started again in forked workers
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self.spool.recover()
+            for index in range(self.pool_size):
+                threading.Thread(
+                    target=self._run, name=f'lico-mail-sender-{index}',
+                    daemon=True
+                ).start()
+
+    def send(self, target, title, msg):
+        self.spool.put(
+            dict(target=target, to=target, title=title, msg=msg, attempts=0)
+        )
+        with self._wakeup:
+            self._wakeup.notify()
+
+    def _run(self):
+        connection = SMTPConnection(self.timeout)
+        while True:
+            try:
+                mails = self.spool.claim(CLAIM_SIZE)
+                if not mails:
+                    connection.close_if_idle()
+                    with self._wakeup:
+                        self._wakeup.wait(POLL_INTERVAL)
+                    continue
+                for mail in mails:
+                    self._deliver(connection, mail)
+            except Exception:
+                logger.exception('Mail sender failed')
+                time.sleep(POLL_INTERVAL)
+
+    def _deliver(self, connection, mail):
+        config = self.config.get()
+        if not config.get('enabled', False):
+            logger.warning(
+                'Mail is disabled, drop mail to %s', mail.message.get('target')
+            )
+            self.spool.done(mail)
+            return
+
+        try:
+            connection.send(config, mail.message)
+        except smtplib.SMTPRecipientsRefused:
+            logger.exception(
+                'Fail to send email, all recipients refused'
+            )
+            self.spool.fail(mail)
+        except (smtplib.SMTPException, OSError):
+            mail.message['attempts'] += 1
+            if mail.message['attempts'] >= MAX_ATTEMPTS:
+                logger.exception('Fail to send email, give up')
+                self.spool.fail(mail)
+                return
+            delay = min(
+                RETRY_BASE * 2 ** (mail.message['attempts'] - 1), RETRY_MAX
+            )
+            logger.warning(
+                'Fail to send email, retry in %ss', delay, exc_info=True
+            )
+            self.spool.retry(mail, delay)
+        except Exception:
+            # a malformed message fails the same way on every attempt
+            logger.exception('Fail to send email, invalid message')
+            self.spool.fail(mail)
+        else:
+            self.spool.done(mail)
@@ -0,0 +1,165 @@
+# Copyright 2015-present Lenovo
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import logging
+import os
+import threading
+import time
+from os import path
+from uuid import uuid4
+
+logger = logging.getLogger(__name__)
+
+
+class MailConfig(object):
+    """
+    Configure file of the mail agent, reloaded only when the file
+    changes.
+    """
+
+    def __init__(self, filepath):
+        self.filepath = filepath
+        self._stat = None
+        self._config = {}
+        self._lock = threading.Lock()
+
+    def get(self):
+        try:
+            st = os.stat(self.filepath)
+        except FileNotFoundError:
+            stat = None
+        else:
+            stat = (st.st_ino, st.st_size, st.st_mtime_ns)
+
+        with self._lock:
+            if stat != self._stat:
+                try:
+                    self._config = self._load() if stat else {}
+                except ValueError:
+                    # being rewritten, keep the last one
+                    logger.warning('Fail to load %s', self.filepath)
+                else:
+                    self._stat = stat
+            return self._config
+
+    def _load(self):
+        with open(self.filepath) as f:
+            return json.load(f)
+
+
+class SpooledMail(object):
+    def __init__(self, filepath, message):
+        self.filepath = filepath
+        self.message = message
+
+
+class Spool(object):
+    """
+    Directory backed queue of outgoing mails.
+
+    A mail is a json file in ``new`` named after the time it becomes
+    due. Senders claim it by renaming it into ``cur`` with their pid as
+    prefix, so one mail is only ever sent by one sender, and mails left
+    in ``cur`` by a dead process are put back on startup.
+    """
+    NEW = 'new'
+    CUR = 'cur'
+    FAILED = 'failed'
+
+    def __init__(self, directory):
+        self.directory = directory
+        for name in (self.NEW, self.CUR, self.FAILED):
+            os.makedirs(path.join(directory, name), mode=0o700, exist_ok=True)
+
+    def put(self, message, not_before=0):
+        name = f'{int(not_before * 1000):015d}-{uuid4().hex}.json'
+        tmp = path.join(self.directory, f'.{name}.tmp')
+        with open(tmp, 'w') as f:
+            json.dump(message, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.rename(tmp, path.join(self.directory, self.NEW, name))
+
+    def claim(self, limit):
+        now = int(time.time() * 1000)
+        new_dir = path.join(self.directory, self.NEW)
+        with os.scandir(new_dir) as it:
+            names = sorted(
+                entry.name for entry in it if entry.name.endswith('.json')
+            )
+
+        mails = []
+        for name in names:
+            if len(mails) >= limit or int(name.split('-', 1)[0]) > now:
+                break
+            filepath = path.join(
+                self.directory, self.CUR, f'{os.getpid()}.{name}'
+            )
+            try:
+                os.rename(path.join(new_dir, name), filepath)
+            except FileNotFoundError:
+                # claimed by another sender
+                continue
+            try:
+                with open(filepath) as f:
+                    mails.append(SpooledMail(filepath, json.load(f)))
+            except ValueError:
+                logger.error('Broken spooled mail %s', name)
+                self.fail(SpooledMail(filepath, None))
+        return mails
+
+    def done(self, mail):
+        os.unlink(mail.filepath)
+
+    def retry(self, mail, delay):
+        self.put(mail.message, not_before=time.time() + delay)
+        os.unlink(mail.filepath)
+
+    def fail(self, mail):
+        failed = path.join(
+            self.directory, self.FAILED,
+            path.basename(mail.filepath).split('.', 1)[1]
+        )
+        if mail.message is None:
+            os.rename(mail.filepath, failed)
+            return
+        with open(failed, 'w') as f:
+            json.dump(mail.message, f)
+        os.unlink(mail.filepath)
+
+    def recover(self):
+        cur_dir = path.join(self.directory, self.CUR)
+        for name in os.listdir(cur_dir):
+            pid, _, origin = name.partition('.')
+            if int(pid) != os.getpid() and self._is_alive(int(pid)):
+                continue
+            try:
+                os.rename(
+                    path.join(cur_dir, name),
+                    path.join(self.directory, self.NEW, origin)
+                )
+            except FileNotFoundError:
+                continue
+            logger.info('Recover spooled mail %s', origin)
+
+    @staticmethod
+    def _is_alive(pid):
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            return True
+        return True
@@ -12,15 +12,22 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import logging
+import threading
+import time
+
 import pymysql
 
+logger = logging.getLogger(__name__)
+
 
 class AuthDatabase:
 
     def __init__(self,
                  db_host='127.0.0.1',
                  db_database='lico',
-                 db_port=3306
+                 db_port=3306,
+                 refresh_interval=5
                  ):
 
         from lico.password import fetch_pass
@@ -37,7 +44,46 @@ class AuthDatabase:
                              "ORDER BY id DESC LIMIT 1"
         self.query_args = {}
 
+        # The latest key is cached and read again at most once per
+        # refresh_interval seconds, listeners are called on rotation
+        self.refresh_interval = float(refresh_interval)
+        self._key = None
+        self._key_time = None
+        self._key_listeners = []
+        self._lock = threading.Lock()
+
+    def add_key_listener(self, listener):
+        self._key_listeners.append(listener)
+
     def get_key(self):
+        with self._lock:
+            now = time.monotonic()
+            if self._key_time is not None and \
+                    now - self._key_time < self.refresh_interval:
+                return self._key
+            try:
+                key = self.query_key()
+            except Exception:
+                # keep verifying with the cached key until the database
+                # is back, retrying once per refresh interval
+                if self._key is None:
+                    raise
+                logger.warning(
+                    'Failed to refresh the secret key, use the cached one',
+                    exc_info=True
+                )
+                self._key_time = now
+                return self._key
+            self._key_time = now
+            rotated = self._key is not None and key != self._key
+            self._key = key
+
+        if rotated:
+            for listener in self._key_listeners:
+                listener(key)
+        return key
+
+    def query_key(self):
         key = None
         try:
             self.conn.ping(reconnect=True)
@@ -27,6 +27,7 @@ def service_auth_filter_factory(
         key_storage='db',
         token_expire_minute=60,
         key_expire_day=3,
+        key_refresh_interval=5,
         **kwargs
 ):
     def filter(app):
@@ -37,6 +38,7 @@ def service_auth_filter_factory(
             key_storage=key_storage,
             token_expire_minute=token_expire_minute,
             key_expire_day=key_expire_day,
+            key_refresh_interval=key_refresh_interval,
             **kwargs
         )
 
@@ -52,6 +54,7 @@ class ServiceAuthFilter:
             key_storage='db',
             token_expire_minute=60,
             key_expire_day=3,
+            key_refresh_interval=5,
             **kwargs
     ):
         self.app = app
@@ -59,10 +62,14 @@ class ServiceAuthFilter:
         self.allow_anonymous_user = allow_anonymous_user
         self.key_storage = key_storage
         if self.key_storage == 'db':
-            self.db = AuthDatabase(**kwargs)
+            self.db = AuthDatabase(
+                refresh_interval=key_refresh_interval, **kwargs
+            )
             self.secret = SharedSecret(key=self.db.get_key())
+            self.secret.key_func = self.db.get_key
             self.secret.keys.token_expire_minute = token_expire_minute
             self.secret.keys.key_expire_day = key_expire_day
+            self.db.add_key_listener(self.secret.keys.update)
         else:
             raise Exception("key_storage only have db type.")
 
@@ -106,7 +113,9 @@ class ServiceAuthFilter:
         return self.app(environ, start_response)
 
     def _verify_from_db(self, auth):
-        self.secret.key_func = self.db.get_key
+        # Cached, reads the database at most once per refresh interval
+        # and hands a rotated key to the secret before it is needed
+        self.db.get_key()
 
         return self.secret.verify_jwt(
             auth[1], verify=self.verify
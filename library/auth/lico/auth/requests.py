@@ -12,10 +12,21 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import base64
+import json
+import time
+from weakref import WeakKeyDictionary
+
 from requests.auth import AuthBase
 
+# Service tokens of every secret, reused by all ServiceAuth of the process
+_tokens = WeakKeyDictionary()
+
 
 class ServiceAuth(AuthBase):
+    # Seconds before the exp claim a cached token is renewed
+    renew_seconds = 60
+
     def __init__(
         self, secret, username=None,
         keyword='jwt', **extra_args
@@ -25,11 +36,28 @@ class ServiceAuth(AuthBase):
         self.keyword = keyword
         self.extra_args = extra_args
 
-    def __call__(self, request):
-        token = self.secret.generate_jwt(
+    def get_token(self):
+        key = (
             self.username,
-            **self.extra_args
+            tuple(sorted((k, repr(v)) for k, v in self.extra_args.items()))
         )
+        tokens = _tokens.setdefault(self.secret, {})
+        token, renew_time = tokens.get(key, (None, 0))
+        if token is None or time.time() >= renew_time:
+            token = self.secret.generate_jwt(
+                self.username,
+                **self.extra_args
+            )
+            payload = token.split('.')[1]
+            exp = json.loads(base64.urlsafe_b64decode(
+                payload + '=' * (-len(payload) % 4)
+            ))['exp']
+            renew_time = exp - self.renew_seconds
+            tokens[key] = (token, renew_time)
+        return token
+
+    def __call__(self, request):
+        token = self.get_token()
 
         request.headers['Authorization'] = f'{self.keyword} {token}'
 
@@ -12,6 +12,8 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import time
+
 import jwt
 from cryptography.fernet import Fernet
 from jwt import DecodeError
@@ -90,11 +92,14 @@ class Secret:
 
 
 class SharedSecret(Secret):
+    # Seconds between two reads of the latest key through key_func
+    update_interval = 5
 
     def __init__(self, key):
         super().__init__(key=key)
         self.keys = KeyGroup()
         self.key_func: callable = None  # function that get lastest key
+        self._update_time = None
 
     def verify_jwt(self, token, algorithms='HS512', verify=True,
                    **extra_options):
@@ -136,6 +141,12 @@ class SharedSecret(Secret):
 
     def update_keys(self):
         if self.key_func:
+            # Tokens failing to decode must not query the key every time
+            now = time.monotonic()
+            if self._update_time is not None and \
+                    now - self._update_time < self.update_interval:
+                return self.keys.latest.key
+            self._update_time = now
             db_key = self.key_func()
             if db_key:
                 self.keys.update(db_key)
@@ -130,19 +130,20 @@ class FileSystemBaseBackend(metaclass=ABCMeta):
         return cnt
 
     def _read_fp(self, fp, start=0, num=None):
-        content = b'' if 'b' in fp.mode else ''
+        lines = []
         end_pos = start
         for idx, line in enumerate(fp):
             if num is None:
                 if idx >= start:
-                    content += line
+                    lines.append(line)
             else:
                 if idx < start:
                     continue
                 elif idx >= start + num:
                     break
-                content += line
+                lines.append(line)
             end_pos = idx + 1
+        content = (b'' if 'b' in fp.mode else '').join(lines)
         return content, end_pos
 
     @abstractmethod
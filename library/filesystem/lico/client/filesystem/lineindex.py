@@ -0,0 +1,160 @@
+# Copyright 2015-present Lenovo
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import mmap
+import os
+import threading
+from bisect import bisect_right
+from collections import OrderedDict
+from contextlib import contextmanager
+
+CHECKPOINT_BYTES = 64 * 1024
+FINGERPRINT_BYTES = 32
+LINE_INDEX_SIZE = 256
+
+
+class LineIndex:
+    """
+    Sparse line offset index of a growing file.
+
+    A checkpoint (line number, byte offset of that line) is recorded
+    roughly every CHECKPOINT_BYTES, and the index is extended from the
+    last scanned byte whenever the file grows, so reads only touch the
+    bytes they return.
+    """
+
+    def __init__(self, filename):
+        self.filename = filename
+        self._lock = threading.Lock()
+        self._reset(None)
+
+    def _reset(self, ino):
+        self._ino = ino
+        self._line_nos = [0]
+        self._offsets = [0]
+        self._lines = 0
+        self._tail = 0
+        self._scanned = 0
+        self._fingerprint = b''
+
+    def _refresh(self, mm, st):
+        if st.st_ino != self._ino or st.st_size < self._scanned or \
+                mm[self._scanned - len(self._fingerprint):self._scanned] \
+                != self._fingerprint:
+            self._reset(st.st_ino)
+
+        scan = self._scanned
+        while scan < st.st_size:
+            end = min(scan + CHECKPOINT_BYTES, st.st_size)
+            chunk = mm[scan:end]
+            count = chunk.count(b'\n')
+            if count:
+                self._lines += count
+                self._tail = scan + chunk.rfind(b'\n') + 1
+                if self._tail - self._offsets[-1] >= CHECKPOINT_BYTES:
+                    self._line_nos.append(self._lines)
+                    self._offsets.append(self._tail)
+            scan = end
+
+        self._scanned = st.st_size
+        self._fingerprint = mm[
+            max(self._scanned - FINGERPRINT_BYTES, 0):self._scanned
+        ]
+
+    def _total_lines(self):
+        return self._lines + (1 if self._scanned > self._tail else 0)
+
+    @contextmanager
+    def _mapped(self):
+        with open(self.filename, 'rb') as f:
+            st = os.fstat(f.fileno())
+            if not st.st_size:
+                with self._lock:
+                    self._reset(st.st_ino)
+                yield None, st.st_size
+                return
+            with mmap.mmap(
+                    f.fileno(), st.st_size, access=mmap.ACCESS_READ
+            ) as mm:
+                with self._lock:
+                    self._refresh(mm, st)
+                    yield mm, st.st_size
+
+    def _seek_line(self, mm, size, line, start_line=0, start_offset=0):
+        idx = bisect_right(self._line_nos, line) - 1
+        if self._line_nos[idx] > start_line:
+            start_line = self._line_nos[idx]
+            start_offset = self._offsets[idx]
+
+        pos = start_offset
+        for _ in range(line - start_line):
+            pos = mm.find(b'\n', pos, size)
+            if pos < 0:
+                return size
+            pos += 1
+        return pos
+
+    def count_lines(self):
+        with self._mapped():
+            return self._total_lines()
+
+    def read_lines(self, start=0, num=None):
+        with self._mapped() as (mm, size):
+            total = self._total_lines()
+            if start >= total:
+                return b'', total if num is None and total else start
+
+            stop = total if num is None else min(start + num, total)
+            begin = self._seek_line(mm, size, start)
+            if stop == total:
+                end = size
+            else:
+                end = self._seek_line(mm, size, stop, start, begin)
+            return mm[begin:end], stop
+
+    def read_since(self, offset=0, limit=None):
+        """
+        Return the bytes appended after ``offset`` together with the
+        offset to resume from. With ``limit``, stop at the last line
+        break inside the limit unless a single line exceeds it.
+        """
+        with self._mapped() as (mm, size):
+            if mm is None:
+                return b'', 0
+            if offset > size:
+                offset = 0
+            end = size
+            if limit is not None and offset + limit < size:
+                end = offset + limit
+                line_end = mm.rfind(b'\n', offset, end)
+                if line_end >= 0:
+                    end = line_end + 1
+            return mm[offset:end], end
+
+
+_indexes = OrderedDict()
+_indexes_lock = threading.Lock()
+
+
+def get_line_index(filename):
+    filename = os.path.abspath(filename)
+    with _indexes_lock:
+        index = _indexes.get(filename)
+        if index is None:
+            index = _indexes[filename] = LineIndex(filename)
+            if len(_indexes) > LINE_INDEX_SIZE:
+                _indexes.popitem(last=False)
+        else:
+            _indexes.move_to_end(filename)
+        return index
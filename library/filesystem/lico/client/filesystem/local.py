@@ -19,6 +19,7 @@ import stat
 from contextlib import contextmanager
 
 from .base import FileSystemBaseBackend, FileSystemHandle
+from .lineindex import get_line_index
 
 
 class LocalFileSystem(FileSystemBaseBackend):
@@ -154,13 +155,20 @@ class LocalFileSystem(FileSystemBaseBackend):
         self.copy(src, dst)
 
     def count_file_lines(self, filename, mode='r'):
+        if 'b' in mode:
+            return get_line_index(filename).count_lines()
         with open(filename, mode=mode) as f:
             return self._get_linenum(f)
 
     def read_content(self, filename, start=0, num=None, mode='r'):
+        if 'b' in mode:
+            return get_line_index(filename).read_lines(start, num)
         with open(filename, mode=mode) as f:
             return self._read_fp(f, start, num)
 
+    def read_content_since(self, filename, offset=0, limit=None):
+        return get_line_index(filename).read_since(offset, limit)
+
     def read_content_without_check(
             self, filename, start=0, num=None, mode='r'
     ):
@@ -41,6 +41,9 @@ from lico.scheduler.base.exception.manager_exception import (
 from lico.scheduler.base.job.job import Job
 from lico.scheduler.base.job.queue import Queue
 from lico.scheduler.base.job.queue_state import QueueState
+from lico.scheduler.base.query_cache import (
+    cached_query, invalidate_query_cache,
+)
 from lico.scheduler.base.scheduler import IScheduler
 from lico.scheduler.utils.cmd_utils import (
     exec_oscmd, exec_oscmd_with_login, exec_oscmd_with_ssh,
@@ -66,6 +69,7 @@ class Scheduler(IScheduler):
         self._as_admin = (operator_username == 'root')
         self._config = config
 
+    @invalidate_query_cache
     def submit_job(
             self,
             job_content: str,
@@ -74,6 +78,7 @@ class Scheduler(IScheduler):
     ):
         raise NotImplementedError("submit_job")
 
+    @invalidate_query_cache
     def submit_job_from_file(
             self,
             job_filename: str,
@@ -128,6 +133,7 @@ class Scheduler(IScheduler):
             )
         )
 
+    @invalidate_query_cache
     def job_action(self, scheduler_ids, command: List[str], action: str):
         logger.debug("%s job entry, scheduler_ids: %s", action, scheduler_ids)
         if self._as_admin:
@@ -145,6 +151,7 @@ class Scheduler(IScheduler):
                                            len(err.decode().splitlines()))
         return status
 
+    @invalidate_query_cache
     def cancel_job(self, scheduler_ids) -> None:
         ids = " ".join(scheduler_ids)
         args = ['job_ids=(%s); for job_id in "${job_ids[@]}";'
@@ -154,6 +161,7 @@ class Scheduler(IScheduler):
             raise CancelJobFailedException
         return status
 
+    @invalidate_query_cache
     def hold_job(self, scheduler_ids) -> None:
         ids = " ".join(scheduler_ids)
         args = ['job_ids=(%s); for job_id in "${job_ids[@]}";'
@@ -163,6 +171,7 @@ class Scheduler(IScheduler):
             raise HoldJobFailedException
         return status
 
+    @invalidate_query_cache
     def release_job(self, scheduler_ids) -> None:
         logger.debug("release_job entry")
         ids = " ".join(scheduler_ids)
@@ -173,6 +182,7 @@ class Scheduler(IScheduler):
             raise ReleaseJobFailedException
         return status
 
+    @invalidate_query_cache
     def suspend_job(self, scheduler_ids) -> None:
         logger.debug("suspend_job entry")
         ids = " ".join(scheduler_ids)
@@ -183,6 +193,7 @@ class Scheduler(IScheduler):
             raise SuspendJobFailedException
         return status
 
+    @invalidate_query_cache
     def resume_job(self, scheduler_ids) -> None:
         logger.debug("resume_job entry")
         ids = " ".join(scheduler_ids)
@@ -193,6 +204,7 @@ class Scheduler(IScheduler):
             raise ResumeJobFailedException
         return status
 
+    @cached_query(ttl=5)
     def query_job(self, job_identity: JobIdentity,
                   include_history=False) -> Job:
         scheduler_id = job_identity.scheduler_id
@@ -356,6 +368,7 @@ class Scheduler(IScheduler):
         else:
             return False
 
+    @cached_query(ttl=10)
     def query_available_queues(self) -> List[Queue]:
         queues_list = []
 
@@ -380,6 +393,7 @@ class Scheduler(IScheduler):
                 queues_list.append(queue)
         return queues_list
 
+    @cached_query(ttl=5)
     def get_status(self) -> bool:
         try:
             rc, out, err = exec_oscmd_with_login(
@@ -459,6 +473,7 @@ class Scheduler(IScheduler):
             event.get_acct_job() for event in events if event.get_acct_job()
         ]
 
+    @cached_query(ttl=10)
     def get_scheduler_resource(self):
         configs = self.get_scheduler_config("LSF_GPU_AUTOCONFIG")
         if configs.get("LSF_GPU_AUTOCONFIG", "").lower() == "y":
@@ -656,6 +671,7 @@ class Scheduler(IScheduler):
         """
         return gres_dict, mig_dict
 
+    @cached_query(ttl=60)
     def get_gres_type(self) -> dict:
         gres_type_dict = dict()
         configs = self.get_scheduler_config(
@@ -721,6 +737,7 @@ class Scheduler(IScheduler):
         return '{gi}/{ci}'.format(gi=gi, ci=ci)
 
     # provide license feature
+    @cached_query(ttl=30)
     def get_license_feature(self) -> list:
         cmd = ["blstat"]
         license_feature = []
@@ -828,12 +845,14 @@ class Scheduler(IScheduler):
             raise QueryUserPriorityException(err.decode())
         return out.decode().strip()
 
+    @cached_query(ttl=60)
     def get_priority_value(self):
         priority_max = self._query_user_priority()
         priority_dict = {"priority_min": "1",
                          "priority_max": priority_max}
         return priority_dict
 
+    @invalidate_query_cache
     def update_job_priority(self, scheduler_ids, priority_value):
         logger.debug("Update job priority, scheduler_ids: %s" % scheduler_ids)
         if int(priority_value) > int(self._query_user_priority()) or int(
@@ -847,6 +866,7 @@ class Scheduler(IScheduler):
             raise SetPriorityException
         return status
 
+    @invalidate_query_cache
     def requeue_job(self, scheduler_ids):
         logger.debug("requeue_job entry")
         ids = " ".join(scheduler_ids)
@@ -18,6 +18,7 @@ import os
 import re
 import socket
 from collections import defaultdict
+from datetime import datetime
 from typing import List, Optional
 
 from lico.scheduler.base.exception.job_exception import (
@@ -31,6 +32,9 @@ from lico.scheduler.base.exception.job_exception import (
 from lico.scheduler.base.job.job import Job
 from lico.scheduler.base.job.queue import Queue
 from lico.scheduler.base.job.queue_state import QueueState
+from lico.scheduler.base.query_cache import (
+    cached_query, invalidate_query_cache,
+)
 from lico.scheduler.base.scheduler import IScheduler
 from lico.scheduler.utils.cmd_utils import (
     exec_oscmd, exec_oscmd_with_login, exec_oscmd_with_ssh,
@@ -44,6 +48,8 @@ from .utils.utils import get_job_query_data, get_job_submit_datetime
 
 logger = logging.getLogger(__name__)
 
+QUERY_JOBS_BATCH_SIZE = 500
+
 
 class Scheduler(IScheduler):
     def __init__(
@@ -55,6 +61,7 @@ class Scheduler(IScheduler):
         self._as_admin = (operator_username == "root")
         self._config = config
 
+    @invalidate_query_cache
     def submit_job(
             self,
             job_content: str,
@@ -63,6 +70,7 @@ class Scheduler(IScheduler):
     ) -> JobIdentity:
         raise NotImplementedError("submit_job")
 
+    @invalidate_query_cache
     def submit_job_from_file(
             self,
             job_filename: str,
@@ -111,6 +119,7 @@ class Scheduler(IScheduler):
             )
         )
 
+    @invalidate_query_cache
     def job_action(self, scheduler_ids, command: List[str], action: str):
         logger.debug("%s job entry, scheduler_ids: %s", action, scheduler_ids)
         if self._as_admin:
@@ -128,6 +137,7 @@ class Scheduler(IScheduler):
                                            len(err.decode().splitlines()))
         return status
 
+    @invalidate_query_cache
     def cancel_job(self, scheduler_ids) -> None:
         ids = " ".join(scheduler_ids)
         args = ['job_ids=(%s); for job_id in "${job_ids[@]}";'
@@ -137,6 +147,7 @@ class Scheduler(IScheduler):
             raise CancelJobFailedException
         return status
 
+    @invalidate_query_cache
     def hold_job(self, scheduler_ids) -> None:
         ids = " ".join(scheduler_ids)
         args = ['job_ids=(%s); for job_id in "${job_ids[@]}";'
@@ -146,6 +157,7 @@ class Scheduler(IScheduler):
             raise HoldJobFailedException
         return status
 
+    @invalidate_query_cache
     def release_job(self, scheduler_ids):
         logger.debug("release_job entry")
         ids = " ".join(scheduler_ids)
@@ -156,6 +168,7 @@ class Scheduler(IScheduler):
             raise ReleaseJobFailedException
         return status
 
+    @invalidate_query_cache
     def suspend_job(self, scheduler_ids):
         logger.debug("suspend_job entry")
         ids = " ".join(scheduler_ids)
@@ -166,6 +179,7 @@ class Scheduler(IScheduler):
             raise SuspendJobFailedException
         return status
 
+    @invalidate_query_cache
     def resume_job(self, scheduler_ids):
         logger.debug("resume_job entry")
         ids = " ".join(scheduler_ids)
@@ -176,6 +190,7 @@ class Scheduler(IScheduler):
             raise ResumeJobFailedException
         return status
 
+    @cached_query(ttl=5)
     def query_job(self, job_identity: JobIdentity,
                   include_history=False) -> Job:
         jobid = job_identity.scheduler_id
@@ -198,8 +213,34 @@ class Scheduler(IScheduler):
         return job
 
     def query_recent_jobs(self, query_memory=True) -> List[Job]:
+        return self._query_jobs()
+
+    def query_changed_jobs(self, since, query_memory=True) -> List[Job]:
+        # Select the jobs, history included, modified after since
+        args = [
+            "qselect", "-x", "-t",
+            "m.gt.{0}".format(
+                datetime.fromtimestamp(since).strftime('%Y%m%d%H%M.%S')
+            )
+        ]
+        rc, out, err = exec_oscmd_with_login(args, self._config.timeout)
+        if rc:
+            logger.error("Select changed jobs failed: %s", err.decode())
+            raise QueryJobFailedException(err.decode())
+
+        jobids = out.decode().split()
+        jobs = []
+        for index in range(0, len(jobids), QUERY_JOBS_BATCH_SIZE):
+            jobs.extend(
+                self._query_jobs(
+                    jobids[index:index + QUERY_JOBS_BATCH_SIZE]
+                )
+            )
+        return jobs
+
+    def _query_jobs(self, jobids=()) -> List[Job]:
         cmd = ["qstat", "-xf", "-F", "json"]
-        data = get_job_query_data(cmd, self._config.timeout)
+        data = get_job_query_data(cmd + list(jobids), self._config.timeout)
 
         jobs = []
         array_jobs = {}  # {'123[]': <submit_host>}
@@ -235,6 +276,7 @@ class Scheduler(IScheduler):
 
         return jobs
 
+    @cached_query(ttl=10)
     def query_available_queues(self) -> List[Queue]:
         cmd = ["qstat", "-Qf", "-F", "json"]
         rc, out, err = exec_oscmd_with_login(cmd, self._config.timeout)
@@ -291,6 +333,7 @@ class Scheduler(IScheduler):
             self._server_status = None, False
         return self._server_status
 
+    @cached_query(ttl=5)
     def get_status(self) -> bool:
         _, active = self.server_status
         return active
@@ -367,6 +410,7 @@ class Scheduler(IScheduler):
     def recycle_resources(self, *a, **kw):
         pass
 
+    @cached_query(ttl=10)
     def get_scheduler_resource(self):
         cmd = self.get_ssh_cmd(["pbsnodes", "-a", "-F", "json"])
         _, out, _ = exec_oscmd_with_login(cmd, self._config.timeout)
@@ -397,9 +441,11 @@ class Scheduler(IScheduler):
     def get_scheduler_config(self, *args) -> dict:
         pass
 
+    @cached_query(ttl=60)
     def get_gres_type(self) -> dict:
         pass
 
+    @cached_query(ttl=30)
     def get_license_feature(self) -> list:
         pass
 
@@ -495,10 +541,12 @@ class Scheduler(IScheduler):
             self.get_job_pidlist
         ]
 
+    @cached_query(ttl=60)
     def get_priority_value(self):
         priority_dict = {"priority_min": "-1024", "priority_max": "1023"}
         return priority_dict
 
+    @invalidate_query_cache
     def update_job_priority(self, scheduler_ids, priority_value):
         logger.debug("Update job priority, scheduler_ids: %s" % scheduler_ids)
         if int(priority_value) > 1023 or int(
@@ -512,6 +560,7 @@ class Scheduler(IScheduler):
             raise SetPriorityException
         return status
 
+    @invalidate_query_cache
     def requeue_job(self, scheduler_ids):
         logger.error(
             "The requeue operation is not supported by scheduler PBS."
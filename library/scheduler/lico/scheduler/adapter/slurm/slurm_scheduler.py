@@ -17,7 +17,7 @@ import os
 import re
 from collections import defaultdict
 from subprocess import TimeoutExpired  # nosec B404
-from typing import List, Optional
+from typing import Iterator, List, Optional
 
 from dateutil.parser import parse
 
@@ -33,18 +33,23 @@ from lico.scheduler.base.exception.manager_exception import (
     QueryLicenseFeatureException,
 )
 from lico.scheduler.base.job.job import Job
+from lico.scheduler.base.job.job_state import JobState
 from lico.scheduler.base.job.queue import Queue
+from lico.scheduler.base.query_cache import (
+    cached_query, invalidate_query_cache,
+)
 from lico.scheduler.base.scheduler import IScheduler
 from lico.scheduler.utils.cmd_utils import (
     exec_oscmd, exec_oscmd_with_login, exec_oscmd_with_ssh,
-    exec_oscmd_with_user,
+    exec_oscmd_with_user, iter_oscmd_lines,
 )
 
 from .slurm_acct_parser import query_events_by_job, query_events_by_time
 from .slurm_config import SchedulerConfig
 from .slurm_job_identity import JobIdentity
 from .utils.job_parser import (
-    get_job_alter_ids, get_job_submit_datetime, parse_job_info,
+    get_job_alter_ids, get_job_submit_datetime, get_jobs_memory,
+    iter_job_records, parse_job_fields, parse_job_info, try_int,
 )
 from .utils.queue_parser import ignore_non_slurm_output, parse_queue_info
 
@@ -61,6 +66,7 @@ class Scheduler(IScheduler):
         self._as_admin = (operator_username == 'root')
         self._config = config
 
+    @invalidate_query_cache
     def submit_job(
             self,
             job_content: str,
@@ -69,6 +75,7 @@ class Scheduler(IScheduler):
     ) -> JobIdentity:
         raise NotImplementedError("submit_job")
 
+    @invalidate_query_cache
     def submit_job_from_file(
             self,
             job_filename: str,
@@ -123,6 +130,7 @@ class Scheduler(IScheduler):
                          "Error message is: %s", err.decode())
             raise SubmitJobFailedException(err.decode())
 
+    @invalidate_query_cache
     def job_action(self, scheduler_ids, command: List[str], action: str):
         logger.debug("%s job entry, scheduler_ids: %s", action, scheduler_ids)
         if self._as_admin:
@@ -139,6 +147,7 @@ class Scheduler(IScheduler):
                                            len(err.decode().splitlines()))
         return status
 
+    @invalidate_query_cache
     def cancel_job(self, scheduler_ids):
         new_scheduler_ids = get_job_alter_ids(scheduler_ids,
                                               self._config.timeout)
@@ -151,6 +160,7 @@ class Scheduler(IScheduler):
             raise CancelJobFailedException
         return status
 
+    @invalidate_query_cache
     def hold_job(self, scheduler_ids):
         new_scheduler_ids = get_job_alter_ids(scheduler_ids,
                                               self._config.timeout)
@@ -163,6 +173,7 @@ class Scheduler(IScheduler):
             raise HoldJobFailedException
         return status
 
+    @invalidate_query_cache
     def release_job(self, scheduler_ids):
         new_scheduler_ids = get_job_alter_ids(scheduler_ids,
                                               self._config.timeout)
@@ -175,6 +186,7 @@ class Scheduler(IScheduler):
             raise ReleaseJobFailedException
         return status
 
+    @invalidate_query_cache
     def suspend_job(self, scheduler_ids):
         new_scheduler_ids = get_job_alter_ids(scheduler_ids,
                                               self._config.timeout)
@@ -187,6 +199,7 @@ class Scheduler(IScheduler):
             raise SuspendJobFailedException
         return status
 
+    @invalidate_query_cache
     def resume_job(self, scheduler_ids):
         new_scheduler_ids = get_job_alter_ids(scheduler_ids,
                                               self._config.timeout)
@@ -199,6 +212,7 @@ class Scheduler(IScheduler):
             raise ResumeJobFailedException
         return status
 
+    @cached_query(ttl=5)
     def query_job(self, job_identity: JobIdentity,
                   include_history=False) -> Job:
         jobid = job_identity.scheduler_id
@@ -221,39 +235,60 @@ class Scheduler(IScheduler):
         )
         return job
 
-    def query_recent_jobs(self, query_memory=True) -> List[Job]:
-        all_job_status_info = {}
-        jobs_list = []
-        jobid = None
-        rc, out, err = exec_oscmd(
+    def query_recent_jobs(self, query_memory=True) -> Iterator[Job]:
+        # Records are tokenized while scontrol is still writing the output,
+        # and the jobs are yielded one by one.
+        job_records = list(iter_job_records(iter_oscmd_lines(
             ["scontrol", "show", "jobs"], self._config.timeout
-        )
-        lines = out.decode().splitlines()
-        if len(lines) < 1:
-            return jobs_list
-        for line in lines:
-            if line.find("JobId") == 0:
-                jobid = line.split()[0].split("=")[1].strip()
-                all_job_status_info[jobid] = {'info': []}
-            if jobid in all_job_status_info:
-                all_job_status_info[jobid]['info'].append(line)
-
-        for jobid in all_job_status_info:
+        )))
+        jobs_memory = self._query_jobs_memory(job_records, query_memory)
+        for jobid, fields in job_records:
             try:
-                job = parse_job_info(
+                job = parse_job_fields(
                     jobid=jobid,
-                    job_info=all_job_status_info[jobid]["info"],
+                    fields=fields,
                     config=self._config,
-                    query_memory=query_memory
+                    query_memory=query_memory,
+                    jobs_memory=jobs_memory
                 )
             except Exception:
                 logger.exception(
                     'Parse job info failed. Scheduler id: %s.', jobid,
                 )
             else:
-                jobs_list.append(job)
-        return jobs_list
+                yield job
+
+    def _query_jobs_memory(self, job_records, query_memory):
+        # Same condition as parse_job_fields, memory is needed for every job
+        # when query_memory is set, otherwise only for finished jobs, and
+        # only for jobs with both a node count and cpus per task.
+        final_states = {state.name for state in JobState.get_final_state()}
+        # sstat only reports the steps of jobs that are running
+        step_states = {
+            JobState.RUNNING.name, JobState.COMPLETING.name,
+            JobState.SUSPENDED.name
+        }
+        memory_jobids = []
+        running_jobids = set()
+        for jobid, fields in job_records:
+            if not try_int(fields.get('CPUs/Task', '')) or \
+                    not try_int(fields.get('NumNodes', '')):
+                continue
+            state = fields.get('JobState')
+            if state in final_states:
+                memory_jobids.append(jobid)
+            elif query_memory:
+                memory_jobids.append(jobid)
+                if state in step_states:
+                    running_jobids.add(jobid)
+        return get_jobs_memory(
+            memory_jobids,
+            running_jobids,
+            retry_count=self._config.memory_retry_count,
+            retry_interval=self._config.memory_retry_interval_second
+        )
 
+    @cached_query(ttl=10)
     def query_available_queues(self) -> List[Queue]:
         logger.debug("query_available_queues entry")
 
@@ -291,6 +326,7 @@ class Scheduler(IScheduler):
 
         return parse_queue_info(sinfo_lines, partition_lines, self._config)
 
+    @cached_query(ttl=5)
     def get_status(self) -> bool:
         rc, out, err = exec_oscmd(["scontrol", "ping"], self._config.timeout)
         lines = out.splitlines()
@@ -367,6 +403,7 @@ class Scheduler(IScheduler):
 
         return history_job
 
+    @cached_query(ttl=10)
     def get_scheduler_resource(self):
         rc, out, err = exec_oscmd(
             ["scontrol", "show", "node"], self._config.timeout
@@ -494,6 +531,7 @@ class Scheduler(IScheduler):
         """
         return dict(nodes_dict)
 
+    @cached_query(ttl=60)
     def get_gres_type(self) -> dict:
         gres_dict = defaultdict(dict)
         cmd = ["scontrol", "show", "node"]
@@ -526,6 +564,7 @@ class Scheduler(IScheduler):
         """
         return dict(gres_dict)
 
+    @cached_query(ttl=30)
     def get_license_feature(self) -> dict:
         licenseName_pattern = re.compile(r"LicenseName=([^\s]+)")
         total_pattern = re.compile(r"Total=([\d]+)")
@@ -615,10 +654,12 @@ class Scheduler(IScheduler):
             self.parse_job_pidlist
         ]
 
+    @cached_query(ttl=60)
     def get_priority_value(self):
         priority_dict = {"priority_min": "1", "priority_max": "4294967293"}
         return priority_dict
 
+    @invalidate_query_cache
     def update_job_priority(self, scheduler_ids, priority_value):
         if int(priority_value) > 4294967293 or int(priority_value) < 1:
             raise InvalidPriorityException
@@ -633,6 +674,7 @@ class Scheduler(IScheduler):
             raise SetPriorityException
         return status
 
+    @invalidate_query_cache
     def requeue_job(self, scheduler_ids):
         new_scheduler_ids = get_job_alter_ids(scheduler_ids,
                                               self._config.timeout)
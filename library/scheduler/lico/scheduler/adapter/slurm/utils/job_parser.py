@@ -18,7 +18,7 @@ import time
 from collections import defaultdict
 from datetime import datetime, timedelta
 from subprocess import CalledProcessError, check_output  # nosec B404
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
 
 from dateutil.parser import parse
 from dateutil.tz import tzlocal
@@ -33,11 +33,13 @@ from lico.scheduler.base.tres.trackable_resource_type import (
 )
 from lico.scheduler.utils.cmd_utils import exec_oscmd
 from lico.scheduler.utils.host_utils import MEMORY_UNIT
+from lico.scheduler.utils.nodeset import NodeSet, NodeSetParseError
 
 from ..slurm_job_identity import JobIdentity
 
 logger = logging.getLogger(__name__)
 FAILED_TO_PARSE_MEM = -1
+MEMORY_QUERY_BATCH_SIZE = 500
 
 
 def convert_runtime_2_seconds(time_length: str) -> int:
@@ -73,69 +75,10 @@ def convert_timestr_2_datetime(time_str: str) -> Optional[datetime]:
 
 
 def expand_host_list(hosts_str: str) -> List:
-    hosts = []
-    bracket_num = 0
-    part_host = ""
-    for single_char in hosts_str + ",":
-        if single_char == "," and bracket_num == 0:
-            # Comma at top level, split!
-            if part_host:
-                hosts.extend(expand_slurm(part_host))
-            part_host = ""
-        else:
-            part_host += single_char
-        if single_char == "[":
-            bracket_num += 1
-        elif single_char == "]":
-            bracket_num -= 1
-        if bracket_num > 1 or bracket_num < 0:
-            raise NodeListParseException("Brackets unmatched.")
-    if bracket_num > 0:
-        raise NodeListParseException("Brackets unmatched.")
-    return list(set(hosts))
-
-
-def expand_slurm(need_expand: str) -> List:
-    if need_expand == "":
-        return [""]
-    m = re.match(r'([^,\[]*)(\[[^\]]*\])?(.*)', need_expand)
-    (prefix, range_list, rest) = m.group(1, 2, 3)
-
-    rest_expand = expand_slurm(rest)
-
-    if not range_list:
-        curr_expand = [prefix]
-    else:
-        curr_expand = []
-        for range_slurm in range_list[1:-1].split(","):
-            results = expand_slurm_range(prefix, range_slurm)
-            curr_expand.extend(results)
-    if len(curr_expand) * len(rest_expand) > 10000:
-        raise NodeListParseException("Contains too many nodes.")
-    return [curr_part + rest_part
-            for curr_part in curr_expand
-            for rest_part in rest_expand]
-
-
-def expand_slurm_range(prefix: str, range_slurm: str) -> List:
-    m = re.match(r'^[0-9]+$', range_slurm)
-    if m:
-        return ["%s%s" % (prefix, range_slurm)]
-    match_re = re.match(r'^([0-9]+)-([0-9]+)$', range_slurm)
-    if not match_re:
-        raise NodeListParseException("Invalid range.")
-    (exp_low, exp_high) = match_re.group(1, 2)
-    low = int(exp_low)
-    high = int(exp_high)
-    width = len(exp_low)
-    if high < low:
-        raise NodeListParseException("Start greater than End.")
-    elif high - low > 10000:
-        raise NodeListParseException("Contains too many nodes.")
-    results = []
-    for i in range(low, high + 1):
-        results.append("%s%0*d" % (prefix, width, i))
-    return results
+    try:
+        return list(NodeSet(hosts_str))
+    except NodeSetParseError as e:
+        raise NodeListParseException(str(e)) from e
 
 
 def convert_tres_dict_2_obj(gres_hosts: dict, nodes_count=1):
@@ -366,6 +309,59 @@ def calculate_step_mem(
         return FAILED_TO_PARSE_MEM
 
 
+def group_slurm_mem_info(job_mem: dict) -> Dict[str, dict]:
+    # Group the steps of many jobs by JobIdRaw, e.g.
+    # {'123': {'123': [...], '123.batch': [...], '123.0': [...]}}
+    jobs_mem = defaultdict(dict)
+    for step_id, step_content in job_mem.items():
+        jobs_mem[step_id.split('.')[0]][step_id] = step_content
+    return jobs_mem
+
+
+def calculate_job_mem(
+        jobid: str,
+        all_step_info: dict,
+        running_step_info: dict
+) -> Optional[float]:
+    """
+    Return the memory of the job, unit is MB.
+    Return None when slurm has not prepared the data yet.
+    """
+    if jobid not in all_step_info:
+        return None
+    job_elapsed_time = all_step_info[jobid][-1]
+    if job_elapsed_time in ["00:00", "00:00:00"]:
+        return None
+
+    all_step_mem = []
+    for step_id, step_content in all_step_info.items():
+        # When a job is submitted in the sbatch.script format.
+        # The first row cannot display the AveRss value,
+        # which JobID value just is exactly equal to JobId without StepId.
+        # while other rows' values are like JobId.StepId.
+
+        # exclude extra array job or heterogeneous job
+        if jobid not in step_id:
+            continue
+        if step_id == jobid and not step_content[1]:
+            continue
+        if step_id in running_step_info and not step_content[1]:
+            step_content[1] = running_step_info[step_id][1]
+            step_content[2] = running_step_info[step_id][2]
+        single_step_mem = calculate_step_mem(
+            step_mem=convert_memory(step_content[1]),
+            step_ntasks=step_content[2],
+            step_elapsed=convert_time(step_content[3]),
+            job_elapsed_time=convert_time(job_elapsed_time))
+        if single_step_mem == FAILED_TO_PARSE_MEM:
+            return 0
+        all_step_mem.append(single_step_mem)
+
+    if len(all_step_mem) > 0:
+        return round(sum(all_step_mem) / 1024, 2)  # unit: MB
+    return None
+
+
 def get_job_memory(
         jobid: str,
         retry_count=0,
@@ -377,7 +373,6 @@ def get_job_memory(
     command sacct could not dispaly the AveRSS value for a running step.
     """
     for i in range(retry_count):
-        all_step_mem, all_step_info, running_step_info = [], {}, {}
         sstat_args = ["sstat", "--noheader", "-a", "-p",
                       "--format=JobID,AveRSS,NTasks",
                       "-j", jobid]
@@ -393,39 +388,13 @@ def get_job_memory(
                 'Get job memory failed, the cmd is {0}, '
                 'the error is {1}'.format(e.cmd, e.stderr))
             return 0
-        all_step_info = parse_slurm_mem_info(all_step_raw_info)
-        running_step_info = parse_slurm_mem_info(running_step_raw_info)
-
-        if jobid in all_step_info:
-            job_elapsed_time = all_step_info[jobid][-1]
-            if job_elapsed_time in ["00:00", "00:00:00"]:
-                continue
-
-        for step_id, step_content in all_step_info.items():
-            # When a job is submitted in the sbatch.script format.
-            # The first row cannot display the AveRss value,
-            # which JobID value just is exactly equal to JobId without StepId.
-            # while other rows' values are like JobId.StepId.
-
-            # exclude extra array job or heterogeneous job
-            if jobid not in step_id:
-                continue
-            if step_id == jobid and not step_content[1]:
-                continue
-            if step_id in running_step_info and not step_content[1]:
-                step_content[1] = running_step_info[step_id][1]
-                step_content[2] = running_step_info[step_id][2]
-            single_step_mem = calculate_step_mem(
-                step_mem=convert_memory(step_content[1]),
-                step_ntasks=step_content[2],
-                step_elapsed=convert_time(step_content[3]),
-                job_elapsed_time=convert_time(job_elapsed_time))
-            if single_step_mem == FAILED_TO_PARSE_MEM:
-                return 0
-            all_step_mem.append(single_step_mem)
-
-        if len(all_step_mem) > 0:
-            return round(sum(all_step_mem) / 1024, 2)  # unit: MB
+        job_mem = calculate_job_mem(
+            jobid,
+            parse_slurm_mem_info(all_step_raw_info),
+            parse_slurm_mem_info(running_step_raw_info)
+        )
+        if job_mem is not None:
+            return job_mem
         if retry_count:
             time.sleep(retry_interval)
     else:
@@ -433,6 +402,88 @@ def get_job_memory(
         return 0
 
 
+def _query_jobs_mem_info(jobids, running_jobids):
+    # The job ids are passed in batches, a single argument holding all of
+    # them may exceed the size limit of the command line.
+    all_step_info, running_step_info = {}, {}
+    for start in range(0, len(jobids), MEMORY_QUERY_BATCH_SIZE):
+        batch_jobids = jobids[start:start + MEMORY_QUERY_BATCH_SIZE]
+        sacct_args = ["sacct", "--noheader", "-a", "-p",
+                      "--format=JobIdRaw,AveRSS,NTasks,Elapsed",
+                      "-j", ",".join(batch_jobids)]
+        all_step_info.update(parse_slurm_mem_info(
+            check_output(sacct_args)  # nosec B603
+        ))
+
+        sstat_jobids = [
+            jobid for jobid in batch_jobids if jobid in running_jobids
+        ]
+        if not sstat_jobids:
+            continue
+        sstat_args = ["sstat", "--noheader", "-a", "-p",
+                      "--format=JobID,AveRSS,NTasks",
+                      "-j", ",".join(sstat_jobids)]
+        try:
+            running_step_raw_info = check_output(sstat_args)  # nosec B603
+        except CalledProcessError as e:
+            # sstat exits with error if any job has no running step,
+            # the steps of the other jobs are still printed.
+            running_step_raw_info = e.output or b''
+        running_step_info.update(parse_slurm_mem_info(running_step_raw_info))
+    return all_step_info, running_step_info
+
+
+def get_jobs_memory(
+        jobids: List[str],
+        running_jobids: Set[str],
+        retry_count=0,
+        retry_interval=0.5
+) -> Dict[str, float]:
+    """
+    Bulk version of get_job_memory.
+    Each retry runs sstat and sacct once per batch of job ids, instead
+    of once per job. Return the memory of the jobs, unit is MB,
+    a job that slurm has not prepared the data for is missing.
+    """
+    jobs_mem = {}
+    pending_jobids = list(jobids)
+    for i in range(retry_count):
+        if not pending_jobids:
+            break
+        try:
+            all_step_info, running_step_info = _query_jobs_mem_info(
+                pending_jobids, running_jobids
+            )
+        except (CalledProcessError, OSError) as e:
+            logger.warning(
+                'Get jobs memory failed, the error is {0} {1}'.format(
+                    e, getattr(e, 'stderr', None) or ''
+                )
+            )
+            return jobs_mem
+
+        all_step_info = group_slurm_mem_info(all_step_info)
+        not_ready_jobids = []
+        for jobid in pending_jobids:
+            job_mem = calculate_job_mem(
+                jobid, all_step_info.get(jobid, {}), running_step_info
+            )
+            if job_mem is None:
+                not_ready_jobids.append(jobid)
+            else:
+                jobs_mem[jobid] = job_mem
+        pending_jobids = not_ready_jobids
+        if pending_jobids and i < retry_count - 1:
+            time.sleep(retry_interval)
+
+    if pending_jobids:
+        logger.info(
+            'Memory is null until slurm prepares the data. Job ids: %s',
+            pending_jobids
+        )
+    return jobs_mem
+
+
 def try_int(value):
     # value may be <min_count>[-<max_count>]. e.g. '5-5'
     if '-' in value:
@@ -448,15 +499,73 @@ def is_number(value):
         return False
 
 
-def parse_job_info(  # noqa: C901
+JOB_FIELD_RE = re.compile(r'(?<= |\t)(\S+?)=')
+# Only the fields used by parse_job_fields are kept for each job
+JOB_FIELD_KEYS = frozenset([
+    'JobName', 'JobState', 'Reason', 'Restarts', 'RunTime', 'SubmitTime',
+    'StartTime', 'EndTime', 'Partition', 'StdOut', 'StdErr', 'UserId',
+    'WorkDir', 'Comment', 'TimeLimit', 'ExitCode', 'Priority', 'NodeList',
+    'NumNodes', 'NumCPUs', 'NumTasks', 'CPUs/Task', 'TRES', 'Gres',
+    'TresPerNode', 'MinCPUsNode',
+])
+
+
+def tokenize_job_line(line: str, fields: Dict[str, str]) -> None:
+    params = JOB_FIELD_RE.split(line)
+    for index in range(1, len(params), 2):
+        key = params[index].strip()
+        if key in JOB_FIELD_KEYS:
+            fields[key] = params[index + 1].strip()
+
+
+def iter_job_records(
+        lines: Iterable[bytes]
+) -> Iterator[Tuple[str, Dict[str, str]]]:
+    """
+    Tokenize the output of `scontrol show jobs` in a single pass.
+    Each record is yielded as (jobid, fields) as soon as the next record
+    starts, so the whole output is never held in memory.
+    """
+    jobid = None
+    fields = {}
+    for line in lines:
+        line = line.decode()
+        if line.find("JobId") == 0:
+            if jobid is not None:
+                yield jobid, fields
+            jobid = line.split()[0].split("=")[1].strip()
+            fields = {}
+        if jobid is not None:
+            tokenize_job_line(line, fields)
+    if jobid is not None:
+        yield jobid, fields
+
+
+def parse_job_info(
         jobid: str,
         job_info: List[str],
         config,
-        query_memory=True
+        query_memory=True,
+        jobs_memory: Optional[Dict[str, float]] = None
 ) -> Job:
-    job = Job()
+    fields = {}
+    for line in job_info:
+        tokenize_job_line(line, fields)
+    return parse_job_fields(
+        jobid, fields, config,
+        query_memory=query_memory,
+        jobs_memory=jobs_memory
+    )
 
-    split_re = re.compile(r'(?<= |\t)(\S+?)=')
+
+def parse_job_fields(  # noqa: C901
+        jobid: str,
+        fields: Dict[str, str],
+        config,
+        query_memory=True,
+        jobs_memory: Optional[Dict[str, float]] = None
+) -> Job:
+    job = Job()
 
     node_lists = ""
     cpus_count = 0
@@ -466,65 +575,60 @@ def parse_job_info(  # noqa: C901
     gres_dict = {}
     min_cpus_node = 0
     end_time_raw_value = ""
-    for line in job_info:
-        params = re.split(split_re, line)
-        for index in range(1, len(params), 2):
-            key = params[index].strip()
-            value = params[index + 1].strip()
-
-            if key == "JobName":
-                job.name = value
-            elif key == "JobState":
-                job.state = JobState[value]
-            elif key == "Reason":
-                job.reason = value
-            elif key == 'Restarts':
-                if try_int(value):
-                    job.requeued = True
-            elif key == "RunTime":
-                job.runtime = convert_runtime_2_seconds(value)
-            elif key == "SubmitTime":
-                job.submit_time = convert_timestr_2_datetime(value)
-            elif key == 'StartTime':
-                job.start_time = convert_timestr_2_datetime(value)
-            elif key == 'EndTime':
-                end_time_raw_value = value
-                job.end_time = convert_timestr_2_datetime(value)
-            elif key == 'Partition':
-                job.queue_name = value
-            elif key == 'StdOut':
-                job.standard_output_filename = value
-            elif key == 'StdErr':
-                job.error_output_filename = value
-            elif key == 'UserId':
-                job.submitter_username = value.split("(")[0]
-            elif key == 'WorkDir':
-                job.workspace_path = value
-            elif key == "Comment":
-                job.comment = value
-            elif key == "TimeLimit":
-                job.time_limit = convert_runtime_2_seconds(value)
-            elif key == "ExitCode":
-                job.exit_code = value
-            elif key == "Priority":
-                job.priority = value if is_number(value) else ''
-            elif key == 'NodeList':
-                node_lists = value
-            elif key == 'NumNodes':
-                nodes_count = try_int(value)
-            elif key == 'NumCPUs':
-                cpus_count = try_int(value)
-            elif key == 'NumTasks':
-                num_tasks = try_int(value)
-            elif key == 'CPUs/Task':
-                num_cpus_per_task = try_int(value)
-            elif key == 'TRES':
-                gres_dict = convert_tres_gres_count(value)
-            elif key == 'Gres' or key == 'TresPerNode':
-                if not gres_dict:
-                    gres_dict = convert_gres_count(value)
-            elif key == 'MinCPUsNode':
-                min_cpus_node = try_int(value)
+    for key, value in fields.items():
+        if key == "JobName":
+            job.name = value
+        elif key == "JobState":
+            job.state = JobState[value]
+        elif key == "Reason":
+            job.reason = value
+        elif key == 'Restarts':
+            if try_int(value):
+                job.requeued = True
+        elif key == "RunTime":
+            job.runtime = convert_runtime_2_seconds(value)
+        elif key == "SubmitTime":
+            job.submit_time = convert_timestr_2_datetime(value)
+        elif key == 'StartTime':
+            job.start_time = convert_timestr_2_datetime(value)
+        elif key == 'EndTime':
+            end_time_raw_value = value
+            job.end_time = convert_timestr_2_datetime(value)
+        elif key == 'Partition':
+            job.queue_name = value
+        elif key == 'StdOut':
+            job.standard_output_filename = value
+        elif key == 'StdErr':
+            job.error_output_filename = value
+        elif key == 'UserId':
+            job.submitter_username = value.split("(")[0]
+        elif key == 'WorkDir':
+            job.workspace_path = value
+        elif key == "Comment":
+            job.comment = value
+        elif key == "TimeLimit":
+            job.time_limit = convert_runtime_2_seconds(value)
+        elif key == "ExitCode":
+            job.exit_code = value
+        elif key == "Priority":
+            job.priority = value if is_number(value) else ''
+        elif key == 'NodeList':
+            node_lists = value
+        elif key == 'NumNodes':
+            nodes_count = try_int(value)
+        elif key == 'NumCPUs':
+            cpus_count = try_int(value)
+        elif key == 'NumTasks':
+            num_tasks = try_int(value)
+        elif key == 'CPUs/Task':
+            num_cpus_per_task = try_int(value)
+        elif key == 'TRES':
+            gres_dict = convert_tres_gres_count(value)
+        elif key == 'Gres' or key == 'TresPerNode':
+            if not gres_dict:
+                gres_dict = convert_gres_count(value)
+        elif key == 'MinCPUsNode':
+            min_cpus_node = try_int(value)
 
     logger.debug(
         f"Pre parse job resource. node_lists: {node_lists}; "
@@ -542,7 +646,10 @@ def parse_job_info(  # noqa: C901
         # slurm may not return memory immediately
         # so add retry to get job memory
         ave_mem = 0
-        if query_memory or job.state in JobState.get_final_state():
+        if jobs_memory is not None:
+            # memory was already collected in bulk by get_jobs_memory
+            ave_mem = jobs_memory.get(jobid, 0)
+        elif query_memory or job.state in JobState.get_final_state():
             ave_mem = get_job_memory(
                 jobid,
                 retry_count=config.memory_retry_count,
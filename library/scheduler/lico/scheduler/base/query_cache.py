@@ -0,0 +1,160 @@
+# Copyright 2015-present Lenovo
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+import threading
+import time
+from collections import Counter, OrderedDict
+from copy import deepcopy
+from functools import wraps
+
+logger = logging.getLogger(__name__)
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class QueryCache:
+    """
+    Process wide cache of scheduler query results.
+
+    Concurrent identical queries share one call, results are kept for a
+    per method TTL, and any mutating operation of the same scheduler
+    type drops them.
+    """
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._calls = {}
+        self._generations = Counter()
+        self._counters = Counter()
+        self._lock = threading.Lock()
+
+    def get_or_call(self, key, ttl, func):
+        scope = key[0]
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._counters['hits'] += 1
+                return deepcopy(entry[1])
+            call = self._calls.get(key)
+            if call is None:
+                self._counters['misses'] += 1
+                call = self._calls[key] = _Call()
+                generation = self._generations[scope]
+                leader = True
+            else:
+                self._counters['coalesced'] += 1
+                leader = False
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return deepcopy(call.result)
+
+        try:
+            call.result = func()
+        except BaseException as e:
+            call.error = e
+            raise
+        else:
+            with self._lock:
+                if self._generations[scope] == generation:
+                    self._set(key, ttl, call.result)
+            return deepcopy(call.result)
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+    def _set(self, key, ttl, value):
+        now = time.monotonic()
+        self._entries.pop(key, None)
+        self._entries[key] = (now + ttl, value)
+        if len(self._entries) > self.maxsize:
+            for k in [k for k, v in self._entries.items() if v[0] <= now]:
+                del self._entries[k]
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, scope=None):
+        with self._lock:
+            self._counters['invalidations'] += 1
+            if scope is None:
+                self._entries.clear()
+                for key in list(self._generations):
+                    self._generations[key] += 1
+                return
+            self._generations[scope] += 1
+            for key in [k for k in self._entries if k[0] == scope]:
+                del self._entries[key]
+
+    def stats(self):
+        with self._lock:
+            return dict(
+                hits=self._counters['hits'],
+                misses=self._counters['misses'],
+                coalesced=self._counters['coalesced'],
+                invalidations=self._counters['invalidations'],
+                size=len(self._entries)
+            )
+
+
+query_cache = QueryCache()
+
+
+def _cache_scope(scheduler):
+    return type(scheduler).__module__
+
+
+def cached_query(ttl):
+    """
+    Cache the result of a scheduler query method for ``ttl`` seconds,
+    overridable per method name through ``config.cache_ttl``.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(self, *args, **kwargs):
+            method_ttl = self._config.cache_ttl.get(func.__name__, ttl)
+            key = (
+                _cache_scope(self), self._operator_username, func.__name__,
+                args, tuple(sorted(kwargs.items()))
+            )
+            try:
+                hash(key)
+            except TypeError:
+                method_ttl = 0
+            if method_ttl <= 0:
+                return func(self, *args, **kwargs)
+            return query_cache.get_or_call(
+                key, method_ttl, lambda: func(self, *args, **kwargs)
+            )
+        return wrapper
+    return decorator
+
+
+def invalidate_query_cache(func):
+    @wraps(func)
+    def wrapper(self, *args, **kwargs):
+        try:
+            return func(self, *args, **kwargs)
+        finally:
+            query_cache.invalidate(_cache_scope(self))
+    return wrapper
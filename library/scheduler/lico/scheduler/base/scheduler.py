@@ -13,7 +13,7 @@
 # limitations under the License.
 
 from abc import ABCMeta, abstractmethod
-from typing import List
+from typing import Iterable, List
 
 from .job.job import Job
 from .job.job_identity import IJobIdentity
@@ -72,9 +72,20 @@ class IScheduler(metaclass=ABCMeta):
         pass
 
     @abstractmethod
-    def query_recent_jobs(self, query_memory: bool = True) -> List[Job]:
+    def query_recent_jobs(
+            self, query_memory: bool = True
+    ) -> Iterable[Job]:
         pass
 
+    def query_changed_jobs(
+            self, since: float, query_memory: bool = True
+    ) -> Iterable[Job]:
+        """
+        Jobs changed after the ``since`` timestamp. Adapters that can
+        not ask the scheduler for a change window return all recent jobs.
+        """
+        return self.query_recent_jobs(query_memory)
+
     @abstractmethod
     def query_available_queues(self) -> List[Queue]:
         pass
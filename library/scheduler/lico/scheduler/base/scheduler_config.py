@@ -18,3 +18,5 @@ import attr
 @attr.s(slots=True)
 class BaseSchedulerConfig:
     timeout = attr.ib(default=30)
+    # Seconds to cache the result of each query method, 0 to disable
+    cache_ttl = attr.ib(factory=dict)
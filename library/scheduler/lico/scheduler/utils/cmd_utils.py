@@ -12,10 +12,34 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from subprocess import PIPE, list2cmdline, run  # nosec B404
+import logging
+import shutil
+import time
+from subprocess import (  # nosec B404
+    DEVNULL, PIPE, Popen, TimeoutExpired, list2cmdline, run,
+)
+from threading import BoundedSemaphore, Lock, Timer
 
 from lico.ssh import RemoteSSH
 
+logger = logging.getLogger(__name__)
+
+LOGIN_ENV_TTL = 300
+LOGIN_ENV_TIMEOUT = 30
+LOGIN_ENV_RETRY = 5
+LOGIN_CMD_CONCURRENCY = 8
+
+_LOGIN_ENV_MARKER = '--lico-login-env--'
+_LOGIN_ENV_EXCLUDE = ('_', 'PWD', 'OLDPWD', 'SHLVL')
+_SHELL_CHARS = frozenset('|&;<>()$`\\"\'*?[]#~{}!')
+_QUOTED_SHELL_CHARS = frozenset('$`\\"')
+
+_login_env = None
+_login_env_expires = 0
+_login_env_capturing = False
+_login_env_lock = Lock()
+_login_cmd_slots = BoundedSemaphore(LOGIN_CMD_CONCURRENCY)
+
 
 def exec_oscmd(args, timeout: int):
     process = run(
@@ -24,17 +48,129 @@ def exec_oscmd(args, timeout: int):
     return process.returncode, process.stdout, process.stderr
 
 
-def exec_oscmd_with_login(args, timeout: int):
+def iter_oscmd_lines(args, timeout: int):
+    """
+    Yield the stdout of the command line by line while it is running,
+    the stderr is discarded.
+    Raise TimeoutExpired if the command is killed after timeout seconds.
+    """
+    deadline = time.monotonic() + timeout
+    process = Popen(args, stdout=PIPE, stderr=DEVNULL)  # nosec B603
+    timer = Timer(timeout, process.kill)
+    timer.start()
+    try:
+        for line in process.stdout:
+            yield line
+        if process.wait() < 0 and time.monotonic() >= deadline:
+            raise TimeoutExpired(args, timeout)
+    finally:
+        timer.cancel()
+        process.stdout.close()
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+
+
+def _capture_login_env(timeout):
     process = run(  # nosec B603 B607
         [
             'bash', '--login', '-c',
-            list2cmdline(args)
+            f'echo -n {_LOGIN_ENV_MARKER}; env -0'
         ],
         stdout=PIPE,
-        stderr=PIPE,
+        stderr=DEVNULL,
         timeout=timeout
     )
-    return process.returncode, process.stdout, process.stderr
+    _, found, out = process.stdout.partition(_LOGIN_ENV_MARKER.encode())
+    if process.returncode or not found:
+        raise RuntimeError(
+            f'Capture login environment failed: {process.returncode}'
+        )
+
+    env = {}
+    for item in out.split(b'\0'):
+        key, sep, value = item.decode(errors='replace').partition('=')
+        if sep and key not in _LOGIN_ENV_EXCLUDE:
+            env[key] = value
+    return env
+
+
+def get_login_env(refresh=False, timeout=LOGIN_ENV_TIMEOUT):
+    """
+    Environment of a login shell, captured once and refreshed after
+    LOGIN_ENV_TTL seconds. Return None if it has never been captured.
+    The capture takes at most timeout seconds, the other callers get
+    the previous environment meanwhile instead of waiting for it.
+    A failed capture keeps the previous environment and is retried
+    after LOGIN_ENV_RETRY seconds.
+    """
+    global _login_env, _login_env_expires, _login_env_capturing
+
+    with _login_env_lock:
+        now = time.monotonic()
+        if _login_env_capturing or timeout <= 0 or \
+                not refresh and now < _login_env_expires:
+            return _login_env
+        _login_env_capturing = True
+
+    env = None
+    try:
+        env = _capture_login_env(min(timeout, LOGIN_ENV_TIMEOUT))
+    except Exception:
+        logger.warning('Failed to capture login environment', exc_info=True)
+    finally:
+        with _login_env_lock:
+            if env is None:
+                _login_env_expires = time.monotonic() + LOGIN_ENV_RETRY
+            else:
+                _login_env = env
+                _login_env_expires = now + LOGIN_ENV_TTL
+            _login_env_capturing = False
+    return _login_env
+
+
+def _need_shell(args):
+    # Run through the login shell if bash would parse the command line
+    # into something other than args, e.g. pipes or quoted awk scripts.
+    for arg in args:
+        if any(c.isspace() for c in arg):
+            if _QUOTED_SHELL_CHARS.intersection(arg):
+                return True
+        elif not arg or _SHELL_CHARS.intersection(arg):
+            return True
+    return False
+
+
+def exec_oscmd_with_login(args, timeout: int):
+    deadline = time.monotonic() + timeout
+    if not _login_cmd_slots.acquire(timeout=timeout):
+        raise TimeoutExpired(args, timeout)
+    try:
+        # leave the command at least half of the remaining time
+        env = None if _need_shell(args) else get_login_env(
+            timeout=(deadline - time.monotonic()) / 2
+        )
+        executable = None if env is None else \
+            shutil.which(args[0], path=env.get('PATH'))
+        if executable is None:
+            env = None
+            cmd = [
+                'bash', '--login', '-c',
+                list2cmdline(args)
+            ]
+        else:
+            cmd = [executable] + list(args[1:])
+
+        process = run(  # nosec B603 B607
+            cmd,
+            stdout=PIPE,
+            stderr=PIPE,
+            env=env,
+            timeout=max(deadline - time.monotonic(), 0)
+        )
+        return process.returncode, process.stdout, process.stderr
+    finally:
+        _login_cmd_slots.release()
 
 
 def exec_oscmd_with_user(user, args, timeout: int):
@@ -0,0 +1,367 @@
+# Copyright 2015-present Lenovo
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import re
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from itertools import product
+
+# Guard against expanding ridiculously long lists of names
+MAX_EXPAND = 100000
+
+_BRACKET_RE = re.compile(r'(\[[^\[\]]*\])')
+_RANGE_RE = re.compile(r'^([0-9]+)(?:-([0-9]+))?$')
+_HOST_RE = re.compile(r'^(.*?)([0-9]+)([^0-9]*)$')
+_FORBIDDEN_RE = re.compile(r'[][,]')
+
+
+class NodeSetParseError(ValueError):
+    pass
+
+
+def _pad(digits):
+    return len(digits) if len(digits) > 1 and digits[0] == '0' else 0
+
+
+def _canonical(lo, hi, width):
+    # numbers with as many digits as the width are not zero padded, so
+    # n[08-11] is n08,n09 padded to 2 and n10,n11 not padded at all
+    limit = 10 ** (width - 1)
+    if width > 1 and lo < limit:
+        yield width, lo, min(hi, limit - 1)
+        lo = limit
+    if lo <= hi:
+        yield 0, lo, hi
+
+
+def _normalize(ranges):
+    merged = []
+    for lo, hi in sorted(ranges):
+        if merged and lo <= merged[-1][1] + 1:
+            if hi > merged[-1][1]:
+                merged[-1] = (merged[-1][0], hi)
+        else:
+            merged.append((lo, hi))
+    return merged
+
+
+def _intersection(a, b):
+    result = []
+    i = j = 0
+    while i < len(a) and j < len(b):
+        lo = max(a[i][0], b[j][0])
+        hi = min(a[i][1], b[j][1])
+        if lo <= hi:
+            result.append((lo, hi))
+        if a[i][1] < b[j][1]:
+            i += 1
+        else:
+            j += 1
+    return result
+
+
+def _difference(a, b):
+    result = []
+    j = 0
+    for lo, hi in a:
+        while j < len(b) and b[j][1] < lo:
+            j += 1
+        k = j
+        while k < len(b) and b[k][0] <= hi and lo <= hi:
+            if b[k][0] > lo:
+                result.append((lo, b[k][0] - 1))
+            lo = b[k][1] + 1
+            k += 1
+        if lo <= hi:
+            result.append((lo, hi))
+    return result
+
+
+def _format_ranges(pads):
+    natural = list(pads.get(0, ()))
+    ranges = []
+    for pad in sorted(pad for pad in pads if pad):
+        limit = 10 ** (pad - 1)
+        for lo, hi in pads[pad]:
+            if hi == limit - 1:
+                i = bisect_left(natural, (limit,))
+                if i < len(natural) and natural[i][0] == limit:
+                    hi = natural.pop(i)[1]
+            ranges.append((lo, hi, pad))
+    ranges.extend((lo, hi, 0) for lo, hi in natural)
+    ranges.sort(key=lambda item: (item[0], item[2]))
+
+    if len(ranges) == 1 and ranges[0][0] == ranges[0][1]:
+        return '%0*d' % (ranges[0][2], ranges[0][0])
+    return '[' + ','.join(
+        '%0*d' % (pad, lo) if lo == hi else
+        '%0*d-%0*d' % (pad, lo, pad, hi)
+        for lo, hi, pad in ranges
+    ) + ']'
+
+
+def _fold_pass(items):
+    """
+    Fold the rightmost number of the left parts of (left, right) items,
+    the right parts hold what is already folded.
+    """
+    results = []
+    groups = defaultdict(lambda: defaultdict(list))
+    for left, right in items:
+        m = _HOST_RE.match(left)
+        if m is None:
+            results.append(('', left + right))
+            continue
+        prefix, digits, suffix = m.groups()
+        value = int(digits)
+        groups[(prefix, suffix + right)][_pad(digits)].append((value, value))
+
+    for (prefix, suffix), pads in groups.items():
+        results.append((prefix, _format_ranges(
+            {pad: _normalize(ranges) for pad, ranges in pads.items()}
+        ) + suffix))
+    return results, bool(groups)
+
+
+class NodeSet(object):
+    """
+    Set of node names in a compact form.
+
+    Names are grouped by everything around their rightmost number and
+    the numbers are kept as sorted, disjoint ranges, so node[0001-8192]
+    takes one range however many nodes it covers. Set operations work
+    on the ranges, names are only built when iterating.
+
+    Example: NodeSet("n[9-11],d[01-02]") iterates as
+             n9, n10, n11, d01, d02 and folds back to "d[01-02],n[9-11]"
+    """
+
+    __slots__ = ('_ranges', '_names')
+
+    def __init__(self, pattern=''):
+        # (prefix, suffix, zero padding) => [(low, high), ...]
+        self._ranges = {}
+        # names without any number, as an ordered set
+        self._names = {}
+        if pattern:
+            self.update(pattern)
+
+    @classmethod
+    def from_hosts(cls, hosts, silently_discard_bad=False):
+        """
+        Build a set from plain host names. A name using the hostlist
+        syntax raises NodeSetParseError unless silently_discard_bad.
+        """
+        nodeset = cls()
+        pending = defaultdict(list)
+        for host in hosts:
+            host = host.strip()
+            if not host:
+                continue
+            if _FORBIDDEN_RE.search(host):
+                if silently_discard_bad:
+                    continue
+                raise NodeSetParseError('forbidden character')
+            nodeset._add_host(host, pending)
+        nodeset._merge(pending)
+        return nodeset
+
+    def update(self, pattern):
+        """Add the nodes of a hostlist expression like "n[1-3],m2"."""
+        pending = defaultdict(list)
+        for part in self._split(pattern):
+            self._add_part(part, pending)
+        self._merge(pending)
+
+    @staticmethod
+    def _split(pattern):
+        parts = [[]]
+        for index, token in enumerate(_BRACKET_RE.split(pattern)):
+            if index % 2:
+                parts[-1].append(_parse_rangelist(token[1:-1]))
+                continue
+            if '[' in token or ']' in token:
+                raise NodeSetParseError('unbalanced or nested brackets')
+            literals = token.split(',')
+            parts[-1].append(literals[0])
+            parts.extend([literal] for literal in literals[1:])
+        return [
+            [segment for segment in part if segment != '']
+            for part in parts if any(part)
+        ]
+
+    def _add_part(self, segments, pending):
+        last = max(
+            (i for i, segment in enumerate(segments)
+             if not isinstance(segment, str)),
+            default=None
+        )
+        if last is None:
+            self._add_host(''.join(segments), pending)
+            return
+
+        before = segments[last - 1] if last else ''
+        suffix = ''.join(segments[last + 1:])
+        if isinstance(before, list) or before[-1:].isdigit() \
+                or any(c.isdigit() for c in suffix):
+            # the bracket is not the rightmost number of the names
+            for host in _expand(segments):
+                self._add_host(host, pending)
+            return
+
+        for prefix in _expand(segments[:last]):
+            for lo, hi, width in segments[last]:
+                for pad, low, high in _canonical(lo, hi, width):
+                    pending[(prefix, suffix, pad)].append((low, high))
+
+    def _add_host(self, host, pending):
+        m = _HOST_RE.match(host)
+        if m is None:
+            self._names[host] = None
+            return
+        prefix, digits, suffix = m.groups()
+        value = int(digits)
+        pending[(prefix, suffix, _pad(digits))].append((value, value))
+
+    def _merge(self, pending):
+        for key, ranges in pending.items():
+            self._ranges[key] = _normalize(self._ranges.get(key, []) + ranges)
+
+    def _copy(self):
+        nodeset = NodeSet()
+        nodeset._ranges = dict(self._ranges)
+        nodeset._names = dict(self._names)
+        return nodeset
+
+    def union(self, other):
+        nodeset = self._copy()
+        nodeset._merge(other._ranges)
+        nodeset._names.update(other._names)
+        return nodeset
+
+    def intersection(self, other):
+        nodeset = NodeSet()
+        for key, ranges in self._ranges.items():
+            if key in other._ranges:
+                common = _intersection(ranges, other._ranges[key])
+                if common:
+                    nodeset._ranges[key] = common
+        nodeset._names = {
+            name: None for name in self._names if name in other._names
+        }
+        return nodeset
+
+    def difference(self, other):
+        nodeset = NodeSet()
+        for key, ranges in self._ranges.items():
+            if key in other._ranges:
+                ranges = _difference(ranges, other._ranges[key])
+            if ranges:
+                nodeset._ranges[key] = ranges
+        nodeset._names = {
+            name: None for name in self._names if name not in other._names
+        }
+        return nodeset
+
+    __or__ = union
+    __and__ = intersection
+    __sub__ = difference
+
+    def __contains__(self, host):
+        m = _HOST_RE.match(host)
+        if m is None:
+            return host in self._names
+        prefix, digits, suffix = m.groups()
+        ranges = self._ranges.get((prefix, suffix, _pad(digits)))
+        if not ranges:
+            return False
+        value = int(digits)
+        i = bisect_right(ranges, (value, float('inf'))) - 1
+        return i >= 0 and ranges[i][1] >= value
+
+    def __iter__(self):
+        for (prefix, suffix, pad), ranges in self._ranges.items():
+            fmt = '%s%%0%dd%s' % (
+                prefix.replace('%', '%%'), pad, suffix.replace('%', '%%')
+            )
+            for lo, hi in ranges:
+                yield from map(fmt.__mod__, range(lo, hi + 1))
+        yield from self._names
+
+    def __len__(self):
+        return len(self._names) + sum(
+            hi - lo + 1
+            for ranges in self._ranges.values() for lo, hi in ranges
+        )
+
+    def __bool__(self):
+        return bool(self._ranges or self._names)
+
+    def __eq__(self, other):
+        if not isinstance(other, NodeSet):
+            return NotImplemented
+        return self._ranges == other._ranges and \
+            self._names.keys() == other._names.keys()
+
+    def fold(self):
+        """Fold back to a hostlist expression, from the rightmost number."""
+        groups = defaultdict(dict)
+        for (prefix, suffix, pad), ranges in self._ranges.items():
+            groups[(prefix, suffix)][pad] = ranges
+
+        items = [('', name) for name in self._names]
+        items.extend(
+            (prefix, _format_ranges(pads) + suffix)
+            for (prefix, suffix), pads in groups.items()
+        )
+        looping = True
+        while looping:
+            items, looping = _fold_pass(items)
+        return ','.join(sorted(right for _, right in items))
+
+    def __str__(self):
+        return self.fold()
+
+    def __repr__(self):
+        return f'{type(self).__name__}({self.fold()!r})'
+
+
+def _parse_rangelist(rangelist):
+    ranges = []
+    for range_ in rangelist.split(','):
+        m = _RANGE_RE.match(range_)
+        if m is None:
+            raise NodeSetParseError('bad range')
+        low, high = m.group(1), m.group(2) or m.group(1)
+        if int(high) < int(low):
+            raise NodeSetParseError('start > stop')
+        ranges.append((int(low), int(high), len(low)))
+    return ranges
+
+
+def _expand(segments):
+    choices = []
+    total = 1
+    for segment in segments:
+        if isinstance(segment, str):
+            choices.append((segment,))
+            continue
+        total *= sum(hi - lo + 1 for lo, hi, _ in segment)
+        if total > MAX_EXPAND:
+            raise NodeSetParseError('results too large')
+        choices.append([
+            '%0*d' % (width, value)
+            for lo, hi, width in segment for value in range(lo, hi + 1)
+        ])
+    return (''.join(names) for names in product(*choices))